@@ -0,0 +1,96 @@
+###
+# Benchmark: how much smaller the commit() payload gets once the command queue is optimized.
+#
+# Mimics a label_apply job w/ option.remove on both the title and a label: every task gets its labels set, its title
+#   trimmed and its labels set again. Some of the tasks already have the label, so their first update is a no-op.
+#
+# Runs entirely offline against a fake, in-memory todoist state:
+#   $ python3 benchmarks/command_queue.py --tasks 5000
+##
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# So the benchmark can be run from the root of the repo w/o installing anything
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import todoist
+from todoist import models
+
+from tdt.actions.mutators import remove_component_attribute_by_regex, remove_component_by_ids
+from tdt.utils.commands import optimize_queue, queue_update
+
+# The label the job applies and the one it removes
+_apply_id = 1
+_remove_id = 2
+
+
+def build_client(num_tasks: int, already_labeled: float):
+    """
+    A todoist client w/ num_tasks tasks, some of which already have the label the job applies
+    :param num_tasks:
+    :param already_labeled: fraction of the tasks that already have the label
+    :return:
+    """
+    _api = todoist.TodoistAPI('benchmark', cache=None)
+    _api.state['labels'] = [
+        models.Label({'id': _apply_id, 'name': 'next'}, _api),
+        models.Label({'id': _remove_id, 'name': 'inbox'}, _api),
+    ]
+    _api.state['items'] = []
+    for _i in range(num_tasks):
+        _labels = [_remove_id]
+        if random.random() < already_labeled:
+            _labels.append(_apply_id)
+        _api.state['items'].append(
+            models.Item({'id': _i, 'content': 'task {} @work'.format(_i), 'labels': _labels}, _api))
+    return _api
+
+
+def queue_label_job(api: todoist.TodoistAPI):
+    """
+    Queues what label_apply (w/ option.remove on task.content and labels.name) queues
+    :param api:
+    :return:
+    """
+    _content_filter = {'task': {'content': {'match': '@work'}}}
+    _label_filter = {'labels': {'name': {'match': 'inbox'}}}
+
+    for _t in api['items']:
+        queue_update(_t, labels=list(set(_t['labels']) | {_apply_id}))
+        remove_component_attribute_by_regex(_t, _content_filter, component='task', attribute='content')
+        remove_component_by_ids(api, _t, _label_filter, component='labels', attribute='name')
+
+
+def payload_size(api: todoist.TodoistAPI):
+    return len(json.dumps(api.queue))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='command queue optimizer benchmark')
+    parser.add_argument('--tasks', default=5000, type=int, help='number of tasks')
+    parser.add_argument('--already-labeled', default=0.5, type=float,
+                        help='fraction of the tasks that already have the label')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    random.seed(1)
+    api = build_client(args.tasks, args.already_labeled)
+    queue_label_job(api)
+
+    _commands = len(api.queue)
+    _bytes = payload_size(api)
+    print("{} tasks, {:.0%} already labeled".format(args.tasks, args.already_labeled))
+    print("before:  {} commands, {} bytes".format(_commands, _bytes))
+
+    _start = time.perf_counter()
+    _stats = optimize_queue(api)
+    _took = time.perf_counter() - _start
+
+    print("after:   {} commands, {} bytes".format(_stats['after'], payload_size(api)))
+    print("payload: {:.0%} of the original, optimized in {:.4f}s".format(payload_size(api) / _bytes, _took))
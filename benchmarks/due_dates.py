@@ -0,0 +1,86 @@
+###
+# Benchmark: parsing task due dates.
+#
+# Every date filter parses the due date of every candidate task. The old way handed each one to the general purpose
+#   dateutil.parser.parse(..., ignoretz=True); the new way (tdt.utils.date.parse_due_date) picks apart the few shapes
+#   that Todoist actually sends w/ datetime.fromisoformat() and only falls back to dateutil for anything else.
+#
+# Runs entirely offline:
+#   $ python3 benchmarks/due_dates.py --dates 100000 --tasks 10000 --filters 5
+##
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# So the benchmark can be run from the root of the repo w/o installing anything
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import dateutil.parser
+from pytz import timezone
+
+from tdt.utils.date import parse_due_date, get_tz_aware_task_due_date
+
+
+def build_due_dates(num_dates: int):
+    """
+    :param num_dates:
+    :return: list of due date strings, in the shapes Todoist uses: all day, floating and fixed (ZULU)
+    """
+    _now = datetime(2020, 6, 1, 12, 0, 0)
+    _dates = []
+    for _i in range(num_dates):
+        _when = _now + timedelta(minutes=random.randrange(-500000, 500000))
+        _dates.append(_when.strftime(['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ'][_i % 3]))
+    return _dates
+
+
+def old_parse(dates: list):
+    return [dateutil.parser.parse(_d, ignoretz=True) for _d in dates]
+
+
+def new_parse(dates: list):
+    return [parse_due_date(_d) for _d in dates]
+
+
+def tz_aware(dates: list):
+    # The whole of what each date filter does per task
+    _tz = timezone('America/Los_Angeles')
+    return [get_tz_aware_task_due_date({'content': 'x', 'due': {'date': _d, 'timezone': None}}, _tz) for _d in dates]
+
+
+def timed(fn, *args):
+    _start = time.perf_counter()
+    _r = fn(*args)
+    return _r, time.perf_counter() - _start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='due date parsing benchmark')
+    parser.add_argument('--dates', default=100000, type=int, help='number of due dates to parse')
+    parser.add_argument('--tasks', default=10000, type=int, help='number of tasks in the account the filters check')
+    parser.add_argument('--filters', default=5, type=int, help='number of date filters that check the account')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    dates = build_due_dates(args.dates)
+
+    _old, _old_t = timed(old_parse, dates)
+    _new, _new_t = timed(new_parse, dates)
+    assert _old == _new, "the two parsers disagree!"
+
+    print("{} due dates".format(len(dates)))
+    print("dateutil:       {:.3f}s".format(_old_t))
+    print("parse_due_date: {:.3f}s".format(_new_t))
+    print("speedup: {:.1f}x".format(_old_t / _new_t))
+
+    # An account of --tasks tasks checked by --filters date filters. The first filter parses and localizes each due
+    #   date, every filter after that finds it in the memo
+    _account = dates[:args.tasks]
+    _times = [timed(tz_aware, _account)[1] for _ in range(args.filters)]
+    print("get_tz_aware_task_due_date, {} tasks: first filter {:.3f}s, every filter after {:.3f}s".format(
+        len(_account), _times[0], sum(_times[1:]) / max(1, len(_times) - 1)))
@@ -0,0 +1,271 @@
+###
+# Benchmark: end to end runs of the example job files against a fake Todoist.
+#
+# Each job file under jobs/v1/ and jobs/demo/ is run (in a fresh interpreter, w/ an empty home dir so there are no
+#   caches, like a cron/container run) against seeded accounts of a few sizes served by benchmarks/fake_sync_server.py.
+#   benchmarks/e2e_driver.py times each phase of the run: interpreter start up, imports, yaml, validation, client, sync,
+#   actions and commit. The median of --runs runs and the peak RSS are appended to a JSON history file.
+#
+#   $ python3 benchmarks/e2e.py run --runs 3 --accounts small:100,medium:1000,large:5000 --note "before the change"
+#   $ python3 benchmarks/e2e.py run --runs 3 --accounts small:100,medium:1000,large:5000 --note "after the change"
+#
+# Then, compare the last two entries in the history. Exits non-zero if anything got slower (or bigger) by more than
+#   --threshold so it can gate CI:
+#   $ python3 benchmarks/e2e.py compare --threshold 0.10
+#
+# Only compare entries from the same machine; a handful of --runs keeps the noise (of a busy machine) under the
+#   threshold.
+##
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_sync_server import FakeSyncServer, account_token, parse_accounts
+
+# The root of the repo
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+_driver = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'e2e_driver.py')
+
+# The phases that the driver times, in the order they happen
+phases = ['interpreter', 'imports', 'yaml', 'validation', 'client', 'sync', 'actions', 'commit']
+
+_default_history = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'e2e-history.json')
+
+
+def find_job_files(dirs: list):
+    _files = []
+    for _d in dirs:
+        _files.extend(sorted(glob.glob(os.path.join(_d, '**', '*.yaml'), recursive=True) +
+                             glob.glob(os.path.join(_d, '**', '*.yml'), recursive=True)))
+    return _files
+
+
+def write_config(path: str, token: str, endpoint: str):
+    with open(path, 'w') as _fh:
+        _fh.write("todoist:\n  api:\n    token: '{}'\n    endpoint: '{}'\nclient:\n  timezone: 'UTC'\n"
+                  .format(token, endpoint))
+
+
+def run_once(job_file: str, config_file: str, work_dir: str):
+    """
+    Runs the driver in a fresh interpreter
+    :return: the driver's result + the wall time of the whole process
+    """
+    _home = tempfile.mkdtemp(dir=work_dir, prefix='home-')
+    _result_file = os.path.join(work_dir, 'result.json')
+
+    _env = dict(os.environ, HOME=_home)
+    _env['TDT_BENCH_SPAWNED_AT'] = repr(time.time())
+    _start = time.perf_counter()
+    _proc = subprocess.run([sys.executable, _driver, job_file, config_file, _result_file], env=_env, cwd=work_dir,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _wall = time.perf_counter() - _start
+    shutil.rmtree(_home, ignore_errors=True)
+
+    if _proc.returncode != 0 or not os.path.isfile(_result_file):
+        return {'status': 'failed', 'error': _proc.stderr.decode('utf-8', 'replace')[-500:], 'phases': {},
+                'wall': _wall, 'peak_rss_kb': None}
+
+    with open(_result_file, 'r') as _fh:
+        _r = json.load(_fh)
+    os.remove(_result_file)
+    _r['wall'] = _wall
+    return _r
+
+
+def summarize(job_file: str, account: str, runs: list):
+    """
+    :return: the median of each phase over the runs (only the runs that completed, if there are any)
+    """
+    _ok = [_r for _r in runs if _r['status'] == 'ok']
+    _use = _ok if len(_ok) > 0 else runs
+    _summary = {
+        'job': os.path.relpath(job_file, _root),
+        'account': account,
+        'status': 'ok' if len(_ok) == len(runs) else 'failed',
+        'error': next((_r['error'] for _r in runs if _r['error']), None),
+        'phases': {},
+        'wall': statistics.median([_r['wall'] for _r in _use]),
+        'peak_rss_kb': max([_r['peak_rss_kb'] or 0 for _r in _use]),
+        'actions': _use[0].get('actions', 0),
+        'queued': _use[0].get('queued', 0),
+    }
+    for _p in phases:
+        _times = [_r['phases'][_p] for _r in _use if _p in _r['phases']]
+        if len(_times) > 0:
+            _summary['phases'][_p] = statistics.median(_times)
+    return _summary
+
+
+def get_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=_root, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_history(path: str):
+    if not os.path.isfile(path):
+        return []
+    with open(path, 'r') as _fh:
+        return json.load(_fh)
+
+
+def print_results(results: list):
+    _head = "{:<36} {:<8} {:>8} ".format('JOB', 'ACCOUNT', 'WALL') + ' '.join(
+        "{:>11}".format(_p) for _p in phases) + " {:>9}".format('RSS MB')
+    print(_head)
+    for _r in results:
+        _line = "{:<36} {:<8} {:>7.3f}s ".format(_r['job'][-36:], _r['account'], _r['wall'])
+        _line += ' '.join("{:>10.1f}ms".format(_r['phases'][_p] * 1e3) if _p in _r['phases'] else "{:>11}".format('-')
+                          for _p in phases)
+        _line += " {:>9.1f}".format(_r['peak_rss_kb'] / 1024)
+        if _r['status'] != 'ok':
+            _line += "  FAILED: {}".format((_r['error'] or '').strip().splitlines()[-1:])
+        print(_line)
+
+
+def cmd_run(args: argparse.Namespace):
+    _job_files = find_job_files(args.jobs)
+    if len(_job_files) < 1:
+        print("No job files in {}".format(args.jobs))
+        exit(1)
+
+    _results = []
+    _work_dir = tempfile.mkdtemp(prefix='tmtdt-e2e-')
+    try:
+        # The job files use paths relative to the root of the repo (./templates) and the backup job saves to ./backups
+        os.symlink(os.path.join(os.path.abspath(_root), 'templates'), os.path.join(_work_dir, 'templates'))
+        os.makedirs(os.path.join(_work_dir, 'backups'))
+
+        with FakeSyncServer(args.accounts) as fake:
+            for _account in args.accounts:
+                _config = os.path.join(_work_dir, 'config-{}.yaml'.format(_account))
+                write_config(_config, account_token(_account), fake.endpoint)
+
+                for _jf in _job_files:
+                    # One run that isn't counted; writes the .pyc files and warms the OS file cache
+                    run_once(os.path.abspath(_jf), _config, _work_dir)
+                    _runs = [run_once(os.path.abspath(_jf), _config, _work_dir) for _ in range(args.runs)]
+                    _results.append(summarize(_jf, _account, _runs))
+                    print("{} x {} ({} tasks): {:.3f}s".format(_results[-1]['job'], _account, args.accounts[_account],
+                                                               _results[-1]['wall']), file=sys.stderr)
+            _stats = dict(fake.stats)
+
+    finally:
+        shutil.rmtree(_work_dir, ignore_errors=True)
+
+    print_results(_results)
+
+    _entry = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': get_commit(),
+        'note': args.note,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': args.runs,
+        'accounts': args.accounts,
+        'server': _stats,
+        'results': _results
+    }
+    _history = load_history(args.history)
+    _history.append(_entry)
+    with open(args.history, 'w') as _fh:
+        json.dump(_history, _fh, indent=2)
+    print("Recorded as entry #{} in {}".format(len(_history) - 1, args.history))
+
+
+def _metrics(result: dict):
+    # Everything worth comparing: each phase, the whole process and the memory
+    _m = {'phase:{}'.format(_p): _t for _p, _t in result['phases'].items()}
+    _m['wall'] = result['wall']
+    _m['peak_rss_kb'] = result['peak_rss_kb']
+    return _m
+
+
+def compare(baseline: dict, candidate: dict, threshold: float, min_delta: float):
+    """
+    :param baseline: history entry
+    :param candidate: history entry
+    :param threshold: fraction (0.1 = 10%) that a metric can grow by before it's a regression
+    :param min_delta: seconds; timings that grew by less than this are noise, no matter the fraction
+    :return: list of (job, account, metric, baseline value, candidate value, change)
+    """
+    _base = {(_r['job'], _r['account']): _r for _r in baseline['results'] if _r['status'] == 'ok'}
+    _regressions = []
+    for _r in candidate['results']:
+        _key = (_r['job'], _r['account'])
+        if _r['status'] != 'ok' or _key not in _base:
+            continue
+
+        _old = _metrics(_base[_key])
+        for _name, _new_v in _metrics(_r).items():
+            _old_v = _old.get(_name)
+            if not _old_v or _new_v is None:
+                continue
+            # RSS is in KB, so the same noise floor doesn't apply
+            _floor = 1024 if _name == 'peak_rss_kb' else min_delta
+            if _new_v > _old_v * (1 + threshold) and _new_v - _old_v > _floor:
+                _regressions.append((_r['job'], _r['account'], _name, _old_v, _new_v, _new_v / _old_v - 1))
+
+    return _regressions
+
+
+def cmd_compare(args: argparse.Namespace):
+    _history = load_history(args.history)
+    if len(_history) < 2:
+        print("Need at least two entries in {} to compare; have {}".format(args.history, len(_history)))
+        exit(1)
+
+    _baseline = _history[args.baseline]
+    _candidate = _history[args.candidate]
+    print("baseline:  {} {} {}".format(_baseline['timestamp'], _baseline['commit'], _baseline['note'] or ''))
+    print("candidate: {} {} {}".format(_candidate['timestamp'], _candidate['commit'], _candidate['note'] or ''))
+
+    _regressions = compare(_baseline, _candidate, args.threshold, args.min_delta)
+    for _job, _account, _name, _old, _new, _change in _regressions:
+        print("REGRESSION {} x {} {}: {:.4g} -> {:.4g} (+{:.0%})".format(_job, _account, _name, _old, _new, _change))
+
+    if len(_regressions) > 0:
+        print("{} regression(s) over {:.0%}".format(len(_regressions), args.threshold))
+        exit(1)
+    print("No regressions over {:.0%}".format(args.threshold))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='end to end benchmark against a fake Todoist')
+    parser.add_argument('--history', default=_default_history, help='the JSON file w/ the results of every run')
+    _sub = parser.add_subparsers(dest='command', required=True)
+
+    _run = _sub.add_parser('run', help='run every job file against every account and record the results')
+    _run.add_argument('--jobs', nargs='+', default=[os.path.join(_root, 'jobs', 'v1'), os.path.join(_root, 'jobs', 'demo')],
+                      help='directories of job files to run')
+    _run.add_argument('--accounts', default='small:100,medium:1000,large:5000', type=parse_accounts,
+                      help='name:tasks,... of the seeded accounts to run against')
+    _run.add_argument('--runs', default=3, type=int, help='runs of each job against each account; the median is kept')
+    _run.add_argument('--note', default=None, help='recorded w/ the results; what changed?')
+
+    _cmp = _sub.add_parser('compare', help='compare two entries in the history, exit non-zero on regressions')
+    _cmp.add_argument('--baseline', default=-2, type=int, help='index of the entry to compare against')
+    _cmp.add_argument('--candidate', default=-1, type=int, help='index of the entry to check')
+    _cmp.add_argument('--threshold', default=0.10, type=float, help='how much worse (0.10 = 10%%) is a regression')
+    _cmp.add_argument('--min-delta', default=0.005, type=float,
+                      help='seconds; timings that changed by less than this are ignored')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.command == 'run':
+        cmd_run(args)
+    else:
+        cmd_compare(args)
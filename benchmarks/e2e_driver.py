@@ -0,0 +1,107 @@
+###
+# One end to end run of a job file, for benchmarks/e2e.py; not meant to be run by hand.
+#
+# Does what `tmtdt.py --job-file ...` does, one phase at a time, and writes how long each phase took (and the peak RSS
+#   of the process) to a JSON file:
+#   interpreter  from the parent starting this process to the first line of this file running
+#   imports      tdt, the todoist client, voluptuous, yaml...
+#   yaml         parsing the job file
+#   validation   validating the job file
+#   client       loading the config file and building the todoist client
+#   sync         the (full) sync
+#   actions      running the actions; their changes are queued, like --accounts and --daemon do
+#   commit       sending the queued changes
+#
+#   $ python3 benchmarks/e2e_driver.py <job file> <config file> <result file>
+##
+import time
+
+# As early as possible; the interpreter start up is everything before this line
+_started_at = time.time()
+
+import json
+import os
+import resource
+import sys
+
+# So the driver can be run from anywhere w/o installing anything
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# The parent puts the (wall clock) time it started us at here
+spawned_env_var = 'TDT_BENCH_SPAWNED_AT'
+
+
+def get_peak_rss_kb():
+    _rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return _rss // 1024 if sys.platform == 'darwin' else _rss
+
+
+def drive(job_file: str, config_file: str):
+    """
+    :param job_file:
+    :param config_file:
+    :return: dict w/ the status, the timings of each phase that got to run and a few counts
+    """
+    _result = {'status': 'ok', 'error': None, 'phases': {}, 'actions': 0, 'problems': 0, 'queued': 0}
+    _phases = _result['phases']
+    _phases['interpreter'] = max(0.0, _started_at - float(os.environ.get(spawned_env_var, _started_at)))
+
+    _lap = [time.perf_counter()]
+
+    def lap(phase: str):
+        _now = time.perf_counter()
+        _phases[phase] = _now - _lap[0]
+        _lap[0] = _now
+
+    try:
+        import argparse
+        from tdt.utils.config import process_config, get_job_file, get_todoist_file
+        from tdt.validators import validate_actions
+        from tdt.runner import get_api_client, sync_api_client, run_actions, commit_queued_changes
+        from tdt.events import configure_event_bus
+
+        args = argparse.Namespace(log_level='ERROR', log_file=None, dry_run=False, job_file=job_file)
+        process_config(args)
+        lap('imports')
+
+        _job = get_job_file(job_file)
+        lap('yaml')
+
+        _actions = validate_actions(_job)
+        _result['actions'] = len(_actions)
+        lap('validation')
+
+        _client_config = get_todoist_file(config_file)
+        configure_event_bus(_client_config)
+        _client = get_api_client(_client_config)
+        lap('client')
+
+        sync_api_client(_client)
+        lap('sync')
+
+        _result['problems'] = len(run_actions(_actions, _client, _client_config, args, defer_commits=True))
+        _result['queued'] = len(_client.queue)
+        lap('actions')
+
+        if not commit_queued_changes(_client):
+            _result['problems'] += 1
+        lap('commit')
+
+    except (Exception, SystemExit) as e:
+        # Whatever got timed before the failure is still worth having
+        _result['status'] = 'failed'
+        _result['error'] = "{}: {}".format(type(e).__name__, e)
+
+    _result['peak_rss_kb'] = get_peak_rss_kb()
+    return _result
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4:
+        print("usage: python3 benchmarks/e2e_driver.py <job file> <config file> <result file>")
+        exit(1)
+
+    _r = drive(sys.argv[1], sys.argv[2])
+    with open(sys.argv[3], 'w') as _fh:
+        json.dump(_r, _fh)
@@ -0,0 +1,137 @@
+###
+# Benchmark: the event bus publishing to an MQTT broker.
+#
+# Emits --events events (like a label_apply over that many tasks would) through an EventBus w/ an MQTTSink pointed at
+#   benchmarks/fake_mqtt_broker.py, then checks that the broker got every one of them, on the right topic and w/ the
+#   right object IDs. Also checks that a broker refusing the connection surfaces as a TDTException and that a batch
+#   sent after the broker dropped an idle connection still arrives.
+# Reports what each emit() costs the action that calls it and how long it took for everything to reach the broker.
+#
+# Runs entirely offline; exits non-zero if anything did not arrive as sent:
+#   $ python3 benchmarks/events.py --events 10000
+##
+import argparse
+import json
+import os
+import sys
+import time
+
+# So the benchmark can be run from the root of the repo w/o installing anything
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from tdt.exceptions import TDTException
+from tdt.events import EventBus
+from tdt.events.sinks import MQTTSink
+
+from fake_mqtt_broker import FakeMQTTBroker
+
+_username = 'tmtdt'
+_password = 'hunter2'
+_topic = 'bench/tmtdt'
+
+
+def check_refused(broker: FakeMQTTBroker):
+    """
+    :return: True if connecting w/ the wrong password raised a TDTException
+    """
+    _sink = MQTTSink('127.0.0.1', broker.port, _topic, username=_username, password='wrong')
+    try:
+        _sink.publish([{'type': 'label_apply', 'object_ids': [1]}])
+    except TDTException:
+        return True
+    finally:
+        _sink.close()
+    return False
+
+
+def check_idle(broker: FakeMQTTBroker):
+    """
+    :return: True if an event sent after the broker dropped the (idle) connection still arrived
+    """
+    _sink = MQTTSink('127.0.0.1', broker.port, _topic, username=_username, password=_password, keepalive=1)
+    _before = len(broker.messages)
+    try:
+        _sink.publish([{'type': 'label_apply', 'object_ids': [1]}])
+        # The broker gives up on the connection after 1.5s of silence
+        time.sleep(1.6)
+        _sink.publish([{'type': 'label_apply', 'object_ids': [2]}])
+        return broker.wait_for(_before + 2, timeout=2)
+    finally:
+        _sink.close()
+        with broker._lock:
+            del broker.messages[_before:]
+
+
+def run(broker: FakeMQTTBroker, num_events: int, batch_size: int):
+    """
+    :return: (seconds spent in emit(), seconds until the broker had every event, the bus stats)
+    """
+    _sink = MQTTSink('127.0.0.1', broker.port, _topic, username=_username, password=_password)
+    _bus = EventBus([_sink], queue_size=num_events, batch_size=batch_size, flush_interval=0.05)
+
+    _start = time.perf_counter()
+    for _i in range(num_events):
+        _bus.emit('label_apply' if _i % 2 else 'task_reschedule', [_i], {'labels': [1, 2]}, action='bench')
+    _emitted = time.perf_counter() - _start
+
+    _bus.close()
+    broker.wait_for(num_events)
+    return _emitted, time.perf_counter() - _start, _bus.stats
+
+
+def verify(broker: FakeMQTTBroker, num_events: int):
+    """
+    :return: list of what is wrong w/ the messages the broker got
+    """
+    _problems = []
+    if len(broker.messages) != num_events:
+        _problems.append("broker got {} of {} event(s)".format(len(broker.messages), num_events))
+
+    _seen = set()
+    for _topic_name, _payload in broker.messages:
+        _event = json.loads(_payload)
+        _seen.update(_event['object_ids'])
+        if _topic_name != '{}/{}'.format(_topic, _event['type']):
+            _problems.append("event {} published to {}".format(_event['id'], _topic_name))
+        if _event['diff'] != {'labels': [1, 2]} or _event['action'] != 'bench':
+            _problems.append("event {} was mangled: {}".format(_event['id'], _event))
+
+    _missing = set(range(num_events)) - _seen
+    if len(_missing) > 0:
+        _problems.append("no event for {} object(s), E.G.: {}".format(len(_missing), sorted(_missing)[:5]))
+
+    if broker.stats['protocol_errors'] > 0:
+        _problems.append("{} protocol error(s)".format(broker.stats['protocol_errors']))
+    return _problems
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='event bus + MQTT sink benchmark')
+    parser.add_argument('--events', default=10000, type=int, help='number of events to emit')
+    parser.add_argument('--batch-size', default=100, type=int, help='the most events handed to the sink at once')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    with FakeMQTTBroker(username=_username, password=_password) as broker:
+        _refused = check_refused(broker)
+        _idle = check_idle(broker)
+        _emitted, _total, _stats = run(broker, args.events, args.batch_size)
+        _problems = verify(broker, args.events)
+
+    if not _refused:
+        _problems.append("a refused connection did not raise a TDTException")
+    if not _idle:
+        _problems.append("an event sent after the connection went idle was lost")
+
+    print("{} events, batches of {}".format(args.events, args.batch_size))
+    print("emit():             {:.1f}µs per event".format(_emitted / args.events * 1e6))
+    print("all at the broker:  {:.3f}s".format(_total))
+    print("bus: {}".format(_stats))
+    print("broker: {}".format(broker.stats))
+
+    for _p in _problems:
+        print("PROBLEM: {}".format(_p))
+    exit(1 if len(_problems) > 0 else 0)
@@ -0,0 +1,234 @@
+###
+# A fake MQTT broker for the benchmarks.
+#
+# Speaks just enough MQTT 3.1.1 to stand in for a broker behind tdt.events.sinks.MQTTSink: it accepts CONNECT (and
+#   checks the username/password, if it was given some), answers w/ CONNACK and keeps every QoS 0 PUBLISH it gets.
+#   Like a real broker, it answers PINGREQ and drops a client that sends nothing for 1.5x its keep alive.
+#   Nothing is forwarded to subscribers; there are none.
+#   See: http://docs.oasis-open.org/mqtt/mqtt/v3.1.1/os/mqtt-v3.1.1-os.html
+#
+# Can be run on its own to point the `events:` section of a (copy of the) config file at:
+#   $ python3 benchmarks/fake_mqtt_broker.py --port 1883
+#   ...
+#   events:
+#     sinks:
+#       - type: mqtt
+#         host: 127.0.0.1
+#         port: 1883
+##
+import argparse
+import socket
+import socketserver
+import struct
+import threading
+
+# CONNACK return codes
+_accepted = 0x00
+_bad_credentials = 0x04
+
+
+def _read_exactly(rfile, size: int):
+    _b = rfile.read(size)
+    if len(_b) < size:
+        raise EOFError()
+    return _b
+
+
+def _read_packet(rfile):
+    """
+    :param rfile:
+    :return: (packet type, flags, body) of the next packet
+    """
+    _header = _read_exactly(rfile, 1)[0]
+
+    # The 'remaining length' is a variable length int; 7 bits per byte, high bit set if more bytes follow
+    _length = 0
+    _shift = 0
+    while True:
+        _byte = _read_exactly(rfile, 1)[0]
+        _length |= (_byte & 0x7f) << _shift
+        _shift += 7
+        if not _byte & 0x80:
+            break
+
+    return _header >> 4, _header & 0x0f, _read_exactly(rfile, _length)
+
+
+def _read_string(body: bytes, offset: int):
+    """
+    :return: (the string at offset, the offset just past it)
+    """
+    _len = struct.unpack('!H', body[offset:offset + 2])[0]
+    return body[offset + 2:offset + 2 + _len].decode('utf-8'), offset + 2 + _len
+
+
+def parse_connect(body: bytes):
+    """
+    :param body: the variable header + payload of a CONNECT packet
+    :return: dict w/ the protocol, level, keepalive, client_id, username and password
+    """
+    _protocol, _o = _read_string(body, 0)
+    _level, _flags = body[_o], body[_o + 1]
+    _keepalive = struct.unpack('!H', body[_o + 2:_o + 4])[0]
+    _client_id, _o = _read_string(body, _o + 4)
+
+    _username = _password = None
+    if _flags & 0x80:
+        _username, _o = _read_string(body, _o)
+    if _flags & 0x40:
+        _password, _o = _read_string(body, _o)
+
+    return {'protocol': _protocol, 'level': _level, 'keepalive': _keepalive, 'client_id': _client_id,
+            'username': _username, 'password': _password}
+
+
+def parse_publish(flags: int, body: bytes):
+    """
+    :param flags: the low 4 bits of the fixed header
+    :param body: the variable header + payload of a PUBLISH packet
+    :return: (topic, payload)
+    """
+    _topic, _o = _read_string(body, 0)
+    # QoS 1 and 2 messages carry a packet ID before the payload; MQTTSink only sends QoS 0, but skip it all the same
+    if (flags >> 1) & 0x03:
+        _o += 2
+    return _topic, body[_o:]
+
+
+class FakeMQTTBroker:
+    """
+    The fake broker, in a background thread
+    """
+
+    def __init__(self, port: int = 0, username: str = None, password: str = None):
+        """
+        :param port: 0 to pick any free port
+        :param username: if set, connections that don't use this username/password are refused
+        :param password:
+        """
+        self.username = username
+        self.password = password
+
+        # Every (topic, payload) that was published, in the order they arrived
+        self.messages = []
+        self.stats = {'connects': 0, 'refused': 0, 'publishes': 0, 'pings': 0, 'disconnects': 0, 'timeouts': 0,
+                      'protocol_errors': 0}
+        self._lock = threading.Lock()
+        self._received = threading.Condition(self._lock)
+
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-mqtt', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def wait_for(self, count: int, timeout: float = 10.0):
+        """
+        Publishing is fire and forget; wait until the broker has actually read count messages
+        :param count:
+        :param timeout:
+        :return: True if count messages arrived in time
+        """
+        with self._received:
+            return self._received.wait_for(lambda: len(self.messages) >= count, timeout)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _accepts(self, connect: dict):
+        if self.username is None:
+            return True
+        return connect['username'] == self.username and connect['password'] == self.password
+
+    def _make_handler(self):
+        broker = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                try:
+                    _type, _, _body = _read_packet(self.rfile)
+                    if _type != 1:
+                        # The first packet from a client MUST be a CONNECT
+                        broker._count('protocol_errors')
+                        return
+
+                    _connect = parse_connect(_body)
+                    if _connect['protocol'] != 'MQTT' or _connect['level'] != 4:
+                        broker._count('protocol_errors')
+                        return
+                    if not broker._accepts(_connect):
+                        broker._count('refused')
+                        self.wfile.write(bytes([0x20, 0x02, 0x00, _bad_credentials]))
+                        return
+
+                    broker._count('connects')
+                    self.wfile.write(bytes([0x20, 0x02, 0x00, _accepted]))
+                    if _connect['keepalive'] > 0:
+                        self.connection.settimeout(_connect['keepalive'] * 1.5)
+
+                    while True:
+                        _type, _flags, _body = _read_packet(self.rfile)
+                        if _type == 3:
+                            _message = parse_publish(_flags, _body)
+                            with broker._received:
+                                broker.messages.append(_message)
+                                broker.stats['publishes'] += 1
+                                broker._received.notify_all()
+                        elif _type == 12:
+                            broker._count('pings')
+                            # PINGRESP
+                            self.wfile.write(b'\xd0\x00')
+                        elif _type == 14:
+                            broker._count('disconnects')
+                            return
+                        else:
+                            broker._count('protocol_errors')
+                            return
+
+                except EOFError:
+                    # Client went away w/o a DISCONNECT
+                    return
+                except socket.timeout:
+                    # Quiet for longer than the keep alive allows; the client never finds out
+                    broker._count('timeouts')
+                    return
+
+        return _Handler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='fake MQTT broker')
+    parser.add_argument('--port', default=1883, type=int, help='port to listen on (localhost only)')
+    parser.add_argument('--username', default=None, help='if set, refuse clients that do not use it')
+    parser.add_argument('--password', default=None)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    broker = FakeMQTTBroker(args.port, args.username, args.password)
+    print("Listening on 127.0.0.1:{}".format(broker.port))
+    try:
+        broker.start()._thread.join()
+    except KeyboardInterrupt:
+        print("{} message(s) received. {}".format(len(broker.messages), broker.stats))
+        broker.stop()
@@ -0,0 +1,280 @@
+###
+# A fake Todoist sync API for the benchmarks.
+#
+# Serves seeded accounts over plain HTTP on localhost; just enough of the sync (v8) API for tmtdt to sync, run its
+#   actions and commit:
+#   - POST /sync/v8/sync          full sync (sync_token '*') returns the whole account, anything else an empty delta.
+#                                 Commands are acknowledged (and temp IDs mapped) but not applied, so every run starts
+#                                 from the same account
+#   - GET  /sync/v8/backups/get   a couple of backups, downloadable from:
+#   - GET  /backups/<name>.zip
+#
+# The account is picked by the API token; see account_token(). Accounts are generated from a seed, so the same size
+#   is the same account every time.
+#
+# Can be run on its own to point a (copy of the) config file at:
+#   $ python3 benchmarks/fake_sync_server.py --port 8008 --accounts small:100,medium:1000
+#   ...
+#   todoist:
+#     api:
+#       token: benchsmall000000000000000000000000000000
+#       endpoint: http://127.0.0.1:8008
+##
+import argparse
+import itertools
+import json
+import random
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Names that the example jobs in jobs/ look for, so the actions have something to do
+_project_names = ['Inbox', 'Garage Sale 🏚️💵', 'Some Test Project', 'Some Other Test Project 1', 'prj_next_quarter']
+_label_names = ['at_work', 'at_store', 'at_hl', 'tmtdt', 'simple_label', 'routine', 'prj_next_quarter']
+_task_templates = [
+    'Send the report {} at work',
+    'Pick up paint #{} at the office',
+    'Solder board {} at hacker lab',
+    'Book room {} before team lunch',
+    'My Every Evening routine task {}',
+    'Some Sooner Main Task {}',
+    'Some never Due Task {}',
+    'Some Child Task (child_order: {})',
+    'Sort the garage, box {}',
+    'Read chapter {}',
+]
+
+
+def account_token(name: str):
+    """
+    :param name: the name of the account, E.G.: small
+    :return: the (40 character) API token that selects the account
+    """
+    return 'bench{}'.format(name).ljust(40, '0')[:40]
+
+
+def _due(rnd: random.Random, today: datetime):
+    # Todoist due dates come in three shapes: all day, floating date+time and a fixed (UTC) date+time
+    _shape = rnd.randint(0, 3)
+    if _shape == 0:
+        return None
+
+    _when = today + timedelta(days=rnd.randint(-30, 30), hours=rnd.randint(0, 23))
+    if _shape == 1:
+        _date = _when.strftime('%Y-%m-%d')
+    elif _shape == 2:
+        _date = _when.strftime('%Y-%m-%dT%H:%M:%S')
+    else:
+        _date = _when.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    return {'date': _date, 'timezone': None, 'string': _date, 'lang': 'en', 'is_recurring': False}
+
+
+def build_account(num_tasks: int, seed: int = 0):
+    """
+    :param num_tasks: how many (open) tasks the account has; everything else is scaled from it
+    :param seed: same seed, same account
+    :return: the account, shaped like a full sync response
+    """
+    rnd = random.Random(seed + num_tasks)
+    today = datetime.now().replace(minute=0, second=0, microsecond=0)
+    _ids = itertools.count(1000)
+
+    _projects = []
+    for _i, _name in enumerate(_project_names + ['Project {}'.format(_p) for _p in range(max(1, num_tasks // 50))]):
+        _projects.append({
+            'id': next(_ids), 'name': _name, 'color': 30 + _i % 19, 'child_order': _i, 'collapsed': 0, 'shared': False,
+            'is_deleted': 0, 'is_archived': 0, 'is_favorite': 0, 'sync_id': None, 'inbox_project': _name == 'Inbox',
+            # Every 5th project is inside the one before it
+            'parent_id': _projects[-1]['id'] if _i > len(_project_names) and _i % 5 == 0 else None
+        })
+
+    _labels = []
+    for _i, _name in enumerate(_label_names + ['label_{}'.format(_l) for _l in range(max(1, num_tasks // 100))]):
+        _labels.append({'id': next(_ids), 'name': _name, 'color': 30 + _i % 19, 'item_order': _i, 'is_deleted': 0,
+                        'is_favorite': 0})
+
+    _sections = []
+    for _p in _projects[::3]:
+        _sections.append({'id': next(_ids), 'name': 'Section of {}'.format(_p['name']), 'project_id': _p['id'],
+                          'section_order': 1, 'collapsed': False, 'is_deleted': False, 'is_archived': False,
+                          'sync_id': None, 'user_id': 1, 'date_added': '2020-01-01T00:00:00Z', 'date_archived': None})
+
+    _items = []
+    _reminders = []
+    for _i in range(num_tasks):
+        _project = rnd.choice(_projects)
+        _item = {
+            'id': next(_ids), 'user_id': 1, 'project_id': _project['id'],
+            'content': rnd.choice(_task_templates).format(_i), 'priority': rnd.randint(1, 4),
+            'due': _due(rnd, today), 'parent_id': None, 'child_order': _i, 'section_id': None, 'day_order': -1,
+            'collapsed': 0, 'labels': [_l['id'] for _l in rnd.sample(_labels, rnd.randint(0, 2))],
+            'added_by_uid': 1, 'assigned_by_uid': 1, 'responsible_uid': None, 'checked': 0, 'in_history': 0,
+            'is_deleted': 0, 'sync_id': None, 'date_completed': None, 'date_added': '2020-01-01T00:00:00Z'
+        }
+        # Some tasks are sub-tasks of the task before them
+        if _items and rnd.random() < 0.1:
+            _item['parent_id'] = _items[-1]['id']
+            _item['project_id'] = _items[-1]['project_id']
+        _items.append(_item)
+
+        if _item['due'] is not None and rnd.random() < 0.2:
+            _reminders.append({'id': next(_ids), 'notify_uid': 1, 'item_id': _item['id'], 'service': 'push',
+                               'type': 'relative', 'due': _item['due'], 'minute_offset': 30, 'is_deleted': 0})
+
+    return {
+        'full_sync': True,
+        'user': {'id': 1, 'full_name': 'Benchmark', 'tz_info': {'timezone': 'UTC'},
+                 'inbox_project': _projects[0]['id']},
+        'user_settings': {},
+        'projects': _projects,
+        'labels': _labels,
+        'sections': _sections,
+        'items': _items,
+        'reminders': _reminders,
+        'notes': [],
+        'project_notes': [],
+        'filters': [],
+        'collaborators': [],
+        'collaborator_states': [],
+        'live_notifications': [],
+        'day_orders': {},
+        'day_orders_timestamp': '1',
+    }
+
+
+class FakeSyncServer:
+    """
+    The fake API, in a background thread
+    """
+
+    def __init__(self, accounts: dict, port: int = 0):
+        """
+        :param accounts: dict of account name -> number of tasks
+        :param port: 0 to pick any free port
+        """
+        # token -> full sync response; built up front so generating an account never counts against a run
+        self.accounts = {account_token(_n): build_account(_t) for _n, _t in accounts.items()}
+
+        # What was asked of us; handy to check that a run actually did something
+        self.stats = {'syncs': 0, 'full_syncs': 0, 'commands': 0}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(10 ** 9)
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self._make_handler())
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        return 'http://127.0.0.1:{}'.format(self._httpd.server_address[1])
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fake-sync', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _sync(self, form: dict):
+        _account = self.accounts.get(form.get('token', [''])[0])
+        if _account is None:
+            return 403, {'error': 'Invalid token', 'error_tag': 'AUTH_INVALID_TOKEN', 'http_code': 403}
+
+        _commands = json.loads(form.get('commands', ['[]'])[0])
+        with self._lock:
+            self.stats['syncs'] += 1
+            self.stats['commands'] += len(_commands)
+            _sync_token = 'bench-{}'.format(self.stats['syncs'])
+
+        if form.get('sync_token', ['*'])[0] == '*':
+            with self._lock:
+                self.stats['full_syncs'] += 1
+            _resp = dict(_account, sync_token=_sync_token)
+        else:
+            _resp = {'full_sync': False, 'sync_token': _sync_token}
+
+        if len(_commands) > 0:
+            _resp['sync_status'] = {_c['uuid']: 'ok' for _c in _commands}
+            _resp['temp_id_mapping'] = {_c['temp_id']: next(self._ids) for _c in _commands if _c.get('temp_id')}
+
+        return 200, _resp
+
+    def _backups(self):
+        _today = datetime.now().strftime('%Y-%m-%d')
+        return 200, [{'version': '{} 0{}:00'.format(_today, _h), 'url': '{}/backups/{}.zip'.format(self.endpoint, _h)}
+                     for _h in range(2)]
+
+    def _make_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+
+            def _reply(self, code: int, body, content_type: str = 'application/json'):
+                _b = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(_b)))
+                self.end_headers()
+                self.wfile.write(_b)
+
+            def do_POST(self):
+                _len = int(self.headers.get('Content-Length', 0))
+                _form = parse_qs(self.rfile.read(_len).decode('utf-8'))
+                if urlparse(self.path).path.endswith('/sync'):
+                    return self._reply(*server._sync(_form))
+                self._reply(404, {'error': 'not found'})
+
+            def do_GET(self):
+                _path = urlparse(self.path).path
+                if _path.endswith('/backups/get'):
+                    return self._reply(*server._backups())
+                if _path.startswith('/backups/'):
+                    return self._reply(200, b'PK\x05\x06' + b'\x00' * 18, 'application/zip')
+                self._reply(404, {'error': 'not found'})
+
+            def log_message(self, fmt, *args):
+                # Every request on stderr would drown out the results
+                pass
+
+        return _Handler
+
+
+def parse_accounts(value: str):
+    """
+    :param value: E.G.: small:100,medium:1000
+    :return: dict of account name -> number of tasks
+    """
+    _accounts = {}
+    for _a in value.split(','):
+        _name, _tasks = _a.split(':')
+        _accounts[_name] = int(_tasks)
+    return _accounts
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='fake Todoist sync API')
+    parser.add_argument('--port', default=8008, type=int, help='port to listen on (localhost only)')
+    parser.add_argument('--accounts', default='small:100,medium:1000,large:5000', type=parse_accounts,
+                        help='name:tasks,... of the accounts to serve')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    fake = FakeSyncServer(args.accounts, args.port)
+    for _n in args.accounts:
+        print("{:<10} token: {}".format(_n, account_token(_n)))
+    print("Listening on {}".format(fake.endpoint))
+    try:
+        fake.start()._thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
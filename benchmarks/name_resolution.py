@@ -0,0 +1,104 @@
+###
+# Benchmark: resolving the project/section/parent_task names of every item in a big task_create job.
+#
+# The old way compiled each name and searched every object of that kind for every item. The new way indexes each kind
+#   by name once (tdt.utils.names.NameIndex) and then does a dict lookup (or a search over the distinct names).
+#
+# Runs entirely offline against a fake, in-memory todoist state:
+#   $ python3 benchmarks/name_resolution.py --items 60000 --creates 500
+##
+import argparse
+import os
+import random
+import sys
+import time
+
+# So the benchmark can be run from the root of the repo w/o installing anything
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import todoist
+from todoist import models
+
+from tdt.actions.utils import get_components_by_name_with_strings
+from tdt.utils.names import NameIndex
+
+
+def build_client(num_items: int, num_projects: int):
+    """
+    A todoist client w/ num_items tasks spread over num_projects projects, each w/ a couple of sections
+    :param num_items:
+    :param num_projects:
+    :return:
+    """
+    _api = todoist.TodoistAPI('benchmark', cache=None)
+    # Fill the state directly; _update_state() is O(n^2) and would dominate the set up
+    _api.state['projects'] = [models.Project({'id': _p, 'name': 'project {}'.format(_p)}, _api)
+                              for _p in range(num_projects)]
+    _api.state['sections'] = [models.Section({'id': _s, 'name': 'section {}'.format(_s % 2), 'project_id': _s // 2},
+                                             _api)
+                              for _s in range(num_projects * 2)]
+    _api.state['items'] = [models.Item({'id': _i, 'content': 'task {}'.format(_i),
+                                        'project_id': random.randrange(num_projects)}, _api)
+                           for _i in range(num_items)]
+    return _api
+
+
+def build_queries(num_items: int, num_projects: int, num_creates: int):
+    """
+    What each item in the job file asks for: an exact project, a section in that project and an exact parent task
+    :return: list of (project, section, parent_task) queries
+    """
+    return [('^project {}$'.format(random.randrange(num_projects)), '^section {}$'.format(random.randrange(2)),
+             '^task {}$'.format(random.randrange(num_items)))
+            for _ in range(num_creates)]
+
+
+def scan(api: todoist.TodoistAPI, queries: list):
+    _found = 0
+    for _project, _section, _parent in queries:
+        _found += len(get_components_by_name_with_strings(api, 'projects', [_project]))
+        _found += len(get_components_by_name_with_strings(api, 'sections', [_section]))
+        _found += len(get_components_by_name_with_strings(api, 'items', [_parent]))
+    return _found
+
+
+def indexed(api: todoist.TodoistAPI, queries: list):
+    _found = 0
+    _indexes = {_c: NameIndex(api, _c) for _c in ('projects', 'sections', 'items')}
+    for _project, _section, _parent in queries:
+        _found += len(_indexes['projects'].find(_project))
+        _found += len(_indexes['sections'].find(_section))
+        _found += len(_indexes['items'].find(_parent))
+    return _found
+
+
+def timed(fn, *args):
+    _start = time.perf_counter()
+    _r = fn(*args)
+    return _r, time.perf_counter() - _start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='task_create name resolution benchmark')
+    parser.add_argument('--items', default=60000, type=int, help='number of existing tasks')
+    parser.add_argument('--projects', default=200, type=int, help='number of existing projects')
+    parser.add_argument('--creates', default=500, type=int, help='number of tasks in the task_create job')
+    parser.add_argument('--skip-scan', action='store_true', help='only time the indexed lookup')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    random.seed(1)
+    api = build_client(args.items, args.projects)
+    queries = build_queries(args.items, args.projects, args.creates)
+    print("{} tasks, {} projects, {} task(s) to create".format(args.items, args.projects, args.creates))
+
+    _i, _it = timed(indexed, api, queries)
+    print("indexed: {:.4f}s".format(_it))
+
+    if not args.skip_scan:
+        _s, _st = timed(scan, api, queries)
+        print("scan:    {:.4f}s".format(_st))
+        assert _s == _i, "the two approaches disagree!"
+        print("speedup: {:.0f}x".format(_st / _it))
@@ -0,0 +1,95 @@
+###
+# Benchmark: finding every project below a set of projects (the include_subprojects selector option).
+#
+# The naive way walks up the parent_id chain of every project for every selected project. The ProjectTree walks the
+#   hierarchy once and then each selected project is a single slice of the visit order.
+#
+# Runs entirely offline against a fake, in-memory todoist state:
+#   $ python3 benchmarks/project_tree.py --projects 5000 --selected 500
+##
+import argparse
+import os
+import random
+import sys
+import time
+
+# So the benchmark can be run from the root of the repo w/o installing anything
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import todoist
+from todoist import models
+
+from tdt.utils.projects import ProjectTree
+
+
+def build_client(num_projects: int, max_depth: int):
+    """
+    A todoist client w/ num_projects projects, randomly nested up to max_depth deep
+    :param num_projects:
+    :param max_depth:
+    :return:
+    """
+    _api = todoist.TodoistAPI('benchmark', cache=None)
+    _depth = {}
+    _projects = []
+    for _p in range(num_projects):
+        _parent = None
+        if _p > 0 and random.random() < 0.8:
+            _parent = random.randrange(_p)
+            if _depth[_parent] >= max_depth:
+                _parent = None
+        _depth[_p] = 0 if _parent is None else _depth[_parent] + 1
+        _projects.append(models.Project({'id': _p, 'name': 'project {}'.format(_p), 'parent_id': _parent,
+                                         'child_order': _p}, _api))
+    _api.state['projects'] = _projects
+    return _api
+
+
+def walk(api: todoist.TodoistAPI, selected: list):
+    _parents = {_p['id']: _p['parent_id'] for _p in api.state['projects']}
+    _found = set()
+    for _sel in selected:
+        for _pid in _parents:
+            _up = _pid
+            while _up is not None:
+                if _up == _sel:
+                    _found.add(_pid)
+                    break
+                _up = _parents[_up]
+    return _found
+
+
+def indexed(api: todoist.TodoistAPI, selected: list):
+    return ProjectTree(api.state['projects']).expand(selected)
+
+
+def timed(fn, *args):
+    _start = time.perf_counter()
+    _r = fn(*args)
+    return _r, time.perf_counter() - _start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='project hierarchy benchmark')
+    parser.add_argument('--projects', default=5000, type=int, help='number of existing projects')
+    parser.add_argument('--depth', default=8, type=int, help='how deep projects can be nested')
+    parser.add_argument('--selected', default=500, type=int, help='number of projects the selector matches')
+    parser.add_argument('--skip-walk', action='store_true', help='only time the indexed lookup')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    random.seed(1)
+    api = build_client(args.projects, args.depth)
+    selected = random.sample(range(args.projects), min(args.selected, args.projects))
+    print("{} projects, {} selected".format(args.projects, len(selected)))
+
+    _i, _it = timed(indexed, api, selected)
+    print("indexed: {:.4f}s ({} projects incl. sub-projects)".format(_it, len(_i)))
+
+    if not args.skip_walk:
+        _w, _wt = timed(walk, api, selected)
+        print("walk:    {:.4f}s".format(_wt))
+        assert _w == _i, "the two approaches disagree!"
+        print("speedup: {:.0f}x".format(_wt / _it))
@@ -0,0 +1,102 @@
+###
+# Benchmark: finding the existing reminders of each task that reminder_apply works on.
+#
+# The old way walked every reminder for every (task, reminder spec) pair and compared each one it found w/ the spec.
+#   The new way (tdt.utils.reminders.get_reminder_signature_index, what reminder_apply uses) reduces every reminder to
+#   a signature once, grouped by task, and then does a dict + set lookup per pair.
+#
+# Runs entirely offline against a fake, in-memory todoist state:
+#   $ python3 benchmarks/reminder_index.py --tasks 5000 --reminders 20000
+##
+import argparse
+import os
+import random
+import sys
+import time
+
+# So the benchmark can be run from the root of the repo w/o installing anything
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import todoist
+from pytz import timezone
+from todoist import models
+
+from tdt.utils.reminders import get_reminder_signature, get_reminder_signature_index, get_reminders_by_task_id
+
+
+def build_client(num_tasks: int, num_reminders: int):
+    """
+    A todoist client w/ num_tasks tasks and num_reminders reminders spread randomly over them
+    :param num_tasks:
+    :param num_reminders:
+    :return:
+    """
+    _api = todoist.TodoistAPI('benchmark', cache=None)
+    # Fill the state directly; _update_state() is O(n^2) and would dominate the set up
+    _api.state['items'] = [models.Item({'id': _i, 'content': 'task {}'.format(_i)}, _api) for _i in range(num_tasks)]
+    _api.state['reminders'] = [
+        models.Reminder({'id': _i, 'item_id': random.randrange(num_tasks), 'type': 'relative', 'service': 'push',
+                         'minute_offset': random.choice([15, 30, 60])}, _api)
+        for _i in range(num_reminders)
+    ]
+    return _api
+
+
+def get_specs(num_specs: int):
+    # The signature of a relative reminder spec; see tdt.utils.reminders.get_spec_signatures()
+    return [('relative', 'push', [15, 30, 60, 90][_s % 4]) for _s in range(num_specs)]
+
+
+def scan(api: todoist.TodoistAPI, specs: list, tz: timezone):
+    # How many (task, spec) pairs already have the reminder
+    _found = 0
+    for _t in api['items']:
+        for _sig in specs:
+            if any(get_reminder_signature(_r, tz) == _sig for _r in get_reminders_by_task_id(api, _t['id'])):
+                _found += 1
+    return _found
+
+
+def indexed(api: todoist.TodoistAPI, specs: list, tz: timezone):
+    _found = 0
+    _index = get_reminder_signature_index(api, tz)
+    for _t in api['items']:
+        _existing = _index.get(_t['id'], {})
+        for _sig in specs:
+            if _sig in _existing:
+                _found += 1
+    return _found
+
+
+def timed(fn, *args):
+    _start = time.perf_counter()
+    _r = fn(*args)
+    return _r, time.perf_counter() - _start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='reminder lookup benchmark')
+    parser.add_argument('--tasks', default=5000, type=int, help='number of tasks')
+    parser.add_argument('--reminders', default=20000, type=int, help='number of reminders')
+    parser.add_argument('--specs', default=1, type=int, help='number of reminder specs in the action')
+    parser.add_argument('--skip-scan', action='store_true', help='only time the indexed lookup')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    random.seed(1)
+    api = build_client(args.tasks, args.reminders)
+    print("{} tasks, {} reminders, {} spec(s)".format(args.tasks, args.reminders, args.specs))
+
+    tz = timezone('UTC')
+    specs = get_specs(args.specs)
+
+    _i, _it = timed(indexed, api, specs, tz)
+    print("indexed: {:.4f}s".format(_it))
+
+    if not args.skip_scan:
+        _s, _st = timed(scan, api, specs, tz)
+        print("scan:    {:.4f}s".format(_st))
+        assert _s == _i, "the two approaches disagree!"
+        print("speedup: {:.0f}x".format(_st / _it))
@@ -0,0 +1,55 @@
+###
+# Benchmark: how long the CLI takes to start, w/ a time budget.
+#
+# Times (in fresh interpreters, like cron/containers do) the CLI getting as far as --version and importing everything
+#   that a job run needs. Exits non-zero if the median cold start goes over --budget so it can gate CI:
+#   $ python3 benchmarks/startup.py --runs 10 --budget 0.15
+##
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# The root of the repo; tmtdt.py lives there
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# What to time: name -> the arguments to the python interpreter
+_scenarios = {
+    'version': [os.path.join(_root, 'tmtdt.py'), '--version'],
+    'full import': ['-c', 'import sys; sys.path.insert(0, {!r}); '
+                          'from tdt.utils.startup import profile_imports; profile_imports()'.format(_root)],
+}
+
+
+def timed_run(python_args: list):
+    _start = time.perf_counter()
+    subprocess.run([sys.executable] + python_args, check=True, stdout=subprocess.DEVNULL, cwd=_root)
+    return time.perf_counter() - _start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='CLI start up benchmark')
+    parser.add_argument('--runs', default=10, type=int, help='number of cold starts per scenario')
+    parser.add_argument('--budget', default=0.15, type=float,
+                        help='max median seconds for the --version start up before this exits non-zero')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    _medians = {}
+    for _name, _args in _scenarios.items():
+        # First run warms the OS file cache and writes the .pyc files
+        timed_run(_args)
+        _times = [timed_run(_args) for _ in range(args.runs)]
+        _medians[_name] = statistics.median(_times)
+        print("{:<12} median {:.3f}s  min {:.3f}s  max {:.3f}s".format(_name, _medians[_name], min(_times),
+                                                                    max(_times)))
+
+    if _medians['version'] > args.budget:
+        print("OVER BUDGET: --version took {:.3f}s, budget is {:.3f}s".format(_medians['version'], args.budget))
+        exit(1)
+    print("within budget ({:.3f}s)".format(args.budget))
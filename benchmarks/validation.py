@@ -0,0 +1,80 @@
+###
+# Benchmark: validating a big (generated) job file.
+#
+# The generated job file is the example job files from jobs/v1/ repeated until there are --actions action blocks.
+#   Validation is timed at a few sizes so it's easy to see that the time per action block stays flat as the job file
+#   grows; the first block of each type pays for building that type's schema, every other block reuses it.
+#
+# Runs entirely offline:
+#   $ python3 benchmarks/validation.py --actions 1000 --runs 3
+##
+import argparse
+import copy
+import glob
+import os
+import sys
+import time
+
+import logging
+
+# So the benchmark can be run from the root of the repo w/o installing anything
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, _root)
+
+from tdt.utils.loader import load_yaml, JobFileLoader
+from tdt.validators import validate_actions
+
+
+def build_job_file(num_actions: int):
+    """
+    :param num_actions: how many action blocks the job file should have
+    :return: the parsed (but not validated) job file
+    """
+    _examples = []
+    for _f in sorted(glob.glob(os.path.join(_root, 'jobs', 'v1', '*', '*.yaml'))):
+        # The backup actions check that their paths exist on *this* machine
+        if os.path.join('v1', 'backup') in _f:
+            continue
+        with open(_f, 'r') as _fh:
+            _examples.extend(load_yaml(_fh.read(), JobFileLoader)['actions'])
+
+    _actions = []
+    for _i in range(num_actions):
+        _a = copy.deepcopy(_examples[_i % len(_examples)])
+        _a['name'] = "{} #{}".format(_a['name'], _i)
+        _actions.append(_a)
+
+    return {'version': 1, 'actions': _actions}
+
+
+def timed(fn, *args):
+    _start = time.perf_counter()
+    _r = fn(*args)
+    return _r, time.perf_counter() - _start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='job file validation throughput benchmark')
+    parser.add_argument('--actions', default=1000, type=int, help='number of action blocks in the biggest job file')
+    parser.add_argument('--runs', default=3, type=int, help='number of times to validate each job file')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    # The validators are chatty at INFO
+    logging.disable(logging.CRITICAL)
+
+    for _size in [args.actions // 4, args.actions // 2, args.actions]:
+        job_file = build_job_file(_size)
+
+        _best = None
+        for _ in range(args.runs):
+            # Validation coerces the job file in place, so each run gets its own copy
+            _valid, _t = timed(validate_actions, copy.deepcopy(job_file))
+            assert len(_valid) == _size
+            _best = _t if _best is None else min(_best, _t)
+
+        print("{:>6} actions: {:.3f}s  {:.0f} actions/s  {:.1f}us per action".format(
+            _size, _best, _size / _best, _best / _size * 1e6))
@@ -0,0 +1,103 @@
+###
+# Benchmark: parsing a big (generated) job file.
+#
+# The old way registered the ${ENV_VAR} resolver on PyYAML's global loaders every time a job file was read and parsed
+#   w/ the pure python FullLoader. The new way (tdt.utils.loader.JobFileLoader) registers it once and uses libyaml when
+#   PyYAML was built w/ it.
+#
+# Runs entirely offline:
+#   $ python3 benchmarks/yaml_loading.py --items 5000 --loads 3
+##
+import argparse
+import os
+import re
+import sys
+import time
+
+# So the benchmark can be run from the root of the repo w/o installing anything
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import yaml
+
+from tdt.utils.loader import load_yaml, JobFileLoader, _env_var_constructor
+
+
+def build_job_file(num_items: int):
+    """
+    A task_create job w/ num_items tasks, like the ones we generate
+    :param num_items:
+    :return: the YAML
+    """
+    _lines = [
+        "version: 1",
+        "actions:",
+        "  - name: generated",
+        "    action: task_create",
+        "    items:",
+    ]
+    for _i in range(num_items):
+        _lines.extend([
+            "      - content: 'generated task {}'".format(_i),
+            "        project:",
+            "          name: '^${{BENCH_PROJECT:Inbox}}$'",
+            "        priority: {}".format(_i % 4 + 1),
+            "        labels:",
+            "          name:",
+            "            - generated",
+            "            - batch_{}".format(_i % 10),
+            "        due:",
+            "          relative:",
+            "            to: tomorrow",
+            "            direction: after",
+        ])
+    return '\n'.join(_lines) + '\n'
+
+
+class _OldLoader(yaml.FullLoader):
+    """
+    Stand in for the global FullLoader so the old way can't leak resolvers into the rest of the process
+    """
+    pass
+
+
+def old_load(content: str):
+    # What get_job_file() used to do on every call
+    _matcher = re.compile(r"\${([^}^{]+)\}")
+    _OldLoader.add_implicit_resolver('!env', _matcher, None)
+    _OldLoader.add_constructor('!env', _env_var_constructor)
+    return yaml.load(content, Loader=_OldLoader)
+
+
+def new_load(content: str):
+    return load_yaml(content, JobFileLoader)
+
+
+def timed(fn, *args):
+    _start = time.perf_counter()
+    _r = fn(*args)
+    return _r, time.perf_counter() - _start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='job file YAML loading benchmark')
+    parser.add_argument('--items', default=5000, type=int, help='number of tasks in the generated job file')
+    parser.add_argument('--loads', default=3, type=int, help='number of times to load the job file')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    content = build_job_file(args.items)
+    print("{} lines, {} bytes, libyaml: {}".format(content.count('\n'), len(content), yaml.__with_libyaml__))
+
+    _new_total = 0
+    _old_total = 0
+    for _l in range(args.loads):
+        _n, _nt = timed(new_load, content)
+        _o, _ot = timed(old_load, content)
+        assert _n == _o, "the two loaders disagree!"
+        _new_total += _nt
+        _old_total += _ot
+        print("load #{}: new {:.3f}s  old {:.3f}s".format(_l, _nt, _ot))
+
+    print("speedup: {:.1f}x".format(_old_total / _new_total))
@@ -0,0 +1,99 @@
+###
+# Replays Todoist webhook events against a local `tmtdt.py --daemon --webhook`.
+#
+# Registering a real webhook with Todoist means an app, a public URL and a lot of waiting around. This sends the same
+#   payloads (from a YAML/JSON file) to the daemon so the event handling can be exercised locally.
+##
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+import requests
+import yaml
+
+from tdt.utils.config import get_todoist_file
+
+
+def launch(args: argparse.Namespace):
+    """
+    :param args: the argparse args
+    :return:
+    """
+    # YAML is a superset of JSON so this handles both
+    with open(args.events_file, 'r') as fh:
+        _events = yaml.safe_load(fh)
+
+    if isinstance(_events, dict):
+        _events = [_events]
+
+    # If the daemon is checking signatures, we need to sign with the same secret
+    _secret = None
+    if args.sign:
+        _secret = get_todoist_file(args.config_file)['todoist']['webhook']['client_secret']
+
+    for _idx, _evt in enumerate(_events):
+        _body = json.dumps(_evt).encode('utf-8')
+        _headers = {'Content-Type': 'application/json'}
+        if _secret is not None:
+            _sig = hmac.new(_secret.encode('utf-8'), _body, hashlib.sha256).digest()
+            _headers['X-Todoist-Hmac-SHA256'] = base64.b64encode(_sig).decode('ascii')
+
+        _r = requests.post(args.url, data=_body, headers=_headers)
+        print("#{} {} -> {} {}".format(_idx, _evt.get('event_name'), _r.status_code, _r.text))
+
+        if args.delay > 0:
+            time.sleep(args.delay)
+
+
+def parse_args():
+
+    # Root argparse
+    parser = argparse.ArgumentParser(
+        description='Replays todoist webhook events against a local TMTDT daemon',
+        epilog='¯\\_(ツ)_/¯',
+        allow_abbrev=True)
+
+    parser.add_argument('events_file',
+                        type=str,
+                        help='YAML/JSON file with a list of webhook payloads ({event_name: ..., event_data: ...})'
+                        )
+
+    _url_default = 'http://127.0.0.1:8080/webhook'
+    parser.add_argument('--url', '-u',
+                        default=_url_default,
+                        type=str,
+                        help='Where the daemon is listening. Defaults to {}'.format(_url_default)
+                        )
+
+    parser.add_argument('--delay', '-d',
+                        default=0,
+                        type=float,
+                        help='Seconds to wait between events'
+                        )
+
+    parser.add_argument('--sign', '-s',
+                        action='store_true',
+                        help='Sign each event with todoist.webhook.client_secret from --config-file'
+                        )
+
+    _config_default = './config/config.yaml'
+    parser.add_argument('--config-file',
+                        default=_config_default,
+                        type=str,
+                        help='Path to TMDT config file. Defaults to {}'.format(_config_default)
+                        )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    # Begin by parsing any arguments from the client
+    args = parse_args()
+
+    # Assuming that nothing has blown up, we launch the tool
+    launch(args)
+
+    # And assuming that nothing there blew up, we exit
+    exit(0)
@@ -0,0 +1,189 @@
+###
+# Runs the same job file against several todoist accounts at once.
+#
+# Each account is described by its own config file (with its own API token). Accounts are completely independent of
+#   each other so each one gets its own process; the run takes about as long as the slowest account rather than the
+#   sum of all of them. One account blowing up does not affect any of the others.
+##
+import argparse
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from tdt.events import configure_event_bus
+from tdt.exceptions import TDTException
+from tdt.log_utils import LogInfo, set_log_prefix
+from tdt.runner import get_api_client, sync_api_client, run_actions
+from tdt.utils.config import get_todoist_file, validate_job_file, get_job_cache_dir
+
+# Accounts spend their time waiting on ToDoist, not the CPU, so by default every account gets a process of its own;
+#   up to this many. Past that, memory (each process has its own client + synced account) is the limit
+default_max_parallelism = 32
+
+
+def expand_config_files(paths: list):
+    """
+    Turns the list of config files and/or directories (of config files) into a list of config files
+    :param paths: what the user gave us with --accounts
+    :return:
+    """
+    log = logging.getLogger(__name__)
+
+    _files = []
+    for _p in paths:
+        if os.path.isdir(_p):
+            _found = sorted(glob.glob(os.path.join(_p, '*.yaml')) + glob.glob(os.path.join(_p, '*.yml')))
+            log.debug("Found {} config file(s) in {}".format(len(_found), _p))
+            _files.extend(_found)
+        else:
+            _files.append(_p)
+
+    # Same file twice would mean the same account racing itself
+    _unique = []
+    for _f in _files:
+        if os.path.abspath(_f) not in [os.path.abspath(_u) for _u in _unique]:
+            _unique.append(_f)
+
+    return _unique
+
+
+def get_account_name(config_file: str):
+    """
+    A short, human friendly name for the account to prefix the logs with. alice.yaml -> alice and, for the
+        config/alice/config.yaml layout, alice.
+    :param config_file:
+    :return:
+    """
+    _stem = os.path.splitext(os.path.basename(config_file))[0]
+    if _stem == 'config':
+        _stem = os.path.basename(os.path.dirname(os.path.abspath(config_file))) or _stem
+    return _stem
+
+
+def run_account(config_file: str, args: argparse.Namespace):
+    """
+    Runs args.job_file against the account from config_file. This runs in a worker process so it configures its own
+        logging and never raises; whatever happens is in the returned result.
+
+    :param config_file: the account's config file
+    :param args: the argparse args
+    :return: dict describing how it went
+    """
+    _name = get_account_name(config_file)
+
+    # Fresh logging for this account
+    logging.root.handlers = []
+    LogInfo({'log_level': args.log_level, 'log_file': args.log_file})
+    set_log_prefix(_name)
+    log = logging.getLogger(__name__)
+
+    _result = {
+        'account': _name,
+        'config_file': config_file,
+        'status': 'failed',
+        'actions': 0,
+        'problems': 0,
+        'error': None,
+        'duration': None
+    }
+
+    _bus = None
+    _start = time.monotonic()
+    try:
+        client_config = get_todoist_file(config_file)
+        _bus = configure_event_bus(client_config)
+
+        # Relative dates are resolved at validation time, so each account validates for itself
+        valid_actions = validate_job_file(args.job_file, get_job_cache_dir(args))
+        _result['actions'] = len(valid_actions)
+
+        log.info("⚙️ Spinning up Todoist API Client...")
+        todo_client = get_api_client(client_config)
+        sync_api_client(todo_client)
+
+        _problems = run_actions(valid_actions, todo_client, client_config, args)
+        _result['problems'] = len(_problems)
+        _result['status'] = 'ok' if len(_problems) < 1 else 'problems'
+
+    except (Exception, SystemExit) as e:
+        # SystemExit from deep inside the validators included; this process must always report back
+        log.exception("🛑 account://{} failed!".format(_name))
+        _result['error'] = "{}: {}".format(type(e).__name__, e)
+
+    finally:
+        # atexit doesn't run in worker processes, so publish whatever this account emitted now
+        if _bus is not None:
+            _bus.close()
+
+    _result['duration'] = time.monotonic() - _start
+    return _result
+
+
+def run_accounts(args: argparse.Namespace):
+    """
+    Runs args.job_file against every account in args.accounts, args.parallelism accounts at a time
+    :param args: the argparse args
+    :return: list of per-account results, see run_account()
+    """
+    log = logging.getLogger(__name__)
+
+    _config_files = expand_config_files(args.accounts)
+    if len(_config_files) < 1:
+        _e = "No config files found in {}".format(args.accounts)
+        log.error(_e)
+        raise TDTException(_e)
+
+    # Catch a broken job file once, here, rather than N times in the workers
+    validate_job_file(args.job_file, get_job_cache_dir(args))
+
+    _workers = min(args.parallelism or default_max_parallelism, len(_config_files))
+    log.info("👥 Running job://{} against {} account(s), {} at a time...".format(
+        args.job_file, len(_config_files), _workers))
+
+    _results = []
+    _start = time.monotonic()
+    with ProcessPoolExecutor(max_workers=_workers) as pool:
+        _futures = {pool.submit(run_account, _cf, args): _cf for _cf in _config_files}
+        for _f in as_completed(_futures):
+            _cf = _futures[_f]
+            try:
+                _results.append(_f.result())
+            except Exception as e:
+                # The worker process itself died (OOM, segfault...)
+                _results.append({
+                    'account': get_account_name(_cf),
+                    'config_file': _cf,
+                    'status': 'failed',
+                    'actions': 0,
+                    'problems': 0,
+                    'error': "{}: {}".format(type(e).__name__, e),
+                    'duration': None
+                })
+
+    log_report(sorted(_results, key=lambda _r: _r['account']), time.monotonic() - _start)
+    return _results
+
+
+def log_report(results: list, wall_time: float):
+    """
+    The aggregate report at the end of a multi-account run
+    :param results:
+    :param wall_time: how long the whole thing took
+    :return:
+    """
+    log = logging.getLogger(__name__)
+
+    _icons = {'ok': '✅', 'problems': '⭕', 'failed': '🛑'}
+    log.info("📋 Report for {} account(s):".format(len(results)))
+    for _r in results:
+        _duration = "{:.1f}s".format(_r['duration']) if _r['duration'] is not None else '?'
+        log.info("  {} {:<20} {:<8} actions:{:<3} problems:{:<3} {} {}".format(
+            _icons[_r['status']], _r['account'], _r['status'], _r['actions'], _r['problems'], _duration,
+            _r['error'] or ''))
+
+    _counts = {_s: len([_r for _r in results if _r['status'] == _s]) for _s in _icons}
+    _total = sum([_r['duration'] for _r in results if _r['duration'] is not None])
+    log.info("ok:{ok} problems:{problems} failed:{failed}. Wall time {wall:.1f}s vs {total:.1f}s of account time."
+             .format(wall=wall_time, total=_total, **_counts))
@@ -26,3 +26,14 @@ action_map = {
     'task_delete': 'TaskDeleteAction',
     'task_reschedule': 'TaskRescheduleAction'
 }
+
+# The actions that pick the tasks they work on with filters. When a handful of tasks change (webhook events), these are
+#   the only actions that could end up with a different result, so they're the only ones that need re-evaluating.
+##
+filter_actions = [
+    'label_apply',
+    'reminder_apply',
+    'project_create',
+    'task_delete',
+    'task_reschedule'
+]
@@ -3,14 +3,15 @@
 ###
 
 
-# Debugging
-from prettyprinter import pprint as pp
-
 import logging
 
 import todoist
 
 from tdt import TDTException
+from tdt.actions.utils import get_relevant_tasks, get_components_by_ids_bulk, _filters_use_relative_dates
+from tdt.events import get_event_bus
+from tdt.utils.commands import commit_in_chunks, forget_originals, optimize_queue
+from tdt.utils.delta import MatchSets
 
 # So we can localize things properly
 from pytz import timezone
@@ -73,6 +74,20 @@ class Action(object):
         self._args = None
         self._dry_run = None
 
+        # When several actions (or jobs) are run back to back by the daemon, the caller may want to collect every
+        #   change into a single commit() rather than one commit() per action
+        ##
+        self._defer_commit = False
+
+        # When reacting to a few changed tasks (webhook events) rather than a scheduled run, the caller can restrict
+        #   every filter to just those task IDs. None means every task is considered.
+        ##
+        self._task_scope = None
+
+        # When run by the daemon, what changed in the last sync and the per-filter match sets. See tdt.utils.delta
+        ##
+        self._delta = None
+
         ##
         # Almost all $component.$actions support filtering based on some source.selectors
         # Within that, some selectors support mutation and deletion
@@ -202,6 +217,87 @@ class Action(object):
             self.log.warning("{} accessed before set. Probably not good!".format('_dry_run'))
         return self._dry_run
 
+    @property
+    def defer_commit(self):
+        return self._defer_commit
+
+    @defer_commit.setter
+    def defer_commit(self, value: bool):
+        """
+        If set, _commit_changes() leaves the queued changes for the caller to commit
+        :param value:
+        :return:
+        """
+        self._defer_commit = value
+
+    @property
+    def task_scope(self):
+        return self._task_scope
+
+    @task_scope.setter
+    def task_scope(self, value: set):
+        """
+        If set, filters are only evaluated against the tasks with these IDs
+        :param value:
+        :return:
+        """
+        self._task_scope = value
+
+    @property
+    def delta(self):
+        return self._delta
+
+    @delta.setter
+    def delta(self, value):
+        """
+        If set, a SyncDelta that lets filters skip the tasks that can't have changed since the last run
+        :param value:
+        :return:
+        """
+        self._delta = value
+
+    def _get_relevant_tasks(self, filters: list):
+        """
+        Every action that selects tasks with filters goes through here so that the task_scope and delta are honored
+        :param filters: the validated filter objects
+        :return: see get_relevant_tasks()
+        """
+        _key = None
+        _previous = None
+        # A scoped (webhook) evaluation only sees a few tasks so it can't be used as the match set for the filters.
+        #   Filters w/ relative dates are re-validated (so have a new 'now' and a new key) every run; there is no
+        #   point in keeping a set that will never be looked up again
+        if self._delta is not None and self._task_scope is None and not _filters_use_relative_dates(filters):
+            _key = MatchSets.key_for(filters)
+            _previous = self._delta.match_sets.get(_key)
+
+        _tasks, _selectors = get_relevant_tasks(self.api_client, filters, self._assumed_tz, self._task_scope,
+                                                self._delta, _previous)
+        if _key is not None:
+            self._delta.match_sets.put(_key, {_t['id'] for _t in _tasks})
+
+        return _tasks, _selectors
+
+    def _get_existing_ids(self, sources: list):
+        """
+        Checks every explicit `- id: 1234` source the user gave us in one go. The ones that don't exist are reported in
+            a single warning.
+        :param sources: the validated list of sources; each one is either an id or a filter
+        :return: {id: component} for each explicit ID that exists
+        """
+        _ids = [_s['id'] for _s in sources if 'id' in _s]
+        if len(_ids) < 1:
+            return {}
+
+        self.log.debug("Validating {} {} id(s)...".format(len(_ids), self.component))
+        _found, _missing = get_components_by_ids_bulk(self.api_client, self.component, _ids)
+        if len(_missing) > 0:
+            _w = "⚠️ Was not able to confirm existence of {} {}: {}! Will not {} them!".format(
+                len(_missing), self.component, _missing, self.action)
+            self.log.warning(_w)
+
+        return _found
+
     @property
     def filters(self):
         if self._filters is None:
@@ -242,12 +338,24 @@ class Action(object):
             self.log.warning("{} accessed before set!".format('_component_objs'))
         return self._component_objs
 
-    def _commit_changes(self, do_sync: bool = False):
+    def _commit_changes(self, do_sync: bool = False, force: bool = False):
         """
         Small wrapper function around the todoist API commit() call
         :param do_sync: Bool. Set to True if a sync() should be performed before we return
+        :param force: Bool. Set to True to commit even if the caller would commit for us. The commit response carries
+            the server assigned IDs (and the changes since the last sync) so, unlike do_sync, this costs one request
         :return:
         """
+        # If the caller is going to commit on our behalf, leave everything in the queue. The exception is when we've
+        #   been asked to sync (or force the commit) as that means we need the server assigned IDs *right now*
+        ##
+        if self._defer_commit and not do_sync and not force and not self.dry_run:
+            self.log.debug("Leaving {} queued change(s) for the caller to commit...".format(len(self.api_client.queue)))
+            return True
+
+        # Fold/drop the redundant commands before they go anywhere
+        optimize_queue(self.api_client)
+
         if self.dry_run:
             self.log.info("🟡 Would have committed changes but --dry-run:`{}` prevents us from going further!"
                           .format(self.dry_run))
@@ -255,7 +363,8 @@ class Action(object):
 
         # Otherwise, no dry run!
         try:
-            result = self.api_client.commit()
+            # The Sync API limits the number of commands per request; big jobs go in several commits
+            result = commit_in_chunks(self.api_client)
 
             if result is None:
                 self.log.info("todoist confirmed nothing changed / nothing to .commit()")
@@ -286,6 +395,10 @@ class Action(object):
             self.log.error(_e)
             raise TDTException(_e)
 
+        finally:
+            # Committed or not, the queue is gone and so is the 'before' state we recorded for it
+            forget_originals(self.api_client)
+
     def _do_mutations_by_selector(self, t: todoist.api.models.Item, filters: list, selectors: list):
         """
         Removes the matching portion of the property from the task.
@@ -392,13 +505,42 @@ class Action(object):
 
         return
 
-    def _emit_event(self, *args, **kwargs):
+    def _emit_event(self, event_type: str, obj=None, diff: dict = None):
         """
         Hook function designed to emit events / signal to other software when an item has been modified.
-        Not yet implemented!
+        Events go to the event bus (if one is configured, see tdt.events) and carry just the ID(s) and what changed.
+
+        :param event_type: what happened. E.G.: label_apply
+        :param obj: the todoist object, ID or list of IDs that the event is about
+        :param diff: what changed. If not given, it is taken from the command that was just queued for obj
+        :return:
+        """
+        _bus = get_event_bus()
+        if _bus is None:
+            return
+
+        if isinstance(obj, todoist.api.models.Model):
+            _ids = [obj['id']]
+            if diff is None:
+                diff = self._get_queued_diff(obj['id'])
+        elif isinstance(obj, (list, set, tuple)):
+            _ids = list(obj)
+        elif obj is None:
+            _ids = []
+        else:
+            _ids = [obj]
+
+        _name = self._action_params.get('name') if isinstance(self._action_params, dict) else None
+        _bus.emit(event_type, _ids, diff, action=_name, dry_run=bool(self._dry_run))
+
+    def _get_queued_diff(self, obj_id):
+        """
+        The command that was queued for obj_id holds exactly the fields that changed
+        :param obj_id:
         :return:
         """
-        # The idea is to hook here to mqtt event bus so other things are aware of what just happened
-        #pp(kwargs)
-        #pp(args)
-        self.log.debug('emit_event {} not yet implemented'.format(self._emit_events))
+        # It's almost always the very last command, so look from the end
+        for _cmd in reversed(self.api_client.queue):
+            if _cmd.get('temp_id') == obj_id or _cmd['args'].get('id') == obj_id:
+                return {_k: _v for _k, _v in _cmd['args'].items() if _k != 'id'}
+        return None
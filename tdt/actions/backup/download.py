@@ -9,11 +9,8 @@ import datetime
 from tdt.actions.backup import BackupAction
 from tdt.actions.utils import *
 
-# Fabulous date/time parser tool
-import dateutil.parser
-
-# Debugging
-from prettyprinter import pprint as pp
+# Backup versions look like the due dates; same (fast) parser
+from tdt.utils.date import parse_due_date
 
 # Requests Lib for the HTTP download
 import requests
@@ -149,7 +146,7 @@ class BackupDownloadAction(BackupAction):
         # Get all the backups that todoist has for the account
         for _b in self.api_client.backups.get():
             # Get the date+time of the current backup, cast down to just the date
-            _v = dateutil.parser.parse(_b['version'])
+            _v = parse_due_date(_b['version'])
             _d = _v.date()
             if _d not in _backups:
                 _backups[_d] = {}
@@ -3,13 +3,8 @@
 ##
 
 # Inherit from...
-import re
-
 from tdt.actions.action import Action
-from tdt.actions.utils import get_components_by_name_with_regex
-
-# Debugging
-from prettyprinter import pprint as pp
+from tdt.utils.names import get_label_index
 
 
 class LabelAction(Action):
@@ -69,26 +64,20 @@ class LabelAction(Action):
         ##
         self.log.debug("Checking {} {} for pre-existence... ".format(len(self._component_objs.keys()), self.component))
 
+        # Label names are names, not regex; `work` must not also find `homework`
+        _index = get_label_index(self.api_client)
         for _lbl in self._component_objs:
-            self.log.debug("fetching ID for {}://{}...".format(self.component, _lbl))
-            # Pull out the labels.match into a regex query, because the user is providing *only* a string
-            #   we have no regex flags
-            ##
-            _labels_title_re = re.compile(_lbl, flags=0)
-
-            # Run the filter to get the labels
-            _labels = get_components_by_name_with_regex(self.api_client, self.component, _labels_title_re)
+            _id = _index.get(_lbl)
 
-            # If we got 1 result, then we know the label exists already and should not be re-created. If the user
+            # If we got an ID, then we know the label exists already and should not be re-created. If the user
             #   wishes to modify the existing label, they need a different action block or to delete the label and
             #   let this action block re-create it
             ##
-            if len(_labels) == 0:
+            if _id is None:
                 # the label does NOT exist, so we'll create it!
                 self.log.debug("... unable to. {}://{} needs creation!".format(self.component, _lbl))
                 continue
-            else:
-                #  Otherwise, we should have something we can store :)
-                self.log.debug("... found {}://{} ".format(self.component, _lbl))
-                self._component_ids.update( {_x['name']: _x['id'] for _x in _labels})
 
+            #  Otherwise, we should have something we can store :)
+            self.log.debug("... found {}://{} ".format(self.component, _lbl))
+            self._component_ids[_lbl] = _id
@@ -1,12 +1,8 @@
-# Debugging
-from prettyprinter import pprint as pp
-
-
 import todoist
 
-from tdt.actions.utils import get_relevant_tasks
 from tdt.actions.label import LabelAction
 from tdt.actions.mutators import remove_component_attribute_by_regex, remove_component_by_ids
+from tdt.utils.commands import queue_update
 
 
 class LabelApplyAction(LabelAction):
@@ -51,7 +47,7 @@ class LabelApplyAction(LabelAction):
         # Get the tasks that match the filters
         self.log.info("Looking for tasks to apply {} {} to....".format(len(self.filters), self.component))
 
-        _t, _s = get_relevant_tasks(self.api_client, self.filters, self._assumed_tz)
+        _t, _s = self._get_relevant_tasks(self.filters)
         self._matching_tasks = _t
         self._source_selectors = _s
 
@@ -91,7 +87,7 @@ class LabelApplyAction(LabelAction):
             #   option.remove statements before we persist the changes to the server
             _all = list(_task_lbls.union(_lbls_to_add))
             self.log.debug("_all:{}".format(_all))
-            t.update(labels=_all)
+            queue_update(t, labels=_all)
             self._emit_event('label_apply', t)
 
             # Since we're iterating through tasks, now is a good time to process any of the filter.*.option.mutate:true
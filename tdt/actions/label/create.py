@@ -3,10 +3,7 @@ Creates Labels from a given ToDoist account.
 
 """
 from tdt.actions.label import LabelAction
-
-
-# Debugging
-from prettyprinter import pprint as pp
+from tdt.utils.names import get_label_index
 
 
 class LabelCreateAction(LabelAction):
@@ -53,7 +50,15 @@ class LabelCreateAction(LabelAction):
 
         self.log.info("Creating {} new labels...".format(len(_new)))
 
+        # Queue every new label and send them all in one commit. The index learns about each label as it is queued so
+        #   the same label (even w/ different case) is never queued twice
+        ##
+        _index = get_label_index(self.api_client)
         for _l in _new:
+            if _l in _index:
+                self.log.warning("⚠️ {}://{} is already queued for creation, skipping...".format(self.component, _l))
+                continue
+
             # The _lbl does not have a matching ID... so that's our queue to create it!
             self.log.debug("There is no matching ID for label:{}. Creating...".format(_l))
 
@@ -72,6 +77,7 @@ class LabelCreateAction(LabelAction):
 
             # Note: is_favorite needs a 1 or 0, not True, False :/
             _r = self.api_client.labels.add(name=_l, color=_c, is_favorite=int(_f))
+            _index.add(_r)
             self._emit_event('label_create', _r)
 
         return self._commit_changes()
@@ -3,12 +3,9 @@ Deletes Labels
 """
 import re
 
-from tdt.actions.utils import get_component_by_ids, delete_component_by_ids, get_components_by_name_with_regex,\
+from tdt.actions.utils import delete_component_by_ids, get_components_by_name_with_regex,\
     parse_regex_options
 
-# Debugging
-from prettyprinter import pprint as pp
-
 from tdt.actions.label import LabelAction
 
 
@@ -52,7 +49,7 @@ class LabelDeleteAction(LabelAction):
         # Iterate through each of the user-given objects and perform additional validation and resource resolution as
         #   needed.
         ##
-        self._emit_event('{}_{}'.format(self.component, self.action))
+        self._emit_event('{}_{}'.format(self.component, self.action), self._component_ids)
         delete_component_by_ids(self.api_client, self.component, self._component_ids)
 
         # After adding all the $components, commit changes.
@@ -71,21 +68,16 @@ class LabelDeleteAction(LabelAction):
             self.log.error(_e)
             raise ValueError(_e)
 
+        # Check every explicit ID w/ a single walk of the labels, rather than one walk per ID
+        _existing = self._get_existing_ids(value)
+
         # Check for any IDs or filters
         for obj in value:
             if 'id' in obj:
-                self.log.debug("Validating {}://...".format(self.component, obj['id']))
-                _cmp = get_component_by_ids(self.api_client, self.component, [obj['id']])
-                # If we didn't get _one_ component back, emit a warning and move on. If we did get ONE back then
-                #   we can be very occident that it exists in the users account and is therefore able to be deleted.
+                # If the ID doesn't exist, we've already warned about it. If it does then we can be very confident
+                #   that it exists in the users account and is therefore able to be deleted.
                 ##
-                if len(_cmp) != 1:
-                    self.log.debug("... Invalid!")
-                    _w = "⚠️ Was not able to confirm existence of {}://{}! Will not {} it!"\
-                        .format(self.component, obj['id'], self.action)
-                    self.log.warning(_w)
-                    continue
-                else:
+                if obj['id'] in _existing:
                     self.log.debug("... Valid! Will {} {}://{}".format(self.action, self.component, obj['id']))
                     self._component_ids.append(obj['id'])
             else:
@@ -11,10 +11,10 @@ import re
 import todoist
 
 from tdt.actions.utils import parse_regex_options, get_components_by_name_with_regex
+from tdt.utils.commands import queue_update
 
 
 # debugging
-from prettyprinter import pprint as pp
 
 log = logging.getLogger(__name__)
 
@@ -46,14 +46,11 @@ def remove_component_attribute_by_regex(t: todoist.api.models.Item, filter_obj:
     # Build regex for label lookup
     _query_re = re.compile(_query, flags=_re_flags)
 
-    # Anything that matches _query_re in t['content'] replace with ''
-    t[attribute] = re.sub(_query_re, '', t[attribute]).strip()
-
-    # Set the value of _component directly to the thing we're updating
-    _kwa = {attribute: t[attribute]}
+    # Anything that matches _query_re in t['content'] replace with ''. The update sets it on t, too
+    _kwa = {attribute: re.sub(_query_re, '', t[attribute]).strip()}
     # Dump the kwargs for debugging :)
     log.debug("_kwa :{}".format(_kwa))
-    return t.update(**_kwa)
+    return queue_update(t, **_kwa)
 
 
 def remove_component_by_ids(api_client: todoist.api.TodoistAPI, t: todoist.api.models.Item, filter_obj: dict,
@@ -100,4 +97,4 @@ def remove_component_by_ids(api_client: todoist.api.TodoistAPI, t: todoist.api.m
     _kwa = {component: list(_remaining)}
     # Dump the kwargs for debugging :)
     log.debug("_kwa :{}".format(_kwa))
-    return t.update(**_kwa)
+    return queue_update(t, **_kwa)
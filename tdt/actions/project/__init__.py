@@ -5,12 +5,9 @@
 # Inherit from...
 import copy
 
-from tdt.actions.utils import get_relevant_tasks, delete_component_by_ids, get_components_by_name_with_strings
+from tdt.actions.utils import delete_component_by_ids, get_components_by_name_with_strings
 from tdt.actions.action import Action
 
-# Debugging
-from prettyprinter import pprint as pp
-
 
 class ProjectAction(Action):
 
@@ -138,7 +135,7 @@ class ProjectAction(Action):
         self.log.debug("Expanding {} filters into '{}' name(s)...".format(len(_filters), self.component))
 
         # Get the tasks that match the filters
-        _originating_tasks, _source_selectors = get_relevant_tasks(self.api_client, _filters, self._assumed_tz)
+        _originating_tasks, _source_selectors = self._get_relevant_tasks(_filters)
         if len(_originating_tasks) < 1:
             # Emit a warning if no tasks came back
             _w = "Got back no _originating_tasks matching the {} filters. Can't create project from nothing!" \
@@ -2,14 +2,17 @@
 Creates Projects
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import todoist
 
-from tdt.actions.utils import get_component_by_ids, get_components_by_name_with_strings
 from tdt.actions.mutators import remove_component_attribute_by_regex
 from tdt.actions.project import ProjectAction
+from tdt.utils.names import NameIndex
+from tdt.utils.projects import get_project_tree
 
-# Debugging
-from prettyprinter import pprint as pp
+# How many templates are uploaded at once
+template_import_workers = 4
 
 
 class ProjectCreateAction(ProjectAction):
@@ -30,6 +33,11 @@ class ProjectCreateAction(ProjectAction):
             'task.content': '_remove_task_title_match'
         }
 
+        # Every project, by name. Built (at most) once per do_work() so that resolving the parent of every new project
+        #   does not mean walking every project for each of them
+        ##
+        self._name_index = None
+
     def do_work(self, action_params: dict):
         """
         Does the work of ProjectCreateAction
@@ -40,8 +48,7 @@ class ProjectCreateAction(ProjectAction):
 
         # set projects; triggers fetch of project_ids as well as a validation measure
         self.components = action_params[self.component]
-
-
+        self._name_index = None
 
         # We'll now have a list of all the _known_ projects and their IDs. Iterate through the full list of projects
         #   that the caller gave us and find the Projects that are _missing_. Those are the ones that we'll need to
@@ -62,6 +69,9 @@ class ProjectCreateAction(ProjectAction):
         self.log.info("ℹ️ Of the {} {} to create, {} already exist, will create {}..."
                       .format(len(self.components), self.component, len(_existing), len(_new)))
 
+        # (project, template file) for each new project that is to be seeded from a template
+        _templated = []
+
         for _component_name in _new:
             _component_obj = self.components[_component_name]
             # We need to do a bit of data type munging to comply with the todoist API
@@ -89,11 +99,17 @@ class ProjectCreateAction(ProjectAction):
             _r = self.api_client.projects.add(**_kwa)
             self._emit_event('project_add', _r)
 
-            # If the user wants to 'seed' the project from a template, we do so now
+            # A project that comes later may use this one as its parent
+            if self._name_index is not None:
+                self._name_index.add(_r)
+
+            # If the user wants to 'seed' the project from a template, we do so once all the projects exist
             if 'template' in _component_obj:
-                self.log.debug("Seeding {}://'{}' with file://{}".format(self.component, _component_name,
-                                                                         _component_obj['template']['file']))
-                self._seed_project_with_template(_r, _component_obj['template']['file'])
+                _templated.append((_r, _component_obj['template']['file']))
+
+        # Templates can only be imported into projects that the server knows about
+        if len(_templated) > 0:
+            self._seed_projects_with_templates(_templated)
 
         # After adding all the $components, commit changes.
         _r = self._commit_changes()
@@ -106,9 +122,9 @@ class ProjectCreateAction(ProjectAction):
     def _remove_task_title_match(t: todoist.api.models.Item, filter_obj: dict):
         return remove_component_attribute_by_regex(t, filter_obj, component='task', attribute='content')
 
-    def _seed_project_with_template(self, project: todoist.api.models.Project, template_file: str):
+    def _seed_projects_with_templates(self, templated: list):
         """
-        Applies a template to a project.
+        Applies a template to each of the new projects.
 
         The todoist API is smart enough to use UUIDs under the hood for for changes that only exist
           locally. That is, we can get an ID for the project that's JUST been created even though we've
@@ -128,46 +144,62 @@ class ProjectCreateAction(ProjectAction):
 
         But this behavior does NOT apply to template uploads, unfortunately. The import_into_project() call does not
             support batching. It runs IMMEDIATELY and can't work with temp UUIDs.
-
-        So this means that we are required to commit() immediately after creating the new project. Then
-            we can consult our local cache for the updated/not-temp project ID. It's not ideal, but
-            as long as we're making many API requests per min, we should not hit any rate-limiting.
-
             See: https://github.com/Doist/todoist-python/issues/69
 
-        :param project:
-        :param template_file:
+        So we create ALL the new projects w/ one commit(). The response to that commit maps each temp UUID to the
+            real ID, the templates are then uploaded a few at a time and one (incremental) sync() at the end brings
+            the tasks from all the templates into the local cache.
+
+        :param templated: list of (project, template_file)
         :return:
         """
-        # Force a sync w/ the server to make sure any newly created projects get actual IDs
-        self._commit_changes(do_sync=True)
-
-        # Assuming nothing was thrown, we should be OK to query the cache for the updated project ID
-        _prj = get_components_by_name_with_strings(self.api_client, 'projects', [project['name']])
-
-        if len(_prj) != 1:
-            # If we couldn't get the project ID... despite having just? created it... then we certainly
-            #   can't upload the template to it! Treat this as an error, but not fatal.
-            _e = "Unable to obtain the project ID that template_file:`{}` should be uploaded to. " \
-                 "This likely means that the project was not created. :(".format(template_file)
-            self.log.error(_e)
-            return False
-
-        # Length of 1, unwrap
-        _prj = _prj.pop()
-
-        # Otherwise, let's try the upload!
-        self.log.debug("Attempting to apply the template file:`{}` to the _new_prj:`{}`/({})"
-                       .format(template_file, _prj['name'], _prj['id']))
-
-        self.api_client.templates.import_into_project(_prj['id'], template_file)
-        # `import_into_project` does not update the local cache... so we must do so now
-        _r = self._commit_changes(do_sync=True)
-        # TODO: what data too fire off?
-        self._emit_event('project_seed')
+        if self.dry_run:
+            self.log.info("🟡 Would have seeded {} {} from templates but --dry-run:`{}` prevents us from going further!"
+                          .format(len(templated), self.component, self.dry_run))
+            return
 
-        # And assuming that nothing blew up, return!
-        return _r
+        # One commit for all the projects
+        self._commit_changes(force=True)
+
+        # The commit response told the client what each temp UUID is now
+        _uploads = []
+        for _prj, _template_file in templated:
+            _pid = self.api_client.temp_ids.get(_prj.temp_id, _prj['id'])
+            if isinstance(_pid, str) and _pid.startswith('$'):
+                # If we couldn't get the project ID... despite having just? created it... then we certainly
+                #   can't upload the template to it! Treat this as an error, but not fatal.
+                _e = "Unable to obtain the project ID that template_file:`{}` should be uploaded to. " \
+                     "This likely means that the project was not created. :(".format(_template_file)
+                self.log.error(_e)
+                continue
+            _uploads.append((_pid, _prj['name'], _template_file))
+
+        # Each import is its own HTTP request; run a few at once
+        _workers = min(template_import_workers, len(_uploads)) or 1
+        self.log.info("📑 Importing {} template(s), {} at a time...".format(len(_uploads), _workers))
+        with ThreadPoolExecutor(max_workers=_workers) as pool:
+            _futures = {pool.submit(self.api_client.templates.import_into_project, _pid, _file): (_pid, _name, _file)
+                        for _pid, _name, _file in _uploads}
+            for _f in as_completed(_futures):
+                _pid, _name, _file = _futures[_f]
+                try:
+                    _f.result()
+                    self.log.debug("Applied the template file:`{}` to `{}`/({})".format(_file, _name, _pid))
+                    self._emit_event('project_seed', _pid, {'template': _file})
+                except Exception as e:
+                    self.log.error("Unable to apply the template file:`{}` to `{}`/({}): {}".format(
+                        _file, _name, _pid, e))
+
+        # `import_into_project` does not update the local cache... so we must do so now, once for all of them
+        self.api_client.sync()
+
+    def _get_name_index(self):
+        """
+        :return: the NameIndex of every project, built the first time it's needed
+        """
+        if self._name_index is None:
+            self._name_index = NameIndex(self.api_client, self.component)
+        return self._name_index
 
     def _get_parent_prj_id(self, component_obj: dict):
         """
@@ -189,9 +221,7 @@ class ProjectCreateAction(ProjectAction):
             # The user _has_ specified a parent project by ID, we need to verify that it exists!
             _pid = parent['id']
             self.log.debug("Determining if parent {}://{} is valid...".format(self.component, _pid))
-            _components = get_component_by_ids(self.api_client, self.component, [_pid])
-
-            if len(_components) != 1:
+            if _pid not in get_project_tree(self.api_client):
                 # User told us to use an ID as a parent task, we can't confirm that it _is_ a parent task. ABORT!
                 _e = "...Unable to determine that {}://{} is valid! Will abort!".format(self.component, _pid)
                 self.log.error(_e)
@@ -204,7 +234,7 @@ class ProjectCreateAction(ProjectAction):
             # Like w/ the case of the 'naked' ID, we need to turn any string into oa project, too
             _prj = parent['project']
             self.log.debug("Determining if parent {}://{} exists...".format(self.component, _prj))
-            _components = get_components_by_name_with_strings(self.api_client, self.component, [_prj])
+            _components = self._get_name_index().find(_prj)
 
             # If we get 0 results, it means that the project does nto *YET* exist. It may be that the user has
             #   already asked for us to create it, however.
@@ -8,9 +8,6 @@ from tdt.actions.project import ProjectAction
 
 from tdt.actions.utils import get_components_by_name_with_regex
 
-# Debugging
-from prettyprinter import pprint as pp
-
 
 class ProjectDeleteAction(ProjectAction):
 
@@ -51,8 +48,8 @@ class ProjectDeleteAction(ProjectAction):
                     # Run the filter to get the projects
                     _projects = get_components_by_name_with_regex(self.api_client, self.component, _projects_title_re)
 
-                    # For each project that we got, store
-                    self._component_ids = {_x['name']: _x['id'] for _x in _projects}
+                    # For each project that we got, store. Every filter (and ID) adds to the projects to delete
+                    self._component_ids.update({_x['name']: _x['id'] for _x in _projects})
                 continue
 
             if 'id' in _from:
@@ -68,7 +65,7 @@ class ProjectDeleteAction(ProjectAction):
                     continue
 
                 # Unwrap the 1 result
-                self._component_ids = {_x['name']: _x['id'] for _x in _lbl}
+                self._component_ids.update({_x['name']: _x['id'] for _x in _lbl})
 
     def do_work(self, action_params: dict):
         """
@@ -88,13 +85,18 @@ class ProjectDeleteAction(ProjectAction):
         _existing = set(self._component_ids)
 
         # Delete the component(s) that exist
+        _cids = []
         for _component_name in _existing:
             # _existing is a set of all the _names_ of existing $component. We need to get the ID that belongs to the
             #   name before we can make the delete call
             ##
             _cid = self._component_ids[_component_name]
             self._emit_event('{}_{}'.format(self.component, self.action), _cid)
-            delete_component_by_ids(self.api_client, self.component, [_cid])
+            _cids.append(_cid)
+
+        # All in one go so that child projects of a project we're deleting don't get a delete of their own
+        if len(_cids) > 0:
+            delete_component_by_ids(self.api_client, self.component, _cids)
 
         # After deleting all the $components, commit changes.
         return self._commit_changes()
@@ -6,9 +6,6 @@ from tdt.actions.action import Action
 from datetime import date, timedelta
 from tdt.utils.date import get_todoist_formatted_string_from_datetime
 
-# Debugging
-from prettyprinter import pprint as pp
-
 
 class TaskAction(Action):
 
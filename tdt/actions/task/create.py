@@ -1,10 +1,9 @@
 """
 Creates Tasks
 """
-from tdt.actions.utils import get_components_by_name_with_strings
+import todoist
 
-# Debugging
-from prettyprinter import pprint as pp
+from tdt.utils.names import NameIndex
 
 from tdt.actions.task import TaskAction
 
@@ -28,6 +27,20 @@ class TaskCreateAction(TaskAction):
             'labels': []
         }
 
+        # component -> NameIndex. Built (at most) once per do_work() so that resolving the names for every item in the
+        #   job file does not mean walking every project/section/task/label for every item
+        ##
+        self._name_indexes = {}
+
+        # options.unique_by -> the property of a todoist task that holds it
+        self._unique_by_fields = {
+            'content': 'content',
+            'project': 'project_id',
+            'parent': 'parent_id',
+            'section': 'section_id',
+            'labels': 'labels'
+        }
+
     def do_work(self, action_params: dict):
         """
         Does the work of ProjectCreateAction
@@ -37,11 +50,23 @@ class TaskCreateAction(TaskAction):
 
         # Store the things that the user has asked us to create
         self.components = action_params[self.component]
+        self.action_params = action_params
+        self._name_indexes = {}
+
+        # If the user wants to avoid duplicates, index every existing task on the unique_by properties once. Each task
+        #   we are about to create then costs a single lookup
+        ##
+        _unique_by = self.options['unique_by'] if self._options is not None and 'unique_by' in self._options else None
+        _existing = None
+        _skipped = 0
+        if _unique_by is not None:
+            _existing = self._get_unique_index(_unique_by)
+            self.log.debug("Indexed {} existing task(s) by {}".format(len(_existing), _unique_by))
 
         # Iterate through each of the user-given objects and perform additional validation and resource resolution as
         #   needed.
         ##
-        for _component_name, _component_obj in self.components.items():
+        for _component_name, _component_obj in self.components:
 
             # There are three different 'properties' that a user can set via ID or by String.
             # We check for any string(s) and resolve them to IDs.
@@ -102,13 +127,89 @@ class TaskCreateAction(TaskAction):
 
             }
             self.log.debug("_kwa :{}".format(_kwa))
+
+            if _existing is not None:
+                _key = self._get_unique_key(_kwa, _unique_by)
+                if _key in _existing:
+                    self.log.info("⏭️ Not creating {}://{}; task://{} has the same {}".format(
+                        self.component, _component_name, _existing[_key], _unique_by))
+                    _skipped += 1
+                    continue
+
             _r = self.api_client.items.add(**_kwa)
 
+            # A later item may well use this one as its parent_task
+            if 'items' in self._name_indexes:
+                self._name_indexes['items'].add(_r)
+
+            # A second, identical, item in the job file is a duplicate as well
+            if _existing is not None:
+                _existing[_key] = _r['id']
+
             self._emit_event('task_create', _r)
 
+        if _existing is not None:
+            self.log.info("Skipped {} of {} task(s) that already exist".format(_skipped, len(self.components)))
+
         # After adding all the $components, commit changes.
         return self._commit_changes()
 
+    def _get_unique_key(self, task, unique_by: list):
+        """
+        The value of each unique_by property for a task (or the kwargs for a task we're about to create)
+        :param task: a todoist task or the items.add() kwargs
+        :param unique_by: the properties to use
+        :return: a hashable tuple
+        """
+        # Tasks that were added locally (earlier in this run) only have the properties they were created with
+        _data = task.data if isinstance(task, todoist.api.models.Model) else task
+
+        _key = []
+        for _prop in unique_by:
+            _v = _data.get(self._unique_by_fields[_prop])
+
+            # Labels are a set as far as todoist is concerned
+            if _prop == 'labels':
+                _v = frozenset(_v or [])
+
+            # The API wants 'null' for 'no parent/section' while existing tasks have None (or 0, for old ones)
+            elif _v in ('null', 0):
+                _v = None
+
+            # No project means the inbox
+            if _prop == 'project' and _v is None:
+                _v = self._get_inbox_project_id()
+
+            _key.append(_v)
+        return tuple(_key)
+
+    def _get_unique_index(self, unique_by: list):
+        """
+        Indexes every open task by its unique_by key
+        :param unique_by:
+        :return: dict of key -> task_id
+        """
+        _index = {}
+        for _t in self.api_client.state['items']:
+            # Completed tasks don't count; a recurring template job should be able to create the task again
+            if _t.data.get('checked') or _t.data.get('is_deleted'):
+                continue
+            _index[self._get_unique_key(_t, unique_by)] = _t['id']
+        return _index
+
+    def _get_inbox_project_id(self):
+        """
+        :return: the ID of the user's inbox project, or None if we can't tell
+        """
+        _user = self.api_client.state.get('user') or {}
+        if 'inbox_project' in _user:
+            return _user['inbox_project']
+
+        for _p in self.api_client.state['projects']:
+            if _p.data.get('inbox_project'):
+                return _p['id']
+        return None
+
     @TaskAction.components.setter
     def components(self, value: list):
         """
@@ -116,20 +217,15 @@ class TaskCreateAction(TaskAction):
 
         As task_create does not support filters, we don't bother doing anything significant here
         """
-        # We pull out the 'name' (called content) and use that as the key to the rest of the properties
+        # We pull out the 'name' (called content) and keep it alongside the rest of the properties. Two items w/ the
+        #   same content (in different projects, say) are two different tasks, so this is a list and not a dict
+        ##
+        self._component_objs = []
         for o in value:
             _component_name = o.pop('content')
-            self._component_objs[_component_name] = o
+            self._component_objs.append((_component_name, o))
 
-        ##
-        # TODO: it would be nice to have a 'dont-create-duplicate-tasks' flag that would walk each object in
-        #   self.components to see if there is an existing task by the same content and parent project  (and labels,
-        #   child_order ... etc)
-        #
-        # The code to do this will be a PITA as it'll mean resolving each (label, parent_project, parent_task)
-        #   string to an ID and then looking through every task under the parent project for an identical name
-        #   if the name matches, then check the rest of the properties...
-        ##
+        # Note: avoiding duplicate tasks is opt-in via options.unique_by, see do_work()
 
     def _resolve_strings_to_ids(self, component_obj: dict):
         """
@@ -161,7 +257,7 @@ class TaskCreateAction(TaskAction):
                 # Which property will we fetch?
                 ##
                 # Note: We do need to do a little bit of mapping between the fields that the user
-                #   will provide and what get_components_by_name_with_strings wants. This is not ideal, but
+                #   will provide and the components that todoist has. This is not ideal, but
                 #   it saves the user from confusion when they have to enter ONLY ONE STRING for
                 #   a field called 'projects'.
                 ##
@@ -186,11 +282,30 @@ class TaskCreateAction(TaskAction):
                     ##
                     _q = [component_obj[prop]['name']]
 
-                _things = get_components_by_name_with_strings(self.api_client, _p, _q)
+                # Sections and parent tasks live in a project. If we know the project, look there first; a section
+                #   called 'Chores' in some other project does not make this one ambiguous
+                ##
+                _index = self._get_name_index(_p)
+                _things = []
+                if prop in ['section', 'parent_task'] and len(self._property_name_to_id_map['project']) == 1:
+                    _things = _index.find_all(_q, project_id=self._property_name_to_id_map['project'][0])
+
+                # Nothing by that name in the project (or no project); look everywhere
+                if len(_things) < 1:
+                    _things = _index.find_all(_q)
 
                 # We'll get back the full result set, but only care about the IDs
                 self._property_name_to_id_map[prop] = [_t['id'] for _t in _things]
 
+    def _get_name_index(self, component: str):
+        """
+        :param component: one of projects, sections, items, labels
+        :return: the NameIndex for component, built the first time it's needed
+        """
+        if component not in self._name_indexes:
+            self._name_indexes[component] = NameIndex(self.api_client, component)
+        return self._name_indexes[component]
+
     def _validate_resolved_ids(self):
         """
         :return:
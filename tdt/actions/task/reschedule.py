@@ -3,13 +3,11 @@ Reschedules Tasks
 """
 from datetime import timedelta
 
-from tdt.actions.utils import get_component_by_ids, get_relevant_tasks
-
-# Debugging
-from prettyprinter import pprint as pp
+from tdt.actions.utils import get_components_by_ids_bulk
 
 from tdt.actions.task import TaskAction
 from tdt.utils.date import get_tz_aware_task_due_date, get_todoist_formatted_string_from_datetime
+from tdt.utils.commands import queue_update
 
 
 class TaskRescheduleAction(TaskAction):
@@ -48,9 +46,13 @@ class TaskRescheduleAction(TaskAction):
         # Iterate through each of the user-given objects and perform additional validation and resource resolution as
         #   needed.
         ##
-        # fetch the task for each of the user / resolved IDs
-        _tasks = get_component_by_ids(self.api_client, self.component, self._component_ids)
+        # fetch every one of the user / resolved IDs in one go. A task that was both given by ID and matched by a
+        #   filter is only rescheduled once
+        ##
+        _found, _ = get_components_by_ids_bulk(self.api_client, self.component, self._component_ids)
+        _tasks = [_found[_tid] for _tid in dict.fromkeys(self._component_ids) if _tid in _found]
         for t in _tasks:
+            _due = self.due
             # If the user gave us a timedelta object, then they want to postpone the task. It is impossible
             #   for a task w/ no explicit due date to be postponed by any length of time so we skip them :)
             ##
@@ -65,15 +67,17 @@ class TaskRescheduleAction(TaskAction):
                     _task_due = get_tz_aware_task_due_date(t, self._assumed_tz)
                     # Add the offset
                     _task_due = _task_due + self.due
-                    # We need to turn the adjusted into a new due{} object
-                    self.due = {'date': get_todoist_formatted_string_from_datetime(_task_due)}
+                    # We need to turn the adjusted into a new due{} object. Each task gets its own; self.due is the
+                    #   offset for *all* of them
+                    ##
+                    _due = {'date': get_todoist_formatted_string_from_datetime(_task_due)}
 
             # Now that all the (known) strings are resolved to IDs, we can create the task!
             self.log.debug("{} {}://{} ({}) to: {}".format(self.action, self.component, t['id'], t['content'],
-                                                           self.due))
-            t.update(due=self.due)
+                                                           _due))
+            queue_update(t, due=_due)
 
-        self._emit_event('{}_{}'.format(self.component, self.action))
+        self._emit_event('{}_{}'.format(self.component, self.action), [t['id'] for t in _tasks])
         return self._commit_changes()
 
     @TaskAction.components.setter
@@ -83,26 +87,21 @@ class TaskRescheduleAction(TaskAction):
         If id, then all we need to do is verify that it exists
         If filter(s) then we resolve them to IDs.
         """
+        # Check every explicit ID w/ a single walk of the tasks, rather than one walk per ID
+        _existing = self._get_existing_ids(value)
+
         # Check for any IDs
         for obj in value:
             if 'id' in obj:
-                self.log.debug("Validating {}://...".format(self.component, obj['id']))
-                _cmp = get_component_by_ids(self.api_client, self.component, [obj['id']])
-                # If we didn't get _one_ component back, emit a warning and move on. If we did get ONE back then
-                #   we can be very occident that it exists in the users account and is therefore able to be deleted.
+                # If the ID doesn't exist, we've already warned about it. If it does then we can be very confident
+                #   that it exists in the users account and is therefore able to be rescheduled.
                 ##
-                if len(_cmp) != 1:
-                    self.log.debug("... Invalid!")
-                    _w = "⚠️ Was not able to confirm existence of {}://{}! Will not {} it!"\
-                        .format(self.component, obj['id'], self.action)
-                    self.log.warning(_w)
-                    continue
-                else:
+                if obj['id'] in _existing:
                     self.log.debug("... Valid! Will {} {}://{}".format(self.action, self.component, obj['id']))
                     self._component_ids.append(obj['id'])
             else:
                 self.log.debug("Parsing {} from filter...".format(self.component))
-                _items, _ = get_relevant_tasks(self.api_client, [obj], self._assumed_tz)
+                _items, _ = self._get_relevant_tasks([obj])
                 x = [_itm['id'] for _itm in _items]
                 self.log.debug("... got {} ids".format(len(x)))
                 self._component_ids.extend(x)
@@ -16,16 +16,33 @@ import re
 from pytz import timezone
 
 from tdt.utils.date import get_tz_aware_task_due_date
+from tdt.utils.delta import SyncDelta
+from tdt.utils.projects import get_project_tree
 
-# Debugging
-from prettyprinter import pprint as pp
 
-def get_tasks_by_title_with_regex(client: todoist.TodoistAPI, pattern: re.Pattern):
+def get_candidate_tasks(client: todoist.TodoistAPI, task_scope: set = None):
+    """
+    Returns the tasks that a search should even look at. Normally that's every task, but when we're reacting to a
+        handful of changed tasks (webhook events) there's no point evaluating the filters against every other task.
+
+    :param client: The todoist client
+    :param task_scope: If set, the set of task IDs to restrict the search to
+    :return:
+    """
+    # An earlier action in this run may have deleted a task (or its project); it's still in the local state until the
+    #   next sync
+    if task_scope is None:
+        return [t for t in client['items'] if not t.data.get('is_deleted')]
+    return [t for t in client['items'] if t['id'] in task_scope and not t.data.get('is_deleted')]
+
+
+def get_tasks_by_title_with_regex(client: todoist.TodoistAPI, pattern: re.Pattern, tasks: list = None):
     """
     Simple helper function that compares all task.titles against a regex
 
     :param pattern: The regex pattern to filter
     :param  client: The todoist client
+    :param tasks: If set, only these tasks are compared. Otherwise, every task is.
 
     :return:
     """
@@ -36,7 +53,7 @@ def get_tasks_by_title_with_regex(client: todoist.TodoistAPI, pattern: re.Patter
     # The tasks that match will be added here and then returned to caller
     matching_tasks = []
 
-    for t in client['items']:
+    for t in (client['items'] if tasks is None else tasks):
         # Pull out the "content" of the item
         _name = t['content']
 
@@ -88,7 +105,34 @@ def get_tasks_by_label_id(client=todoist.TodoistAPI, find=int):
     return matching_tasks
 
 
-def get_relevant_tasks(client: todoist.TodoistAPI, filters: dict, assumed_tz: timezone):
+def _filters_use_relative_dates(filters: list):
+    """
+    A filter like 'due before today' can start matching a task without the task itself changing
+    :param filters:
+    :return:
+    """
+    for f in filters:
+        if 'relative' in f.get('task', {}).get('date', {}):
+            return True
+    return False
+
+
+def _get_queued_task_ids(client: todoist.TodoistAPI):
+    """
+    Tasks that an earlier action changed locally (but hasn't committed yet) won't show up in a sync until after the
+        commit, so they have to be treated as changed, too
+    :param client:
+    :return:
+    """
+    _ids = set()
+    for _cmd in client.queue:
+        if _cmd['type'].startswith('item_'):
+            _ids.add(_cmd['args'].get('id', _cmd.get('temp_id')))
+    return _ids
+
+
+def get_relevant_tasks(client: todoist.TodoistAPI, filters: dict, assumed_tz: timezone, task_scope: set = None,
+                       delta: SyncDelta = None, previous_matches: set = None):
     """
     A high-level function that takes the user provided, validated filters object and gathers the appropriate tasks
         based on the selection criteria in the filter(s).
@@ -98,10 +142,26 @@ def get_relevant_tasks(client: todoist.TodoistAPI, filters: dict, assumed_tz: ti
     :param client:  The todoist client
     :param filters: The dict of task/label strings
     :param assumed_tz: The client's assumed/local time-zone
+    :param task_scope: If set, only tasks with these IDs are considered. See get_candidate_tasks()
+    :param delta: If set, what changed in the last sync. Used along with previous_matches for delta evaluation
+    :param previous_matches: The IDs of the tasks that these filters matched after the previous sync
     :return:
     """
     log = logging.getLogger(__name__)
 
+    # In delta mode, the only tasks that can match are the ones that changed and the ones that matched last time.
+    #   Everything else is known not to match. That only holds if nothing 'global' changed and the filters don't
+    #   depend on the current date/time, though
+    ##
+    if delta is not None:
+        if delta.invalidated or previous_matches is None or _filters_use_relative_dates(filters):
+            log.debug("Delta evaluation not possible; evaluating every task...")
+        else:
+            _scope = delta.items | previous_matches | _get_queued_task_ids(client)
+            task_scope = _scope if task_scope is None else task_scope & _scope
+            log.debug("Delta evaluation: {} changed + {} previous match(es)".format(
+                len(delta.items), len(previous_matches)))
+
     ##
     # After a lot of deliberation, I've decided to go all out on how searching works.
     # The user can supply multiple filter objects. The _result_ of each filter will be ORd together.
@@ -118,7 +178,7 @@ def get_relevant_tasks(client: todoist.TodoistAPI, filters: dict, assumed_tz: ti
 
     for f in filters:
         # get the tasks and the selector(s) that 'originated' the task
-        _tasks, _selectors = _do_search(client, f, assumed_tz)
+        _tasks, _selectors = _do_search(client, f, assumed_tz, task_scope)
         ##
         # In order to properly honor the option.remove flag from each filter, we _also_ need to keep track of
         #   which filter block 'matched' the tasks.
@@ -129,14 +189,18 @@ def get_relevant_tasks(client: todoist.TodoistAPI, filters: dict, assumed_tz: ti
     return _all_tasks, _all_selectors
 
 
-def _do_search(client: todoist.TodoistAPI, filter_obj: dict, tz: timezone('UTC')):
+def _do_search(client: todoist.TodoistAPI, filter_obj: dict, tz: timezone('UTC'), task_scope: set = None):
     """
     Actually does the dirty work of processing a filter object
     :param filter:
+    :param task_scope: If set, only tasks with these IDs are considered
     :return:
     """
     log = logging.getLogger(__name__)
 
+    # Every selector below walks the same list of tasks
+    _candidates = get_candidate_tasks(client, task_scope)
+
     # For now, we only support retrieving tasks by title, label. In the future, i'd like to support:
     #   - by comment
     #
@@ -200,7 +264,7 @@ def _do_search(client: todoist.TodoistAPI, filter_obj: dict, tz: timezone('UTC')
             log.debug("👀 Searching for tasks that contain `{}` in their title...".format(_task_title_re))
 
             # Fire off the query to get all matching tasks... we'll further reduce the results (if needed) later
-            _tasks_by_title.update(get_tasks_by_title_with_regex(client, _task_title_re))
+            _tasks_by_title.update(get_tasks_by_title_with_regex(client, _task_title_re, _candidates))
             log.debug("{} contains {} tasks".format('_tasks_by_title', len(_tasks_by_title)))
 
             for _t in _tasks_by_title:
@@ -265,7 +329,7 @@ def _do_search(client: todoist.TodoistAPI, filter_obj: dict, tz: timezone('UTC')
                 _when = _w
 
             log.info("👀 Searching for tasks that occurred '{}' the date `{}`...".format(_direction, _when))
-            for t in client['items']:
+            for t in _candidates:
 
                 # Pass in the task and the user's local timezone to get back
                 #   a localized task due date or None if the task has no due date
@@ -322,7 +386,7 @@ def _do_search(client: todoist.TodoistAPI, filter_obj: dict, tz: timezone('UTC')
         # If th user asks for tasks w/ no label, then find all tasks w/ no labels :)
         if 'absent' in filter_obj['labels']:
             log.debug("user has told us to find tasks with NO LABEL")
-            for t in client['items']:
+            for t in _candidates:
                 if len(t['labels']) < 1:
                     _tasks_by_label.add(t)
 
@@ -346,7 +410,7 @@ def _do_search(client: todoist.TodoistAPI, filter_obj: dict, tz: timezone('UTC')
 
                 # List comprehension syntax gets UGLY if you go more than 1 level so write this out in a readable way
                 ##
-                for t in client['items']:
+                for t in _candidates:
                     for _l in t['labels']:
                         if _l in _matching_label_ids:
                             _tasks_by_label.add(t)
@@ -372,11 +436,15 @@ def _do_search(client: todoist.TodoistAPI, filter_obj: dict, tz: timezone('UTC')
         if len(_matching_projects) > 0:
             # We have found some set of projects that match the regex. Now we must pull out the project IDs!
             log.info("... found {} Projects matching the selectors".format(len(_matching_projects)))
-            _matching_project_ids = [_p['id'] for _p in _matching_projects]
+            _matching_project_ids = {_p['id'] for _p in _matching_projects}
+
+            if filter_obj['projects'].get('include_subprojects', False):
+                _matching_project_ids = get_project_tree(client).expand(_matching_project_ids)
+                log.info("... which, w/ their sub-projects, is {} Projects".format(len(_matching_project_ids)))
 
             # List comprehension also gts ugly w/ conditionals :/
             ##
-            for t in client['items']:
+            for t in _candidates:
                 if t['project_id'] in _matching_project_ids:
                     _tasks_by_project.add(t)
 
@@ -531,10 +599,12 @@ def get_component_by_ids(api_client: todoist.TodoistAPI, component: str, compone
     _matches = []
 
     log.debug("Will look for '{}' matching {} queries...".format(component, len(component_ids)))
+    # A set makes each check O(1) rather than a walk of the queries
+    _wanted = set(component_ids)
     # The Todoist API has a Mixin for all()
     for thing in getattr(api_client, component).all():
         # Check if the name of $thing is in the  list of queries
-        if thing['id'] in component_ids:
+        if thing['id'] in _wanted:
             _matches.append(thing)
 
     # We've made a best effort to find all $component that match each supplied query.
@@ -558,6 +628,148 @@ def get_component_by_ids(api_client: todoist.TodoistAPI, component: str, compone
     return _matches
 
 
+def get_components_by_ids_bulk(api_client: todoist.TodoistAPI, component: str, component_ids: [int]):
+    """
+    Looks up many $component IDs w/ a single walk of the $components; the IDs that don't exist are reported once,
+        together, rather than one warning per ID.
+
+    :param api_client:
+    :param component:
+    :param component_ids:
+    :return: tuple of ({id: component} for the IDs that exist, [IDs that don't])
+    """
+    log = logging.getLogger(__name__)
+
+    # Make sure the caller is asking for something we know how to  fetch
+    if component not in ['labels', 'projects', 'items', 'sections']:
+        _e = "Don't know how to query todoist for component:{}".format(component)
+        log.error(_e)
+        raise TDTException(_e)
+
+    _wanted = set(component_ids)
+    _found = {}
+    if len(_wanted) > 0:
+        for thing in getattr(api_client, component).all():
+            if thing['id'] in _wanted:
+                _found[thing['id']] = thing
+
+    # Keep the order the caller gave us (and each ID once)
+    _missing = list(dict.fromkeys([_cid for _cid in component_ids if _cid not in _found]))
+    log.debug("...found {} of {} {}".format(len(_found), len(_wanted), component))
+    return _found, _missing
+
+
+def _is_covered(obj_id, parents: dict, doomed: set):
+    """
+    Walks up the parent_id chain of an object
+    :param obj_id:
+    :param parents: {id: parent_id} for every object of the kind
+    :param doomed: IDs that are being deleted
+    :return: True if any ancestor of obj_id is being deleted
+    """
+    _seen = set()
+    _parent = parents.get(obj_id)
+    while _parent is not None and _parent not in _seen:
+        if _parent in doomed:
+            return True
+        _seen.add(_parent)
+        _parent = parents.get(_parent)
+    return False
+
+
+def plan_deletes(api_client: todoist.TodoistAPI, component: str, component_ids: [int]):
+    """
+    Todoist deletes the children of a project (child projects, tasks) or a task (sub-tasks) along with it. Sending a
+        delete for something that is going away anyway is a waste, so only the topmost objects are kept.
+    Deletes that are already queued count too; the tasks of a project that an earlier action deleted are covered.
+
+    :param api_client:
+    :param component: one of labels, projects, items
+    :param component_ids: everything the caller wants gone
+    :return: the IDs that actually need a delete command
+    """
+    _ids = set(component_ids)
+
+    # Labels are flat
+    if component == 'labels' or len(_ids) < 1:
+        return list(dict.fromkeys(component_ids))
+
+    # What is already queued up to be deleted
+    _queued = {'projects': set(), 'items': set()}
+    for _cmd in api_client.queue:
+        if _cmd['type'] == 'project_delete':
+            _queued['projects'].add(_cmd['args']['id'])
+        elif _cmd['type'] == 'item_delete':
+            _queued['items'].add(_cmd['args']['id'])
+
+    _doomed = {'projects': set(_queued['projects']), 'items': set(_queued['items'])}
+    _doomed[component] |= _ids
+
+    # parent_id of every project and, if we need it, every task
+    _parents = {
+        'projects': get_project_tree(api_client).parent
+    }
+    if component == 'items':
+        _parents['items'] = {_i['id']: _i.data.get('parent_id') for _i in api_client.items.all()}
+        _projects = {_i['id']: _i.data.get('project_id') for _i in api_client.items.all()}
+
+    _topmost = []
+    for _cid in dict.fromkeys(component_ids):
+        if _cid in _queued[component]:
+            continue
+
+        if _is_covered(_cid, _parents[component], _doomed[component]):
+            continue
+
+        if component == 'items':
+            # The task's project (or any project above it) is going away
+            _pid = _projects.get(_cid)
+            if _pid in _doomed['projects'] or _is_covered(_pid, _parents['projects'], _doomed['projects']):
+                continue
+
+        _topmost.append(_cid)
+
+    return _topmost
+
+
+def _mark_cascaded_deletes(api_client: todoist.TodoistAPI, component: str, component_ids: [int]):
+    """
+    Todoist deletes the child projects and tasks of a project (or the sub-tasks of a task) along with it, but the local
+        state won't know that until the next sync. Marks them as deleted, the same way Model.delete() marks the object
+        itself, so that later actions don't match (and queue changes for) objects that the server has removed.
+
+    :param api_client:
+    :param component: one of labels, projects, items
+    :param component_ids: the objects that are being deleted
+    :return: how many objects were marked
+    """
+    log = logging.getLogger(__name__)
+
+    if component == 'labels' or len(component_ids) < 1:
+        return 0
+
+    _projects = get_project_tree(api_client).expand(component_ids) if component == 'projects' else set()
+    _tasks = set(component_ids) if component == 'items' else set()
+    _task_parents = {_i['id']: _i.data.get('parent_id') for _i in api_client.items.all()}
+
+    _marked = 0
+    for _p in api_client.projects.all():
+        if _p['id'] in _projects and not _p.data.get('is_deleted'):
+            _p.data['is_deleted'] = 1
+            _marked += 1
+
+    for _i in api_client.items.all():
+        if _i.data.get('is_deleted'):
+            continue
+        if _i.data.get('project_id') in _projects or _is_covered(_i['id'], _task_parents, _tasks):
+            _i.data['is_deleted'] = 1
+            _marked += 1
+
+    if _marked > 0:
+        log.debug("Marked {} object(s) below the deleted {} as deleted".format(_marked, component))
+    return _marked
+
+
 def delete_component_by_ids(api_client: todoist.TodoistAPI, component: str, component_ids: [int]):
     log = logging.getLogger(__name__)
 
@@ -574,19 +786,34 @@ def delete_component_by_ids(api_client: todoist.TodoistAPI, component: str, comp
         log.error(_e)
         raise TDTException(_e)
 
-    # The Todoist API has a Mixin for
-    for _cid in component_ids:
+    # get_by_id() walks every $component, so fetch them all in one go
+    _found, _ = get_components_by_ids_bulk(api_client, component, component_ids)
+
+    # Only delete the things whose parent is not being deleted as well
+    _topmost = plan_deletes(api_client, component, [_cid for _cid in component_ids if _cid in _found])
+
+    for _cid in dict.fromkeys(component_ids):
         log.debug("fetching {}://{}".format(component, _cid))
-        _c = getattr(api_client, component).get_by_id(_cid)
+        _c = _found.get(_cid)
 
-        # Check if the name of $thing is in the  list of queries
-        if _c is not None:
-            log.info("️🗑 deleting {}://{}".format(component, _cid))
-            _c.delete()
-        else:
+        if _c is None:
             _e = "Something's gone HORRIBLY WRONG. _c is None! Was hoping to get {}://{}".format(component, _cid)
             raise TDTException(_e)
 
+    for _cid in _topmost:
+        log.info("️🗑 deleting {}://{}".format(component, _cid))
+        _found[_cid].delete()
+
+    # Everything below what we deleted goes too; make sure later actions (in the same run) don't see it
+    _mark_cascaded_deletes(api_client, component, list(_found))
+
+    _saved = len(set(component_ids)) - len(_topmost)
+    if _saved > 0:
+        log.info("🗑 Deleting {} {} takes {} command(s); {} go with their parent".format(
+            len(set(component_ids)), component, len(_topmost), _saved))
+
+    return _topmost
+
 
 def parse_regex_options(filter_obj: dict):
     """
@@ -0,0 +1,522 @@
+###
+# Long running mode for TMTDT.
+#
+# Rather than cold-starting tmtdt.py from cron every few minutes (re-importing everything, re-reading and
+#   re-validating the job files and re-syncing the account), the daemon keeps the todoist client, the synced state and
+#   the validated job files in memory and runs each job on the cron-style schedule from the schedule file.
+#
+# With --webhook, the daemon also reacts to Todoist webhook events as they come in; see tdt.daemon.events
+##
+import copy
+import json
+import os
+import queue
+import signal
+import threading
+import time
+from datetime import datetime
+
+import argparse
+import logging
+
+from pytz import timezone
+
+import tdt.actions
+from tdt.daemon.events import apply_events
+from tdt.events import configure_event_bus, get_event_bus
+from tdt.exceptions import TDTException
+from tdt.runner import get_api_client, sync_api_client, run_actions, commit_queued_changes
+from tdt.utils.config import get_schedule_file, get_job_file
+from tdt.utils.cron import CronSchedule
+from tdt.utils.date import relative_date_strings
+from tdt.utils.delta import SyncDelta, MatchSets, snapshot_names
+from tdt.validators import validate_actions
+
+
+def _uses_relative_dates(obj):
+    """
+    Relative dates ('now', 'today', 'monday'...) are turned into actual date/time objects at validation time. A job
+        that uses them must be re-validated before each run or 'today' would be frozen at whenever the daemon started.
+    They show up as a `relative:` block or as a word in place of a date (explicit.to, a backup's `when`...). Any
+        value that is one of those words counts; re-validating a job that didn't need it costs little.
+    :param obj: the raw (parsed, not validated) job file
+    :return:
+    """
+    if isinstance(obj, dict):
+        if 'relative' in obj:
+            return True
+        return any(_uses_relative_dates(_v) for _v in obj.values())
+    if isinstance(obj, list):
+        return any(_uses_relative_dates(_v) for _v in obj)
+    return isinstance(obj, str) and obj in relative_date_strings
+
+
+class ScheduledJob(object):
+    """
+    A job file, the schedule to run it on and the in-memory copy of the validated actions
+    """
+
+    def __init__(self, job_file: str, schedule: CronSchedule, on_events: bool = False):
+        self.log = logging.getLogger(__name__)
+
+        self.job_file = job_file
+        self.schedule = schedule
+
+        # Should the job also be (partially) run when webhook events come in?
+        self.on_events = on_events
+
+        # The raw, parsed YAML and the validated actions
+        self._raw = None
+        self._actions = None
+
+        # So we can tell when the file on disk changes
+        self._mtime = None
+
+        # Do we need to re-validate before each run?
+        self._relative = False
+
+        # When is the job next due
+        self.next_run = None
+
+        # Basic run statistics
+        self.stats = {
+            'runs': 0,
+            'failures': 0,
+            'problems': 0,
+            'last_run': None,
+            'last_duration': None,
+            'last_result': None,
+        }
+
+    def load(self):
+        """
+        (re)loads the job file if it changed on disk since we last looked at it
+        :return:
+        """
+        _mtime = os.path.getmtime(self.job_file)
+        if _mtime == self._mtime:
+            return
+
+        self.log.info("📖 Loading job://{}...".format(self.job_file))
+        self._raw = get_job_file(self.job_file)
+        self._relative = _uses_relative_dates(self._raw)
+        # validation coerces things in place, so validate a copy and keep the raw YAML around
+        self._actions = validate_actions(copy.deepcopy(self._raw))
+        self._mtime = _mtime
+        self.log.info("🟩 job://{} has '{}' valid actions.".format(self.job_file, len(self._actions)))
+
+    @property
+    def actions(self):
+        """
+        Returns a copy of the validated actions that is safe to hand to the *Action classes (they will pop() things
+            out of the action blocks as they work)
+        :return:
+        """
+        self.load()
+        if self._relative:
+            self.log.debug("job://{} uses relative dates, re-validating...".format(self.job_file))
+            return validate_actions(copy.deepcopy(self._raw))
+        return copy.deepcopy(self._actions)
+
+
+class Daemon(object):
+    """
+    Keeps a warm todoist client around and runs the scheduled jobs
+    """
+
+    def __init__(self, args: argparse.Namespace, client_config: dict):
+        self.log = logging.getLogger(__name__)
+
+        self.args = args
+        self.client_config = client_config
+
+        # Cron expressions are evaluated in the user's timezone
+        self._tz = timezone(client_config['client']['timezone'])
+
+        # The (warm) API client
+        self.api_client = None
+        # Where the todoist client would like to write it's state. See _suspend_cache_writes()
+        self._cache_dir = None
+
+        # Where we persist our own state
+        self.state_dir = os.path.expanduser(args.state_dir)
+
+        # What changed in the last sync and the set of tasks each filter matched; lets the filters skip the tasks that
+        #   can't have changed. See tdt.utils.delta
+        ##
+        self.match_sets = MatchSets(os.path.join(self.state_dir, 'matches.json'))
+        self.delta = None
+
+        self.jobs = []
+
+        # Set when it's time to go
+        self._stop = threading.Event()
+
+        # Only one cycle at a time touches the API client
+        self.lock = threading.RLock()
+
+        # The HTTP server for health / stats (and webhooks)
+        self._http = None
+
+        # Webhook events are queued up by the HTTP server and worked through on their own thread
+        self.webhook_enabled = getattr(args, 'webhook', False)
+        self._events = queue.Queue()
+        self._event_thread = None
+
+        self.stats = {
+            'started': None,
+            'cycles': 0,
+            'syncs': 0,
+            'commits': 0,
+            'jobs_run': 0,
+            'jobs_coalesced': 0,
+            'last_sync': None,
+            'last_sync_duration': None,
+            'last_cycle': None,
+            'last_error': None,
+            # Only set while syncs are failing; cleared by the next sync that works
+            'sync_error': None,
+            'events_received': 0,
+            'events_handled': 0,
+            'event_cycles': 0,
+        }
+
+    def load_jobs(self):
+        """
+        Reads the schedule file and loads every enabled job in it
+        :return:
+        """
+        _schedule_file = self.args.schedule_file
+        _base = os.path.dirname(os.path.abspath(_schedule_file))
+        _schedules = get_schedule_file(_schedule_file)['schedules']
+
+        for _s in _schedules:
+            if not _s['enabled']:
+                self.log.warning("⏭️ Skip job://{} as it's disabled ...".format(_s['job']))
+                continue
+
+            _path = _s['job'] if os.path.isabs(_s['job']) else os.path.join(_base, _s['job'])
+            _job = ScheduledJob(_path, _s['cron'], _s['on_events'])
+
+            # Validating now means we find out about a broken job file at start up rather than at 3AM
+            _job.load()
+            _job.next_run = _job.schedule.next_after(self._now())
+            self.jobs.append(_job)
+
+        if len(self.jobs) < 1:
+            _e = "No enabled jobs in schedule_file:{}. Nothing to do!".format(_schedule_file)
+            self.log.error(_e)
+            raise TDTException(_e)
+
+        self.log.info("🗓️ Loaded {} scheduled jobs.".format(len(self.jobs)))
+
+    def _now(self):
+        """
+        Wall clock time in the user's timezone, as a naive datetime (which is what cron thinks in)
+        :return:
+        """
+        return datetime.now(self._tz).replace(tzinfo=None)
+
+    def _seconds_until(self, when: datetime):
+        return (self._tz.localize(when) - datetime.now(self._tz)).total_seconds()
+
+    def _suspend_cache_writes(self):
+        """
+        The todoist client writes the full state to disk after *every* sync. That's fine for a one-shot run but it's
+            wasteful when syncing every few minutes, so we hold on to the cache location and only write when we
+            persist.
+        :return:
+        """
+        self._cache_dir = self.api_client.cache
+        self.api_client.cache = None
+
+    def persist(self):
+        """
+        Writes the todoist state and our own stats to disk
+        :return:
+        """
+        with self.lock:
+            if self.api_client is not None and self._cache_dir:
+                self.log.info("💾 Persisting todoist state to {}...".format(self._cache_dir))
+                self.api_client.cache = self._cache_dir
+                try:
+                    self.api_client._write_cache()
+                finally:
+                    self.api_client.cache = None
+
+                # The match sets are only any good with the state they were built from
+                self.match_sets.save(self.api_client.sync_token)
+
+            os.makedirs(self.state_dir, exist_ok=True)
+            with open(os.path.join(self.state_dir, 'daemon.json'), 'w') as fh:
+                json.dump(self.health(), fh, indent=2, sort_keys=True, default=str)
+
+    def sync(self):
+        """
+        Incremental sync; the client already holds the sync_token from the last call
+        :return:
+        """
+        _start = time.monotonic()
+        _names = snapshot_names(self.api_client)
+        _result = sync_api_client(self.api_client)
+
+        self.delta = SyncDelta.from_sync(_result, _names, self.match_sets)
+        if self.delta.invalidated:
+            self.match_sets.invalidate()
+        self.stats['syncs'] += 1
+        self.stats['sync_error'] = None
+        self.stats['last_sync'] = datetime.now(self._tz).isoformat()
+        self.stats['last_sync_duration'] = time.monotonic() - _start
+
+    def run_cycle(self, jobs: list):
+        """
+        Runs all the given jobs off of a single sync and a single commit
+        :param jobs:
+        :return:
+        """
+        with self.lock:
+            self.stats['cycles'] += 1
+            self.stats['last_cycle'] = datetime.now(self._tz).isoformat()
+            if len(jobs) > 1:
+                self.stats['jobs_coalesced'] += len(jobs) - 1
+            self.log.info("⏰ Running {} due job(s) in one cycle...".format(len(jobs)))
+
+            try:
+                self.sync()
+            except Exception as e:
+                self.stats['last_error'] = "sync: {}".format(e)
+                self.stats['sync_error'] = str(e)
+                self.log.error("Unable to sync, skipping this cycle! {}".format(e))
+                return False
+
+            _ok = True
+            for _job in jobs:
+                _start = time.monotonic()
+                _job.stats['runs'] += 1
+                self.stats['jobs_run'] += 1
+                try:
+                    _problems = run_actions(_job.actions, self.api_client, self.client_config, self.args,
+                                            defer_commits=True, delta=self.delta)
+                    _job.stats['problems'] += len(_problems)
+                    _job.stats['last_result'] = 'ok' if len(_problems) < 1 else 'problems'
+                except Exception as e:
+                    # One bad job must not take the daemon (or the other jobs in the cycle) down with it
+                    _ok = False
+                    _job.stats['failures'] += 1
+                    _job.stats['last_result'] = 'failed: {}'.format(e)
+                    self.stats['last_error'] = "job://{}: {}".format(_job.job_file, e)
+                    self.log.exception("🛑 job://{} failed!".format(_job.job_file))
+
+                _job.stats['last_run'] = datetime.now(self._tz).isoformat()
+                _job.stats['last_duration'] = time.monotonic() - _start
+
+            # One commit for everything that the jobs in this cycle queued up
+            try:
+                if len(self.api_client.queue) > 0:
+                    self.stats['commits'] += 1
+                    _ok = commit_queued_changes(self.api_client, self.args.dry_run) and _ok
+            except Exception as e:
+                # TDTException for what todoist refused; anything else (E.G.: a connection error) must not take the
+                #   daemon down either
+                _ok = False
+                self.stats['last_error'] = "commit: {}".format(e)
+                self.log.exception("🛑 Unable to commit the queued changes!")
+                # Whatever was in the queue is not going to go through on the next attempt either
+                del self.api_client.queue[:]
+
+            return _ok
+
+    def queue_event(self, event: dict):
+        """
+        Called by the HTTP server for each webhook event. Todoist wants a quick response, so the actual work is done
+            on the event thread.
+        :param event: the parsed webhook payload
+        :return:
+        """
+        self.stats['events_received'] += 1
+        self._events.put(event)
+
+    def _event_loop(self):
+        """
+        Works through the queued webhook events. Anything that piled up while we were busy is handled in one go.
+        :return:
+        """
+        while not self._stop.is_set():
+            try:
+                _batch = [self._events.get(timeout=1)]
+            except queue.Empty:
+                continue
+
+            while True:
+                try:
+                    _batch.append(self._events.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.handle_events(_batch)
+            except Exception as e:
+                self.stats['last_error'] = "events: {}".format(e)
+                self.log.exception("🛑 Failed to handle {} event(s)!".format(len(_batch)))
+
+    def handle_events(self, events: list):
+        """
+        Folds the events into the local state and then re-runs only the filter-driven actions of the jobs that asked
+            for it, and only against the tasks that changed.
+
+        :param events: the parsed webhook payloads
+        :return:
+        """
+        with self.lock:
+            self.stats['events_handled'] += len(events)
+            _changed, _global = apply_events(self.api_client, events)
+
+            if len(_changed) < 1 and not _global:
+                self.log.debug("{} event(s) changed nothing that a filter could see.".format(len(events)))
+                return True
+
+            # A renamed label/project means the filters must look at every task again
+            _scope = None if _global else _changed
+            self.log.info("📨 {} event(s) touched {} task(s); re-evaluating...".format(
+                len(events), 'every' if _scope is None else len(_scope)))
+
+            self.stats['event_cycles'] += 1
+            _ok = True
+            for _job in [_j for _j in self.jobs if _j.on_events]:
+                _actions = [_a for _a in _job.actions if _a['action'] in tdt.actions.filter_actions]
+                if len(_actions) < 1:
+                    continue
+                try:
+                    run_actions(_actions, self.api_client, self.client_config, self.args, defer_commits=True,
+                                task_scope=_scope)
+                except Exception as e:
+                    _ok = False
+                    self.stats['last_error'] = "job://{}: {}".format(_job.job_file, e)
+                    self.log.exception("🛑 job://{} failed while handling events!".format(_job.job_file))
+
+            try:
+                if len(self.api_client.queue) > 0:
+                    self.stats['commits'] += 1
+                    _ok = commit_queued_changes(self.api_client, self.args.dry_run) and _ok
+            except Exception as e:
+                _ok = False
+                self.stats['last_error'] = "commit: {}".format(e)
+                self.log.exception("🛑 Unable to commit the changes for the events!")
+                del self.api_client.queue[:]
+
+            return _ok
+
+    def health(self):
+        """
+        Basic health and run statistics
+        :return:
+        """
+        _status = 'ok' if not self._stop.is_set() else 'stopping'
+        if self.stats['sync_error'] is not None:
+            _status = 'degraded'
+
+        _bus = get_event_bus()
+        return {
+            'status': _status,
+            'stats': self.stats,
+            'event_bus': _bus.stats if _bus is not None else None,
+            'jobs': {
+                _j.job_file: dict(_j.stats, cron=_j.schedule.expression,
+                                  next_run=_j.next_run.isoformat() if _j.next_run else None)
+                for _j in self.jobs
+            }
+        }
+
+    def stop(self, *args):
+        """
+        Asks the main loop to exit. Safe to call from a signal handler
+        :return:
+        """
+        self.log.warning("🛑 Stop requested...")
+        self._stop.set()
+
+    def start(self):
+        """
+        Sets everything up: jobs, the API client and the HTTP health server
+        :return:
+        """
+        self.stats['started'] = datetime.now(self._tz).isoformat()
+        self.load_jobs()
+
+        configure_event_bus(self.client_config)
+
+        self.log.info("⚙️ Spinning up Todoist API Client...")
+        self.api_client = get_api_client(self.client_config)
+        self._suspend_cache_writes()
+        self.match_sets.load(self.api_client.sync_token)
+
+        # First sync is against whatever was in the on-disk cache so it is usually incremental, too
+        self.sync()
+
+        if self.args.health_port is not None:
+            # Only import the HTTP bits if they're actually used
+            from tdt.daemon.http import DaemonHTTPServer
+            self._http = DaemonHTTPServer(self, self.args.health_port,
+                                          webhook_secret=self._get_webhook_secret())
+            self._http.start()
+
+        if self.webhook_enabled:
+            self._event_thread = threading.Thread(target=self._event_loop, name='tmtdt-events', daemon=True)
+            self._event_thread.start()
+
+    def _get_webhook_secret(self):
+        """
+        If the user gave us the app's client_secret, every webhook must carry a valid signature
+        :return:
+        """
+        return self.client_config['todoist'].get('webhook', {}).get('client_secret')
+
+    def run_forever(self):
+        """
+        The main loop. Sleeps until the next job(s) are due, then runs every job that is due in one cycle
+        :return:
+        """
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        self.start()
+
+        try:
+            while not self._stop.is_set():
+                _next = min(_j.next_run for _j in self.jobs)
+                _wait = self._seconds_until(_next)
+                if _wait > 0:
+                    self.log.debug("Sleeping {:.0f}s until {}...".format(_wait, _next))
+                    # wait() returns True if we were told to stop while sleeping
+                    if self._stop.wait(_wait):
+                        break
+
+                # Every job that is due (or overdue) now is coalesced into one cycle
+                _now = self._now()
+                _due = [_j for _j in self.jobs if _j.next_run <= _now]
+                if len(_due) < 1:
+                    continue
+
+                self.run_cycle(_due)
+
+                # Schedule the next run relative to when the cycle finished so a slow cycle can't cause a pile-up
+                _now = self._now()
+                for _j in _due:
+                    _j.next_run = _j.schedule.next_after(_now)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """
+        Persist state and stop the HTTP server
+        :return:
+        """
+        self._stop.set()
+        if self._http is not None:
+            self._http.stop()
+        if self._event_thread is not None:
+            self._event_thread.join()
+        if get_event_bus() is not None:
+            get_event_bus().close()
+        self.persist()
+        self.log.info("Daemon stopped. Goodbye! 👋")
@@ -0,0 +1,110 @@
+###
+# Todoist webhook events.
+#
+# Each event carries the full object that changed, which is exactly what a sync would have given us, so rather than
+#   syncing we fold the object straight into the in-memory state and work out which tasks (if any) need their filters
+#   re-evaluated.
+#
+# See: https://developer.todoist.com/sync/v8/#webhooks
+##
+import base64
+import hashlib
+import hmac
+
+import logging
+
+import todoist
+
+# event_name is `$component:$verb`. Map the component to the part of the sync state it lives in
+_event_components = {
+    'item': 'items',
+    'label': 'labels',
+    'project': 'projects',
+    'note': 'notes',
+    'section': 'sections',
+    'reminder': 'reminders',
+    'filter': 'filters',
+}
+
+# The task fields that a filter can look at. If none of these changed, no filter result can have changed either
+_item_fields = ('content', 'labels', 'project_id', 'section_id', 'parent_id', 'due', 'checked', 'priority')
+
+
+def verify_signature(body: bytes, secret: str, signature: str):
+    """
+    Todoist signs every webhook with the client_secret of the app that the webhook belongs to. The signature is the
+        base64 encoded HMAC-SHA256 of the raw request body.
+
+    :param body: the raw request body
+    :param secret: the app's client_secret
+    :param signature: the value of the X-Todoist-Hmac-SHA256 header
+    :return:
+    """
+    if signature is None:
+        return False
+    _expected = base64.b64encode(hmac.new(secret.encode('utf-8'), body, hashlib.sha256).digest()).decode('ascii')
+    return hmac.compare_digest(_expected, signature)
+
+
+def apply_events(api_client: todoist.TodoistAPI, events: list):
+    """
+    Applies each event payload to the in-memory state and works out what needs to be re-evaluated.
+
+    Our own changes come back to us as events too. By the time they arrive, the local state already has the change so
+        comparing the filter-relevant fields before/after is enough to keep us from reacting to our own work (and
+        looping forever).
+
+    :param api_client: the (warm) todoist client
+    :param events: the parsed webhook payloads
+    :return: tuple (set of task IDs whose filter results may have changed, True if the change affects every task)
+    """
+    log = logging.getLogger(__name__)
+
+    _changed_tasks = set()
+    _global = False
+
+    for _evt in events:
+        _name = _evt.get('event_name', '')
+        _component, _, _verb = _name.partition(':')
+        _data = _evt.get('event_data')
+
+        if _component not in _event_components or not isinstance(_data, dict) or 'id' not in _data:
+            log.warning("🤷 Ignoring event we don't understand: {}".format(_name))
+            continue
+
+        _datatype = _event_components[_component]
+        _local = api_client._find_object(_datatype, _data)
+        _before = None
+        if _local is not None:
+            _before = {_k: _local.data.get(_k) for _k in _item_fields + ('name',)}
+
+        # Deleted events don't always have the is_deleted flag set on the object
+        if _verb == 'deleted':
+            _data = dict(_data, is_deleted=1)
+
+        log.debug("Applying {} {}://{} to local state...".format(_name, _component, _data['id']))
+        api_client._update_state({_datatype: [_data]})
+
+        if _component == 'item':
+            if _verb == 'deleted':
+                # Nothing left to filter
+                _changed_tasks.discard(_data['id'])
+                continue
+
+            _after = api_client._find_object(_datatype, _data)
+            if _after is None:
+                continue
+            if _before is None or any(_before[_k] != _after.data.get(_k) for _k in _item_fields):
+                _changed_tasks.add(_data['id'])
+            else:
+                log.debug("task://{} didn't change in any way a filter could see. Skipping.".format(_data['id']))
+
+        elif _component in ('label', 'project'):
+            # Filters select labels and projects by name. A rename (or delete) could change which tasks match, and
+            #   that's not limited to the tasks in the event...
+            if _verb == 'deleted' or (_before is not None and _before['name'] != _data.get('name')):
+                log.info("🌐 {}://{} was renamed/deleted; every task needs re-evaluating".format(
+                    _component, _data['id']))
+                _global = True
+
+    return _changed_tasks, _global
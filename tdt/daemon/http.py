@@ -0,0 +1,102 @@
+###
+# A tiny HTTP server so that the outside world (docker/k8s health checks, monitoring) can ask the daemon how it's doing.
+#   GET /health -> 200 if everything is fine, 503 otherwise
+#   GET /stats  -> full run statistics
+#
+# With --webhook, it also accepts the Todoist webhook events:
+#   POST /webhook -> queues the event(s) for the daemon
+##
+import json
+import threading
+
+import logging
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tdt.daemon.events import verify_signature
+
+
+class _DaemonRequestHandler(BaseHTTPRequestHandler):
+    """
+    Maps GET paths to functions that produce the JSON to send back
+    """
+
+    # Set by DaemonHTTPServer
+    daemon = None
+    webhook_secret = None
+
+    def _send_json(self, code: int, payload):
+        _body = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(_body)))
+        self.end_headers()
+        self.wfile.write(_body)
+
+    def do_GET(self):
+        _health = self.daemon.health()
+
+        if self.path == '/health':
+            _code = 200 if _health['status'] == 'ok' else 503
+            return self._send_json(_code, {'status': _health['status']})
+
+        if self.path == '/stats':
+            return self._send_json(200, _health)
+
+        return self._send_json(404, {'error': 'unknown path {}'.format(self.path)})
+
+    def do_POST(self):
+        if self.path != '/webhook' or not self.daemon.webhook_enabled:
+            return self._send_json(404, {'error': 'unknown path {}'.format(self.path)})
+
+        _body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        if self.webhook_secret is not None and \
+                not verify_signature(_body, self.webhook_secret, self.headers.get('X-Todoist-Hmac-SHA256')):
+            logging.getLogger(__name__).warning("🚫 Rejecting webhook with a missing/bad signature")
+            return self._send_json(403, {'error': 'bad signature'})
+
+        try:
+            _events = json.loads(_body.decode('utf-8'))
+        except ValueError as ve:
+            return self._send_json(400, {'error': 'invalid JSON: {}'.format(ve)})
+
+        # Todoist sends one event per request, the replayer may send a few at once
+        if not isinstance(_events, list):
+            _events = [_events]
+
+        for _evt in _events:
+            self.daemon.queue_event(_evt)
+
+        return self._send_json(200, {'queued': len(_events)})
+
+    def log_message(self, fmt, *args):
+        # Route the http.server access log through our logging instead of stderr
+        logging.getLogger(__name__).debug(fmt % args)
+
+
+class DaemonHTTPServer(object):
+    """
+    Runs the HTTP server on a background thread
+    """
+
+    def __init__(self, daemon, port: int, host: str = '127.0.0.1', webhook_secret: str = None):
+        self.log = logging.getLogger(__name__)
+
+        # Each server gets it's own handler class so the daemon reference is not shared between instances
+        _handler = type('DaemonRequestHandler', (_DaemonRequestHandler,),
+                        {'daemon': daemon, 'webhook_secret': webhook_secret})
+        self._server = ThreadingHTTPServer((host, port), _handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='tmtdt-http', daemon=True)
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self.log.info("🩺 Serving health/stats on http://{}:{}/".format(*self._server.server_address))
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
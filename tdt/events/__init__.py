@@ -0,0 +1,202 @@
+###
+# The event bus behind Action._emit_event().
+#
+# Every action emits an event for each object that it changes. Emitting must never slow the action down, so events
+#   are dropped into a bounded, in-memory queue and a background thread publishes them to the configured sinks in
+#   batches. When the queue is full, events are either dropped (and counted) or the emitter waits a little while for
+#   room; see `on_full` in the config file.
+#
+# Events are small dicts: the object id(s) and what changed, never the full todoist object.
+##
+import atexit
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import logging
+
+from tdt.events.sinks import get_sink
+
+# Defaults for the `events:` section of the config file
+_defaults = {
+    'queue_size': 10000,
+    'batch_size': 100,
+    'flush_interval': 1.0,
+    'on_full': 'drop',
+    'block_timeout': 0.5,
+}
+
+# The bus for this process, if the user configured one
+_bus = None
+
+
+class EventBus(object):
+    """
+    A bounded queue of events and the thread that drains it
+    """
+
+    def __init__(self, sinks: list, queue_size: int = _defaults['queue_size'],
+                 batch_size: int = _defaults['batch_size'], flush_interval: float = _defaults['flush_interval'],
+                 on_full: str = _defaults['on_full'], block_timeout: float = _defaults['block_timeout']):
+        """
+        :param sinks: the sink objects to publish to
+        :param queue_size: how many events can be waiting to be published
+        :param batch_size: the most events handed to a sink at once
+        :param flush_interval: how often (seconds) the queue is published
+        :param on_full: 'drop' the event or 'block' the emitter for up to block_timeout seconds when the queue is full
+        :param block_timeout:
+        """
+        self.log = logging.getLogger(__name__)
+
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._block = on_full == 'block'
+        self.block_timeout = block_timeout
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+
+        self.stats = {
+            'emitted': 0,
+            'dropped': 0,
+            'published': 0,
+            'batches': 0,
+            'sink_errors': 0,
+        }
+
+        self._thread = threading.Thread(target=self._drain, name='tmtdt-event-bus', daemon=True)
+        self._thread.start()
+
+    def emit(self, event_type: str, object_ids: list, diff: dict = None, **extra):
+        """
+        Queues up an event. Never raises and, unless on_full is 'block', never waits.
+
+        :param event_type: what happened, e.g. label_apply
+        :param object_ids: the ID(s) of the todoist object(s) involved
+        :param diff: what changed
+        :param extra: anything else worth knowing (action name, dry run...)
+        :return: True if the event was queued
+        """
+        # Keep this as cheap as possible; the event is turned into a dict (w/ an ID) on the bus thread
+        _event = (time.time(), event_type, object_ids, diff, extra)
+
+        try:
+            if self._block:
+                self._queue.put(_event, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(_event)
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+
+        self.stats['emitted'] += 1
+        return True
+
+    @staticmethod
+    def _to_dict(event: tuple):
+        _ts, _type, _ids, _diff, _extra = event
+        _event = {
+            'id': uuid.uuid4().hex,
+            'ts': datetime.fromtimestamp(_ts, timezone.utc).isoformat(),
+            'type': _type,
+            'object_ids': _ids,
+            'diff': _diff,
+        }
+        _event.update(_extra)
+        return _event
+
+    def _next_batch(self):
+        """
+        Grabs up to batch_size of the events that are waiting
+        :return:
+        """
+        _batch = []
+        while len(_batch) < self.batch_size:
+            try:
+                _batch.append(self._to_dict(self._queue.get_nowait()))
+            except queue.Empty:
+                break
+        return _batch
+
+    def _publish(self, batch: list):
+        for _sink in self.sinks:
+            try:
+                _sink.publish(batch)
+            except Exception as e:
+                # A broken sink must not stop the others (or the actions!)
+                self.stats['sink_errors'] += 1
+                self.log.warning("📪 Unable to publish {} event(s) to {}: {}".format(len(batch), _sink, e))
+
+        self.stats['published'] += len(batch)
+        self.stats['batches'] += 1
+
+    def _flush(self):
+        """
+        Publishes everything that is waiting, batch_size events at a time
+        :return:
+        """
+        _batch = self._next_batch()
+        while len(_batch) > 0:
+            self._publish(_batch)
+            _batch = self._next_batch()
+
+    def _drain(self):
+        # Waking up for every single event would fight the actions for the GIL; wake up every flush_interval instead
+        #   and publish everything that piled up
+        ##
+        while not self._stop.wait(self.flush_interval):
+            self._flush()
+
+    def close(self, timeout: float = 5.0):
+        """
+        Stops the background thread and publishes whatever is still queued
+        :param timeout: how long to wait for the background thread
+        :return:
+        """
+        self._stop.set()
+        self._thread.join(timeout)
+        self._flush()
+
+        for _sink in self.sinks:
+            try:
+                _sink.close()
+            except Exception as e:
+                self.log.debug("Error closing {}: {}".format(_sink, e))
+
+        self.log.debug("Event bus closed. {}".format(self.stats))
+
+
+def configure_event_bus(client_config: dict):
+    """
+    Sets up the event bus from the `events:` section of the (validated) config file. If there is no such section,
+        there's no bus and emitting an event costs nothing.
+
+    :param client_config: the parsed and validated config file
+    :return: the EventBus, or None
+    """
+    global _bus
+
+    if _bus is not None:
+        _bus.close()
+        _bus = None
+
+    if 'events' not in client_config:
+        return None
+
+    _cfg = dict(_defaults, **client_config['events'])
+    _sinks = [get_sink(_s) for _s in _cfg.pop('sinks')]
+    _bus = EventBus(_sinks, **_cfg)
+
+    # Make sure whatever is still in the queue gets out before the process does
+    atexit.register(_bus.close)
+    return _bus
+
+
+def get_event_bus():
+    """
+    :return: the EventBus for this process, or None if events are not configured
+    """
+    return _bus
@@ -0,0 +1,204 @@
+###
+# Where events go. Each sink gets a batch (list) of events at a time from the EventBus thread.
+#
+# Sinks connect lazily and, if the other end goes away, reconnect on the next batch.
+##
+import json
+import os
+import socket
+import struct
+import time
+
+import logging
+
+from tdt.exceptions import TDTException
+
+
+def _ndjson(batch: list):
+    """
+    One JSON document per line
+    :param batch:
+    :return:
+    """
+    return ''.join([json.dumps(_e, sort_keys=True, default=str) + '\n' for _e in batch]).encode('utf-8')
+
+
+class NDJSONSink(object):
+    """
+    Appends events to a file, one JSON document per line
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self._fh = None
+
+    def publish(self, batch: list):
+        if self._fh is None:
+            self._fh = open(self.path, 'ab')
+        self._fh.write(_ndjson(batch))
+        self._fh.flush()
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __repr__(self):
+        return "ndjson://{}".format(self.path)
+
+
+class UnixSocketSink(object):
+    """
+    Writes NDJSON to a (stream) unix socket that some other program is listening on
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._sock = None
+
+    def publish(self, batch: list):
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(self.path)
+        try:
+            self._sock.sendall(_ndjson(batch))
+        except OSError:
+            # Try again w/ a new connection on the next batch
+            self.close()
+            raise
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __repr__(self):
+        return "unix://{}".format(self.path)
+
+
+class MQTTSink(object):
+    """
+    Publishes each event to `$topic/$event_type` on an MQTT broker.
+
+    This is a bare-bones MQTT 3.1.1 client: CONNECT, then QoS 0 PUBLISH. That's all we need and it saves pulling in
+        a full MQTT library just to fire off events.
+    See: http://docs.oasis-open.org/mqtt/mqtt/v3.1.1/os/mqtt-v3.1.1-os.html
+    """
+
+    def __init__(self, host: str, port: int = 1883, topic: str = 'tmtdt', client_id: str = None,
+                 username: str = None, password: str = None, keepalive: int = 60):
+        self.log = logging.getLogger(__name__)
+
+        self.host = host
+        self.port = port
+        self.topic = topic.rstrip('/')
+        self.client_id = client_id or 'tmtdt-{}'.format(os.getpid())
+        self.username = username
+        self.password = password
+        self.keepalive = keepalive
+        self._sock = None
+        # time.monotonic() of the last packet sent; see publish()
+        self._last_sent = None
+
+    @staticmethod
+    def _string(value: str):
+        _b = value.encode('utf-8')
+        return struct.pack('!H', len(_b)) + _b
+
+    @staticmethod
+    def _packet(header: int, body: bytes):
+        # The 'remaining length' is a variable length int; 7 bits per byte, high bit set if more bytes follow
+        _length = len(body)
+        _encoded = bytearray()
+        while True:
+            _byte = _length % 128
+            _length //= 128
+            if _length > 0:
+                _byte |= 0x80
+            _encoded.append(_byte)
+            if _length == 0:
+                break
+        return bytes([header]) + bytes(_encoded) + body
+
+    def _connect(self):
+        _flags = 0x02
+        _payload = self._string(self.client_id)
+        if self.username is not None:
+            _flags |= 0x80
+            _payload += self._string(self.username)
+            if self.password is not None:
+                _flags |= 0x40
+                _payload += self._string(self.password)
+
+        # Protocol name, level 4 (3.1.1), connect flags (clean session), keep alive
+        _variable = self._string('MQTT') + bytes([0x04, _flags]) + struct.pack('!H', self.keepalive)
+
+        self._sock = socket.create_connection((self.host, self.port), timeout=10)
+        self._sock.sendall(self._packet(0x10, _variable + _payload))
+
+        # CONNACK: 0x20 0x02 <session present> <return code>
+        _ack = self._sock.recv(4)
+        if len(_ack) < 4 or _ack[0] != 0x20 or _ack[3] != 0:
+            self.close()
+            _e = "MQTT broker {}:{} refused the connection: {}".format(self.host, self.port, _ack)
+            self.log.error(_e)
+            raise TDTException(_e)
+        self._last_sent = time.monotonic()
+
+    def _idle_too_long(self):
+        # The broker drops a client that's sent nothing for 1.5x the keep alive. Events can be hours apart, so rather
+        #   than keep the connection alive w/ PINGREQs, start a new one once we've gone quiet for the keep alive.
+        #   A QoS 0 PUBLISH on a connection the broker already dropped would just be lost w/o an error.
+        ##
+        return self.keepalive > 0 and time.monotonic() - self._last_sent >= self.keepalive
+
+    def publish(self, batch: list):
+        if self._sock is not None and self._idle_too_long():
+            self.log.debug("Nothing sent to {} for {}s, reconnecting".format(self, self.keepalive))
+            self.close()
+
+        if self._sock is None:
+            self._connect()
+
+        _out = b''.join([
+            self._packet(0x30, self._string('{}/{}'.format(self.topic, _e['type'])) +
+                         json.dumps(_e, sort_keys=True, default=str).encode('utf-8'))
+            for _e in batch
+        ])
+        try:
+            self._sock.sendall(_out)
+        except OSError:
+            self.close()
+            raise
+        self._last_sent = time.monotonic()
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                # DISCONNECT
+                self._sock.sendall(b'\xe0\x00')
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+
+    def __repr__(self):
+        return "mqtt://{}:{}/{}".format(self.host, self.port, self.topic)
+
+
+# Map the `type` of a sink in the config file to the class that implements it
+sink_map = {
+    'ndjson': NDJSONSink,
+    'unix': UnixSocketSink,
+    'mqtt': MQTTSink,
+}
+
+
+def get_sink(sink_config: dict):
+    """
+    Builds a sink from its (validated) config block
+    :param sink_config: {type: ..., <args for the sink>}
+    :return:
+    """
+    _cfg = dict(sink_config)
+    return sink_map[_cfg.pop('type')](**_cfg)
@@ -35,3 +35,9 @@ class TodoistClientError(TDTException):
     """
     Exception raised when Something happened w/ the ToDoist client
     """
+
+
+class ScheduleFileError(TDTException):
+    """
+    Exception raised when the daemon's Schedule File contains invalid YAML
+    """
@@ -0,0 +1,134 @@
+###
+# Validates job files w/o running them (--validate-only).
+#
+# Validation doesn't need a config file, an API token or a sync; just the job file. Each job file is validated in its
+#   own process (a pool of --parallelism of them) so a directory of generated job files is checked in seconds.
+##
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tdt.exceptions import TDTException
+from tdt.utils.config import validate_job_file
+
+
+def expand_job_files(paths: list):
+    """
+    Turns the list of job files and/or directories (of job files) into a list of job files
+    :param paths: what the user gave us with --validate-only
+    :return:
+    """
+    log = logging.getLogger(__name__)
+
+    _files = []
+    for _p in paths:
+        if os.path.isdir(_p):
+            _found = sorted(glob.glob(os.path.join(_p, '**', '*.yaml'), recursive=True) +
+                            glob.glob(os.path.join(_p, '**', '*.yml'), recursive=True))
+            log.debug("Found {} job file(s) in {}".format(len(_found), _p))
+            _files.extend(_found)
+        else:
+            _files.append(_p)
+
+    # No point validating the same file twice
+    return list(dict.fromkeys(_files))
+
+
+def validate_one(job_file: str):
+    """
+    Validates a single job file. Runs in a worker process so it must never raise
+    :param job_file:
+    :return: dict w/ the file, status (ok/invalid) and, if invalid, the details of the error
+    """
+    _result = {
+        'job_file': job_file,
+        'status': 'ok',
+        'actions': 0,
+        'error': None
+    }
+    _start = time.monotonic()
+    try:
+        _result['actions'] = len(validate_job_file(job_file))
+
+    except (Exception, SystemExit) as e:
+        # SystemExit from deep inside the validators included; this process must always report back
+        _result['status'] = 'invalid'
+        _result['error'] = {
+            'type': type(e).__name__,
+            'message': str(e),
+            # SchemaCheck works out exactly where the problem is; other errors don't know
+            'location': getattr(e, 'location', None),
+            'path': getattr(e, 'path', None),
+            'bad_value': getattr(e, 'bad_value', None),
+            'reason': getattr(e, 'error', None)
+        }
+
+    _result['duration'] = time.monotonic() - _start
+    return _result
+
+
+def validate_job_files(args: argparse.Namespace):
+    """
+    Validates every job file in args.validate_only, args.parallelism files at a time
+    :param args: the argparse args
+    :return: list of per-file results, see validate_one(), in the order of the files
+    """
+    log = logging.getLogger(__name__)
+
+    _job_files = expand_job_files(args.validate_only)
+    if len(_job_files) < 1:
+        _e = "No job files found in {}".format(args.validate_only)
+        log.error(_e)
+        raise TDTException(_e)
+
+    _workers = min(args.parallelism or os.cpu_count() or 1, len(_job_files))
+    log.info("🔍 Validating {} job file(s), {} at a time...".format(len(_job_files), _workers))
+
+    _start = time.monotonic()
+    if _workers < 2:
+        _results = [validate_one(_jf) for _jf in _job_files]
+    else:
+        # Hand out files in batches; validating one file is quick enough that the IPC would otherwise dominate
+        _chunk = max(1, len(_job_files) // (_workers * 4))
+        with ProcessPoolExecutor(max_workers=_workers) as pool:
+            _results = list(pool.map(validate_one, _job_files, chunksize=_chunk))
+
+    print_report(_results, time.monotonic() - _start, getattr(args, 'validate_format', 'text'))
+    return _results
+
+
+def print_report(results: list, wall_time: float, fmt: str = 'text'):
+    """
+    The per-file report. Printed (rather than logged) so it can be piped into other tools
+    :param results:
+    :param wall_time: how long the whole thing took
+    :param fmt: text or json (one JSON object per line)
+    :return:
+    """
+    if fmt == 'json':
+        for _r in results:
+            print(json.dumps(_r, sort_keys=True))
+        return
+
+    for _r in results:
+        if _r['status'] == 'ok':
+            print("✅ {} ({} actions)".format(_r['job_file'], _r['actions']))
+            continue
+
+        _err = _r['error']
+        print("❌ {}".format(_r['job_file']))
+        if _err['location'] is not None:
+            print("    where: {}".format(_err['location']))
+            if _err['path']:
+                print("    path:  {}".format('.'.join(_err['path'])))
+            print("    value: {}".format(_err['bad_value']))
+            print("    error: {}".format(_err['reason']))
+        else:
+            print("    {}: {}".format(_err['type'], _err['message']))
+
+    _invalid = len([_r for _r in results if _r['status'] != 'ok'])
+    print("{} job file(s), {} invalid. Took {:.1f}s".format(len(results), _invalid, wall_time))
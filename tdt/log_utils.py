@@ -55,3 +55,16 @@ class LogInfo(object):
         self.handler.setFormatter(logging.Formatter(self.format_string))
         logging.root.addHandler(self.handler)
         logging.root.setLevel(self.numeric_log_level)
+
+
+def set_log_prefix(prefix: str):
+    """
+    Prefixes every log line with [prefix]. Used to tell accounts apart when several run at once.
+    :param prefix:
+    :return:
+    """
+    for _h in logging.root.handlers:
+        # Remember the original format so the prefix can be changed more than once
+        if not hasattr(_h, 'tdt_format'):
+            _h.tdt_format = _h.formatter._fmt if _h.formatter is not None else '%(message)s'
+        _h.setFormatter(logging.Formatter('[{}] {}'.format(prefix, _h.tdt_format)))
@@ -0,0 +1,272 @@
+"""
+    The registry of every action that the tool supports: which class validates it and which class does the work.
+
+    Validators live in a sub-package of tdt.validators.job_file per resource (label, task...) and each sub-package lists
+        the actions it can validate in its action_validator_map. Discovering them means importing every one of those
+        packages, so it is done once per process and shared by all the validators and the runner.
+
+    Frozen deployments (where the package can't be walked on disk) or anybody who would rather skip the walk can point
+        TDT_ACTION_MANIFEST at a precomputed manifest:
+        $ python3 -m tdt.registry /path/to/manifest.json
+
+    Other packages can add their own actions through the `tdt.actions` entry point group. The name of the entry point is
+        the action and it must point at a dict w/ the validator and handler classes:
+        [options.entry_points]
+        tdt.actions =
+            calendar_sync = tdt_calendar.registry:calendar_sync
+
+        # tdt_calendar/registry.py
+        calendar_sync = {'validator': CalendarSyncValidator, 'handler': CalendarSyncAction}
+
+    Once a class has been looked up, it's kept so running an action is a dict lookup.
+"""
+import importlib
+import json
+import os
+import pkgutil
+import sys
+
+import logging
+
+from tdt.exceptions import TDTException
+
+log = logging.getLogger(__name__)
+
+# If set, the registry is read from the JSON file at this path instead of being discovered
+manifest_env_var = 'TDT_ACTION_MANIFEST'
+
+# The package that holds a sub-package of validators per resource
+_validators_package = 'tdt.validators.job_file'
+
+# Where other packages register their actions
+entry_point_group = 'tdt.actions'
+
+# action -> registry entry, see _discover()
+_registry = None
+
+# (action, kind) -> the class, see get_class()
+_classes = {}
+
+
+def _discover():
+    """
+    Discovers all modules inside of the job_file package, allows you to _literally_ drop in a new validation
+        file and just have it _work_
+    :return: dict of action -> {validator_module, validator_class, handler_module, handler_class, source}
+    """
+    # Importing here rather than at the top keeps tdt.actions and tdt.validators from importing each other
+    import tdt.actions
+    import tdt.validators.job_file
+
+    _found = {}
+    _pkgpath = os.path.dirname(tdt.validators.job_file.__file__)
+    for _m in pkgutil.iter_modules([_pkgpath]):
+
+        # Check if it's a sub-package, that'll be a very good indicator that there's a module inside w/ a
+        #   'action_validator_map' that we'll want to pull the keys() from
+        ##
+        if not _m.ispkg:
+            continue
+
+        _mod = importlib.import_module('.{}'.format(_m.name), package=_validators_package)
+        _map = getattr(_mod, 'action_validator_map', None)
+        if _map is None:
+            # No worries, just pass
+            continue
+
+        for _act, _cls in _map.items():
+            _action = "{}_{}".format(_m.name, _act)
+            _found[_action] = {
+                'validator_module': '{}.{}.{}'.format(_validators_package, _m.name, _cls.lower()),
+                'validator_class': _cls,
+                'handler_module': 'tdt.actions.{}.{}'.format(_m.name, _act),
+                # An action can be valid before anything can run it
+                'handler_class': tdt.actions.action_map.get(_action),
+                'source': 'tdt'
+            }
+
+    return _found
+
+
+def _get_entry_points():
+    """
+    :return: list of (name, value, load function) of every entry point in the group
+    """
+    # Only needed when there's no manifest, so not worth importing up front
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        # Python 3.7; importlib.metadata is 3.8+
+        import pkg_resources
+        return [(_ep.name, str(_ep).partition('=')[2].strip(), _ep.load)
+                for _ep in pkg_resources.iter_entry_points(entry_point_group)]
+
+    _eps = entry_points()
+    # Python 3.10+ can select the group directly, older versions hand back a dict of group -> entry points
+    if hasattr(_eps, 'select'):
+        _eps = _eps.select(group=entry_point_group)
+    else:
+        _eps = _eps.get(entry_point_group, [])
+    return [(_ep.name, _ep.value, _ep.load) for _ep in _eps]
+
+
+def _discover_plugins(known: dict):
+    """
+    Finds the actions that other packages register through the entry point group
+    :param known: the actions that have already been found; a plugin can not replace them
+    :return: dict of action -> registry entry, like _discover()
+    """
+    try:
+        _eps = _get_entry_points()
+    except Exception as e:
+        # Plugins are optional; not being able to look for them must never take the built in actions down w/ them
+        log.error("Unable to look for actions in the '{}' entry point group. e:{}".format(entry_point_group, e))
+        return {}
+
+    _found = {}
+    for _name, _value, _load in _eps:
+        if _name in known or _name in _found:
+            log.warning("⚠️ Ignoring the '{}' action from {}; it's already registered".format(_name, _value))
+            continue
+
+        try:
+            _classes_for = _load()
+            _validator = _classes_for['validator']
+            _handler = _classes_for['handler']
+        except Exception as e:
+            # One broken plugin should not stop every other action from working
+            log.error("Unable to load the '{}' action from {}. e:{}".format(_name, _value, e))
+            continue
+
+        _found[_name] = {
+            'validator_module': _validator.__module__,
+            'validator_class': _validator.__name__,
+            'handler_module': _handler.__module__,
+            'handler_class': _handler.__name__,
+            'source': _value
+        }
+        log.debug("Registered the '{}' action from {}".format(_name, _value))
+
+    return _found
+
+
+def _build():
+    """
+    :return: the built in actions + the ones that other packages register
+    """
+    _found = _discover()
+    _found.update(_discover_plugins(_found))
+    return _found
+
+
+def _load_manifest(path: str):
+    log.debug("Loading action manifest from '{}'...".format(path))
+    try:
+        with open(path, 'r') as _f:
+            return json.load(_f)
+    except (OSError, ValueError) as e:
+        _e = "Unable to load the action manifest '{}'. e:{}".format(path, e)
+        log.error(_e)
+        raise TDTException(_e)
+
+
+def get_registry():
+    """
+    :return: dict of action -> {validator_module, validator_class, handler_module, handler_class, source}
+    """
+    global _registry
+    if _registry is None:
+        _manifest = os.environ.get(manifest_env_var)
+        _registry = _load_manifest(_manifest) if _manifest else _build()
+        log.debug("Registry has {} actions".format(len(_registry)))
+
+    return _registry
+
+
+def get_supported_actions():
+    """
+    :return: list of every action that a job file can use
+    """
+    return list(get_registry().keys())
+
+
+def get_entry(action: str):
+    """
+    :param action: E.G.: label_apply
+    :return: the registry entry for the action
+    """
+    _entries = get_registry()
+    if action not in _entries:
+        _e = "Unknown action '{}'. Must be one of {}".format(action, list(_entries.keys()))
+        log.error(_e)
+        raise TDTException(_e)
+    return _entries[action]
+
+
+def get_class(action: str, kind: str):
+    """
+    :param action: E.G.: label_apply
+    :param kind: one of validator, handler
+    :return: the class that validates or handles the action
+    """
+    _key = (action, kind)
+    if _key not in _classes:
+        _entry = get_entry(action)
+        _mod_name = _entry['{}_module'.format(kind)]
+        _cls_name = _entry['{}_class'.format(kind)]
+        if _cls_name is None:
+            _e = "No {} class mapped to action:{}".format(kind, action)
+            log.error(_e)
+            raise TDTException(_e)
+
+        _classes[_key] = getattr(importlib.import_module(_mod_name), _cls_name)
+
+    return _classes[_key]
+
+
+def preload(actions: list, kind: str):
+    """
+    Looks up the classes for the actions before any of them are needed. A missing class is found before the first
+        action has done anything, rather than part way through a job
+    :param actions: E.G.: ['label_apply', 'task_create']
+    :param kind: one of validator, handler
+    :return: dict of action -> class
+    """
+    return {_a: get_class(_a, kind) for _a in actions}
+
+
+def format_registry():
+    """
+    :return: the registry as a table, for --list-actions
+    """
+    _entries = get_registry()
+    _rows = [('ACTION', 'VALIDATOR', 'HANDLER', 'SOURCE')]
+    for _action in sorted(_entries):
+        _entry = _entries[_action]
+        _handler = '-'
+        if _entry['handler_class'] is not None:
+            _handler = "{}.{}".format(_entry['handler_module'], _entry['handler_class'])
+        _rows.append((_action, "{}.{}".format(_entry['validator_module'], _entry['validator_class']), _handler,
+                      # Manifests written before there were plugins don't say where the action came from
+                      _entry.get('source', 'tdt')))
+
+    _widths = [max(len(_r[_i]) for _r in _rows) for _i in range(3)]
+    return '\n'.join('  '.join([_r[_i].ljust(_widths[_i]) for _i in range(3)] + [_r[3]]) for _r in _rows)
+
+
+def write_manifest(path: str):
+    """
+    Discovers the registry and writes it out for use w/ TDT_ACTION_MANIFEST
+    :param path:
+    :return:
+    """
+    with open(path, 'w') as _f:
+        json.dump(_build(), _f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("usage: python3 -m tdt.registry <manifest.json>")
+        exit(1)
+    write_manifest(sys.argv[1])
+    print("Wrote {}".format(sys.argv[1]))
@@ -0,0 +1,207 @@
+###
+# The code that actually drives a list of validated actions against a todoist client.
+# This used to live entirely inside of tmtdt.launch(), but the daemon (and anything else that wants to run a job
+#   without going through the CLI) needs to do the exact same thing, so it lives here now.
+##
+
+# Various ways that todoist can break..
+from tdt.exceptions import TodoistClientError
+from tdt.exceptions import TDTException
+from tdt.utils.commands import commit_in_chunks, forget_originals, optimize_queue
+from tdt.registry import preload
+from tdt.validators.todoist_file import default_api_endpoint
+
+import argparse
+
+# The todoist library
+import todoist
+
+# Debugging
+import logging
+
+
+def get_api_client(client_config: dict):
+    """
+    Builds a todoist API client from the (validated) client config
+    :param client_config: the parsed and validated config file
+    :return:
+    """
+    # Use that API token to get a client
+    _api = client_config['todoist']['api']
+    return todoist.TodoistAPI(_api['token'], api_endpoint=_api.get('endpoint', default_api_endpoint))
+
+
+def sync_api_client(todo_client: todoist.TodoistAPI):
+    """
+    Syncs the client and makes sure that todoist was happy with the request.
+
+    The todoist client keeps track of the sync_token, so only the very first call against an empty cache will be
+        a full sync. Every call after that is incremental.
+
+    :param todo_client:
+    :return: the result of the sync() call
+    """
+    log = logging.getLogger(__name__)
+
+    result = todo_client.sync()
+    # We need to check if there's a `sync_token` field in the dict that comes back. If there is, we managed to sync
+    #   correctly. If there is not, then we need to assume that something went wrong and the resp will explain what...
+    ##
+    if 'sync_token' not in result:
+        _e = "ToDoist Didn't like request to Sync. Is your API_TOKEN correct?. Got back:{}".format(result)
+        # See: https://developer.todoist.com/sync/v8/?python#response-status-codes
+        log.fatal(_e)
+        raise TodoistClientError(_e)
+
+    return result
+
+
+def commit_queued_changes(todo_client: todoist.TodoistAPI, dry_run: bool = False):
+    """
+    Commits whatever is sitting in the client's queue. Used when the actions have been told to defer their commits
+        so that several actions (or jobs) can share a single commit() call.
+
+    :param todo_client:
+    :param dry_run: if set, nothing is sent to todoist
+    :return: True if everything went well, False otherwise
+    """
+    log = logging.getLogger(__name__)
+
+    # Several actions may have queued changes for the same task; fold them together first
+    optimize_queue(todo_client)
+
+    if dry_run:
+        log.info("🟡 Would have committed {} queued change(s) but --dry-run prevents us from going further!"
+                 .format(len(todo_client.queue)))
+        # Don't let the queue grow forever in a long running process
+        del todo_client.queue[:]
+        forget_originals(todo_client)
+        return True
+
+    log.info("💾 Committing {} queued change(s)...".format(len(todo_client.queue)))
+    try:
+        result = commit_in_chunks(todo_client)
+        if result is not None and 'http_code' in result:
+            _e = "🛑 Something went wrong! {etag}: {estr}. http:{hcode} _error_code:{ecode}".format(
+                etag=result.get('error_tag'), estr=result.get('error'), hcode=result['http_code'],
+                ecode=result.get('error_code'))
+            log.error(_e)
+            return False
+        return True
+
+    except todoist.api.SyncError as e:
+        _e = "Error saving changes to ToDoist! What went wrong:`{}`".format(e)
+        log.error(_e)
+        raise TDTException(_e)
+
+    finally:
+        # Committed or not, the queue is gone and so is the 'before' state we recorded for it
+        forget_originals(todo_client)
+
+
+def run_actions(valid_actions: list, todo_client: todoist.TodoistAPI, client_config: dict, args: argparse.Namespace,
+                defer_commits: bool = False, task_scope: set = None, delta=None):
+    """
+    Iterates over each validated action block and dispatches it to the correct *Action class
+
+    :param valid_actions: the list of validated action blocks
+    :param todo_client: a todoist client that has already been synced
+    :param client_config: the parsed/validated config file
+    :param args: the argparse args (dry run?)
+    :param defer_commits: if set, the actions will leave their changes in the client's queue for the caller to commit
+    :param task_scope: if set, the actions only consider the tasks with these IDs when evaluating their filters
+    :param delta: if set, a tdt.utils.delta.SyncDelta so the filters only look at what changed since the last run
+    :return: the list of action blocks that reported a (non-fatal) problem
+    """
+    log = logging.getLogger(__name__)
+
+    # Look up the class that does the work for every (enabled) action before running any of them; a missing class
+    #   stops the job before anything has been changed and, after this, each action is a dict lookup away from its class
+    ##
+    try:
+        _handlers = preload(list(dict.fromkeys([_a['action'] for _a in valid_actions if _a['enabled']])), 'handler')
+    except ModuleNotFoundError as mnfe:
+        _e = "Unable to load the classes that run the actions. mnfe:{} ".format(mnfe)
+        log.error(_e)
+        raise TDTException(_e)
+
+    # Yay, nothing blew up! Begin actually iterating over the actions...
+    _idx = 0
+
+    # Keep track of which action(s) encountered some sort of problem
+    _problems = []
+    for action_block in valid_actions:
+        # Iterate over each action block and pull some details from the action_block to make the following code
+        #   much easier to read.
+        ##
+        # User defined name for the action block
+        action_block_name = action_block['name']
+        # The actual resource_action to take
+        resource_action = action_block['action']
+        # ignore switch
+        action_enable = action_block['enabled']
+
+        # Each action in a job file can be independently toggled on/off
+        if action_enable is False:
+            log.warning("⏭️ Skip #{} {}://{} as it's disabled ...".format(_idx, resource_action, action_block_name))
+            _idx += 1
+            continue
+        else:
+            log.info("🏁 Executing #{} {}://{}...".format(_idx, resource_action, action_block_name))
+
+        ##
+        # Use the action_name from the jobs file to get the class that does the work.
+        #   E.G.: label_create is a create action of resource class label
+        ##
+        action_handler_class = _handlers[resource_action]
+        log.debug("resource_action '{}' handled by '{}.{}'".format(
+            resource_action, action_handler_class.__module__, action_handler_class.__name__))
+
+        try:
+            # Make instance of class
+            action_handler = action_handler_class()
+
+            # Configure the API client for the handler...
+            action_handler.api_client = todo_client
+            # Downloading backups requires the API token. Rather than hack the todo_client and try to get it out
+            #   that way, much easier to just pass it in :)
+            action_handler.api_token = client_config['todoist']['api']['token']
+
+            # ... and pass in the client params
+            action_handler.client_config = client_config
+
+            # ... and pass in the command line args (dry run?)
+            action_handler.cli_args = args
+
+            # ... and let the handler know if the caller will take care of the commit
+            action_handler.defer_commit = defer_commits
+
+            # ... and which tasks (if not all of them) the filters should be evaluated against
+            action_handler.task_scope = task_scope
+            action_handler.delta = delta
+
+            # And finally, do_work on the action from thee job file
+            result = action_handler.do_work(action_block)
+
+            # Log if the action completed successfully or not
+            log.info("☑️ DONE with action({})://{} ({})...".format(_idx, resource_action, action_block_name))
+            if result is False:
+                # If *anything* didn't go according to plan, record the problem action
+                _problems.append(action_block)
+                # And tell the user
+                log.info("... However, a non-fatal error did occur. ⭕")
+            else:
+                # And tell the user
+                log.info("... And nothing went wrong! ✅")
+
+            # In any event, increase idx and move on
+            _idx += 1
+
+        # Blow up if the module couldn't be found
+        except ModuleNotFoundError as mnfe:
+            _e = "Unable to run the resource_action '{}' because a module could not be found. mnfe:{} " \
+                .format(resource_action, mnfe)
+            log.error(_e)
+            raise TDTException(_e)
+
+    return _problems
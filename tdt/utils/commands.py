@@ -0,0 +1,234 @@
+"""
+    Helpers for tidying up the queue of commands that the todoist client sends on commit().
+
+    Actions are written one task (and one mutation) at a time, so a single task can easily end up with several
+        `item_update` commands: label_apply sets the labels, an option.remove on the title sets the content and an
+        option.remove on a label sets the labels again. Some of those updates don't even change anything.
+    Before the queue goes out, optimize_queue():
+        - merges updates of the same object into a single update, unless a command in between stands in the way
+        - drops the fields (and then the whole update) that end up where they started
+        - drops the updates of an object that is deleted later in the same queue
+"""
+import weakref
+
+import logging
+
+import todoist
+
+log = logging.getLogger(__name__)
+
+# api client -> {(kind of object, object id): the fields of the object before the first update was queued for it}
+_originals = weakref.WeakKeyDictionary()
+
+
+def queue_update(obj: todoist.api.models.Model, **kwargs):
+    """
+    Same as obj.update(**kwargs) but remembers what obj looked like before the first update that is queued for it.
+        update() changes the local copy right away, so this must be the only way that actions update objects; the
+        state is recorded at the last moment that it is still the original.
+
+    :param obj: the todoist object to update
+    :param kwargs: the fields to change
+    :return:
+    """
+    _known = _originals.setdefault(obj.api, {})
+    _key = (type(obj).__name__.lower(), obj['id'])
+    if _key not in _known:
+        # The models replace (rather than mutate) their fields on update(), so a shallow copy is enough
+        _known[_key] = dict(obj.data)
+    return obj.update(**kwargs)
+
+
+def forget_originals(api_client: todoist.TodoistAPI):
+    """
+    Once the queue has been committed (or thrown away) the recorded state is no longer the 'before' state
+    :param api_client:
+    :return:
+    """
+    _originals.pop(api_client, None)
+
+
+def _same(before, after):
+    """
+    Labels are a set as far as todoist is concerned; [1, 2] and [2, 1] are the same thing
+    :param before:
+    :param after:
+    :return:
+    """
+    if isinstance(before, list) and isinstance(after, list):
+        return sorted(before, key=str) == sorted(after, key=str)
+    return before == after
+
+
+def _object_of(cmd: dict):
+    """
+    :param cmd: a queued command
+    :return: (kind of object, verb, id of the object) the command is about. E.G.: ('item', 'update', 1234)
+    """
+    _kind, _, _verb = cmd['type'].rpartition('_')
+    return _kind, _verb, cmd['args'].get('id', cmd.get('temp_id'))
+
+
+def _temp_ids_in(args: dict):
+    """
+    :param args: the args of a queued command
+    :return: every string value (or string in a list value) in args; the temp_ids are among them
+    """
+    for _v in args.values():
+        if isinstance(_v, str):
+            yield _v
+        elif isinstance(_v, list):
+            yield from (_x for _x in _v if isinstance(_x, str))
+
+
+def optimize_queue(api_client: todoist.TodoistAPI):
+    """
+    Rewrites api_client.queue in place so that it does the same thing with as few commands as possible
+    :param api_client:
+    :return: dict w/ the number of commands before and after
+    """
+    _queue = api_client.queue
+    _before = len(_queue)
+    if _before < 1:
+        return {'before': _before, 'after': _before, 'saved': 0}
+
+    # Objects deleted somewhere in the queue; anything we were going to update on them first is moot
+    _deleted = {_object_of(_c)[::2] for _c in _queue if _object_of(_c)[1] == 'delete'}
+
+    _optimized = []
+    # (kind, id) -> (the update command that later updates of the object are folded into, where it is in the queue).
+    #   Folding an update into an earlier one moves its args forward, past everything queued in between. So, any
+    #   other command about the object ends the run, as does a later update that refers to an object (by temp_id)
+    #   that was created after the run started; the merged update would refer to it before it exists.
+    ##
+    _open_updates = {}
+    # temp_id -> where in the queue the object was created
+    _created = {}
+    for _pos, _cmd in enumerate(_queue):
+        _kind, _verb, _id = _object_of(_cmd)
+        if _cmd.get('temp_id'):
+            _created[_cmd['temp_id']] = _pos
+
+        if _verb != 'update':
+            _open_updates.pop((_kind, _id), None)
+            _optimized.append(_cmd)
+            continue
+
+        if (_kind, _id) in _deleted:
+            log.debug("Dropping {} of {}://{}; it is deleted later".format(_cmd['type'], _kind, _id))
+            continue
+
+        if (_kind, _id) in _open_updates:
+            _open, _opened_at = _open_updates[(_kind, _id)]
+            if all(_created.get(_t, -1) < _opened_at for _t in _temp_ids_in(_cmd['args'])):
+                _open['args'].update(_cmd['args'])
+                continue
+
+        _open_updates[(_kind, _id)] = (_cmd, _pos)
+        _optimized.append(_cmd)
+
+    # Now that each update holds the final value of each field, drop the ones that didn't actually change
+    _known = _originals.get(api_client, {})
+    _final = []
+    for _cmd in _optimized:
+        _kind, _verb, _id = _object_of(_cmd)
+        _original = _known.get((_kind, _id))
+        if _verb == 'update' and _original is not None:
+            _unchanged = [_k for _k, _v in _cmd['args'].items()
+                          if _k != 'id' and _k in _original and _same(_original[_k], _v)]
+            for _k in _unchanged:
+                del _cmd['args'][_k]
+
+            if len(_cmd['args']) < 2:
+                log.debug("Dropping {} of {}://{}; nothing changed".format(_cmd['type'], _kind, _id))
+                continue
+
+        _final.append(_cmd)
+
+    _queue[:] = _final
+
+    _stats = {'before': _before, 'after': len(_final), 'saved': _before - len(_final)}
+    if _stats['saved'] > 0:
+        log.info("🧹 Optimized the command queue from {before} to {after} command(s); saved {saved}".format(**_stats))
+    return _stats
+
+
+# The Sync API only takes so many commands per request
+commit_chunk_size = 100
+
+
+def _remap_temp_ids(api_client: todoist.TodoistAPI, commands: list):
+    """
+    Commands that are still waiting may refer to objects (by temp_id) that were created by a chunk that has already
+        been committed. The server only knows those by their real ID now.
+    :param api_client:
+    :param commands:
+    :return:
+    """
+    _map = api_client.temp_ids
+    if len(_map) < 1:
+        return
+
+    for _cmd in commands:
+        for _k, _v in _cmd['args'].items():
+            if isinstance(_v, str) and _v in _map:
+                _cmd['args'][_k] = _map[_v]
+            elif isinstance(_v, list):
+                _cmd['args'][_k] = [_map[_x] if isinstance(_x, str) and _x in _map else _x for _x in _v]
+
+
+def _leave_unsent(api_client: todoist.TodoistAPI, unsent: list, sent: int):
+    """
+    A chunk failed part way through a chunked commit. The chunks before it can't be taken back, so the commands that
+        did not go out are put back in the queue (and logged) for the caller to retry or throw away
+    :param api_client:
+    :param unsent: the commands that were not sent
+    :param sent: how many commands were committed before the failure
+    :return:
+    """
+    api_client.queue[:] = unsent
+    log.error("🛑 {} command(s) were committed, {} were not sent and are left in the queue".format(sent, len(unsent)))
+    log.debug("Not sent: {}".format(', '.join('{}:{}'.format(_c['type'], _c['uuid']) for _c in unsent)))
+
+
+def commit_in_chunks(api_client: todoist.TodoistAPI, chunk_size: int = commit_chunk_size):
+    """
+    Same as api_client.commit() but sends the queue chunk_size commands at a time. If a chunk fails, the commands that
+        were not sent are left in api_client.queue
+    :param api_client:
+    :param chunk_size:
+    :return: the result of the first chunk that reported an error, otherwise the result of the last chunk
+    """
+    _pending = list(api_client.queue)
+    if len(_pending) <= chunk_size:
+        return api_client.commit()
+
+    log.info("📦 Committing {} commands in chunks of {}...".format(len(_pending), chunk_size))
+    _result = None
+    _sent = 0
+    while len(_pending) > 0:
+        _chunk = _pending[:chunk_size]
+        api_client.queue[:] = _chunk
+        _pending = _pending[chunk_size:]
+
+        try:
+            _result = api_client.commit()
+        except todoist.api.SyncError:
+            # The chunk went out; the server rejected some of its commands. The rest of the queue did not go out
+            _remap_temp_ids(api_client, _pending)
+            _leave_unsent(api_client, _pending, _sent + len(_chunk))
+            raise
+        except Exception:
+            # Never made it to the server
+            _leave_unsent(api_client, _chunk + _pending, _sent)
+            raise
+
+        if _result is not None and 'http_code' in _result:
+            # Don't send the rest; the caller will report the error
+            _leave_unsent(api_client, _chunk + _pending, _sent)
+            return _result
+
+        _sent += len(_chunk)
+        _remap_temp_ids(api_client, _pending)
+
+    return _result
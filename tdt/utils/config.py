@@ -10,13 +10,10 @@ from tdt.log_utils import LogInfo
 # Basic utils/wrappers
 from tdt import utils
 
-# The actual validation for job_files
-from tdt.validators import validate_actions
-
-# And todoist config file validator
-from tdt.validators.todoist_file import validate_todoist_file
-
-from tdt.exceptions import JobFileError, TodoistFileError
+# The validators (voluptuous) and the YAML parser are only imported by the functions that use them; validating the
+#   CLI args (or printing --help) shouldn't have to pay for them
+##
+from tdt.exceptions import JobFileError, TodoistFileError, ScheduleFileError
 
 # for args/cli interface
 import argparse
@@ -24,15 +21,6 @@ import argparse
 # For path/file validation
 import os
 
-# For identifying the "use environment variables" pattern in the parsed yaml
-import re
-
-# The job files are defined as YAML
-import yaml
-
-# Debugging
-from prettyprinter import pprint as pp
-
 
 def validate_args(args: argparse.Namespace):
     """
@@ -60,6 +48,37 @@ def validate_args(args: argparse.Namespace):
     elif args.log_file is None:
         log.info("Logging will not be sent to a file!")
 
+    ###
+    # DAEMON
+    ###
+    # In daemon mode, the job files come from the schedule file so that's what we must be able to access
+    if getattr(args, 'daemon', False):
+        if not os.path.isfile(args.schedule_file):
+            _e = "Unable to access the schedule_file: {}".format(args.schedule_file)
+            log.fatal(_e)
+            raise FileNotFoundError(_e)
+
+        # Webhooks come in through the same HTTP server as the health checks
+        if getattr(args, 'webhook', False) and args.health_port is None:
+            _e = "--webhook requires --health-port to be set"
+            log.fatal(_e)
+            raise AttributeError(_e)
+        return True
+
+    if getattr(args, 'parallelism', None) is not None and args.parallelism < 1:
+        _e = "--parallelism must be at least 1. Got:{}".format(args.parallelism)
+        log.fatal(_e)
+        raise AttributeError(_e)
+
+    # In validate only mode, the job files come from --validate-only
+    if getattr(args, 'validate_only', None) is not None:
+        for _p in args.validate_only:
+            if not os.path.exists(_p):
+                _e = "Unable to access the job file/dir to validate: {}".format(_p)
+                log.fatal(_e)
+                raise FileNotFoundError(_e)
+        return True
+
     ###
     # JOBS
     ###
@@ -74,6 +93,13 @@ def validate_args(args: argparse.Namespace):
         log.fatal(_e)
         raise FileNotFoundError(_e)
 
+    # Each of the --accounts must be a config file or a directory of them
+    for _a in getattr(args, 'accounts', None) or []:
+        if not os.path.exists(_a):
+            _e = "Unable to access the account config file/dir: {}".format(_a)
+            log.fatal(_e)
+            raise FileNotFoundError(_e)
+
     # If nothing blew up, args are valid!
     return True
 
@@ -106,19 +132,46 @@ def set_logging(args=argparse.Namespace):
     LogInfo(log_opts)
 
 
-def validate_job_file(job_file_path: str = ''):
+def get_job_cache_dir(args: argparse.Namespace):
+    """
+    :param args: the argparse args
+    :return: where validated job files are cached (next to the rest of our state) or None if caching is off
+    """
+    if getattr(args, 'no_job_cache', False):
+        return None
+    return os.path.join(os.path.expanduser(args.state_dir), 'job_cache')
+
+
+def validate_job_file(job_file_path: str = '', cache_dir: str = None):
     """
     Attempts to a file and, if able to read valid YAML from the file, confirm that the file defines a valid job
     :param job_file_path:
+    :param cache_dir: if set, validated job files are cached here (see tdt.utils.job_cache)
     :return:
     """
+    log = logging.getLogger(__name__)
+
+    _key = None
+    if cache_dir is not None:
+        from tdt.utils.job_cache import get_cache_key, load_cached_actions, store_cached_actions
+        _key = get_cache_key(utils.read_file(job_file_path))
+        _cached = load_cached_actions(cache_dir, job_file_path, _key)
+        if _cached is not None:
+            log.info("⚡ Using the cached (already validated) copy of job://{}".format(job_file_path))
+            return _cached
 
     # Open the file and pull the content.
     job_file = get_job_file(job_file_path)
 
     # With the YAML in hand, we need to validate it. If nothing blows up, we'll get back a list of valid objects
     #   which we'll return to the caller
-    return validate_actions(job_file)
+    from tdt.validators import validate_actions
+    _actions = validate_actions(job_file)
+
+    if _key is not None:
+        store_cached_actions(cache_dir, job_file_path, _key, _actions)
+
+    return _actions
 
 
 def get_job_file(job_file: str = ''):
@@ -130,51 +183,20 @@ def get_job_file(job_file: str = ''):
     :param job_file:
     :return:
     """
+    # The job files are defined as YAML
+    import yaml
+    from tdt.utils.loader import load_yaml, JobFileLoader
+
     log = logging.getLogger(__name__)
     log.debug("Fetching job file: `{}`".format(job_file))
     try:
-        ##
-        # This is a very clever use of add_implicit_resolver from the elastic/curator project.
-        # Any string that is not native YAML, but looks like the regex ${*} will be treated as
-        #   an env-var lookup.
-        # See: https://pyyaml.org/wiki/PyYAMLDocumentation the Constructors, represents, resolvers section
-        ##
-        env_var_matcher = re.compile(r"\${([^}^{]+)\}")
-        log.debug("env_var_matcher:{}".format(env_var_matcher))
-        yaml.add_implicit_resolver("!env", env_var_matcher)
-
-        # We're required to pass a function that yaml will run when it encounters an !env tag or ${} syntax
-        def single_constructor(loader, node):
-            # get the string that triggered the custom constructor
-            value = loader.construct_scalar(node)
-            # Get the string *inside* of the ${} that we'll now need to pull from env_vars
-            proto = env_var_matcher.match(value).group(1)
-            log.debug("Resolving '{}' via env vars...".format(proto))
-            default = None
-            # If there's a : in the ${thing:default} then we split on : and whatever is to the left is the env var to use
-            #   and whatever is on the right is the default to use
-            if len(proto.split(':')) > 1:
-                envvar, default = proto.split(':')
-                log.debug("user supplied default:{}".format(default))
-            else:
-                envvar = proto
-            log.debug("envvar:{} default:{}".format(envvar, default))
-
-            log.info("Attempting to resolve {envvar} from environment variables, falling back to: {default}"
-                         .format(envvar=envvar, default=default))
-            _r = os.environ[envvar] if envvar in os.environ else default
-            log.debug("_R:{}".format(_r))
-            return os.environ[envvar] if envvar in os.environ else default
-
-        yaml.add_constructor('!env', single_constructor)
-
-        # When parsing untrusted YAML, it's possible to make Python execute code. This is by design, but to
-        #   prevent warning messages, and to disable support for the dangerous YAML, we specify the loader type
+        # When parsing untrusted YAML, it's possible to make Python execute code. The loader is a (libyaml, if
+        #   available) SafeLoader w/ the env-var resolver registered on it once
         # See: https://github.com/yaml/pyyaml/wiki/PyYAML-yaml.load(input)-Deprecation
         ##
-        return yaml.load(utils.read_file(job_file), Loader=yaml.FullLoader)
+        return load_yaml(utils.read_file(job_file), JobFileLoader)
 
-    except yaml.scanner.ScannerError as err:
+    except yaml.YAMLError as err:
         # If the file could be opened, but wasn't valid YAML...
         _e = "The job_file:{} could not be parsed as YAML. Err:{}".format(job_file, err)
         log.fatal(_e)
@@ -187,6 +209,10 @@ def get_todoist_file(todoist_file: str = ''):
     :param todoist_file:
     :return:
     """
+    import yaml
+    from tdt.utils.loader import load_yaml
+    from tdt.validators.todoist_file import validate_todoist_file
+
     log = logging.getLogger(__name__)
     try:
         # When parsing untrusted YAML, it's possible to make Python execute code. This is by design, but to
@@ -194,10 +220,32 @@ def get_todoist_file(todoist_file: str = ''):
         # See: https://github.com/yaml/pyyaml/wiki/PyYAML-yaml.load(input)-Deprecation
         ##
         # We pull the YAML out, then validate it
-        _todo_yaml = yaml.load(utils.read_file(todoist_file), Loader=yaml.FullLoader)
+        _todo_yaml = load_yaml(utils.read_file(todoist_file))
         return validate_todoist_file(_todo_yaml)
-    except yaml.scanner.ScannerError as err:
+    except yaml.YAMLError as err:
         # If the file could be opened, but wasn't valid YAML...
         _e = "The todoist_file: `{}` could not be parsed as YAML. Err:{}".format(todoist_file, err)
         log.fatal(_e)
         raise TodoistFileError(_e)
+
+
+def get_schedule_file(schedule_file: str = ''):
+    """
+    Takes a path to the daemon's schedule file and, if the file is valid yaml, returns the validated content
+    :param schedule_file:
+    :return:
+    """
+    import yaml
+    from tdt.utils.loader import load_yaml
+    from tdt.validators.schedule_file import validate_schedule_file
+
+    log = logging.getLogger(__name__)
+    try:
+        # We pull the YAML out, then validate it
+        _schedule_yaml = load_yaml(utils.read_file(schedule_file))
+        return validate_schedule_file(_schedule_yaml)
+    except yaml.YAMLError as err:
+        # If the file could be opened, but wasn't valid YAML...
+        _e = "The schedule_file: `{}` could not be parsed as YAML. Err:{}".format(schedule_file, err)
+        log.fatal(_e)
+        raise ScheduleFileError(_e)
@@ -0,0 +1,159 @@
+"""
+    A (very) small cron expression parser so the daemon can figure out when each job is due.
+
+    Supports the classic 5 fields: minute hour day-of-month month day-of-week
+    Each field can be `*`, a number, a range (`1-5`), a step (`*/15` or `0-30/10`) or a comma separated list of those.
+    The usual @hourly, @daily, @weekly, @monthly aliases are supported as well.
+"""
+from datetime import datetime, timedelta
+
+import logging
+
+# Aliases that map to a 'full' expression
+_aliases = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+}
+
+# (name, min, max) for each of the 5 fields, in order
+_fields = [
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    # Cron uses 0 (and 7) for sunday
+    ('dow', 0, 7),
+]
+
+
+def _parse_field(token: str, name: str, low: int, high: int):
+    """
+    Turns a single cron field into the set of integers that it allows
+    :param token: the raw field, e.g. '*/15'
+    :param name: name of the field, for error messages
+    :param low: smallest allowed value
+    :param high: largest allowed value
+    :return: set of ints
+    """
+    _allowed = set()
+    for _part in token.split(','):
+        _step = 1
+        if '/' in _part:
+            _part, _step = _part.split('/', 1)
+            _step = int(_step)
+            if _step < 1:
+                raise ValueError("Step for cron field '{}' must be positive. Got:{}".format(name, token))
+
+        if _part == '*':
+            _start, _end = low, high
+        elif '-' in _part:
+            _start, _end = [int(_x) for _x in _part.split('-', 1)]
+        else:
+            _start = int(_part)
+            # A bare number w/ a step (e.g. 5/15) means 'starting at'
+            _end = high if _step > 1 else _start
+
+        if _start < low or _end > high or _start > _end:
+            raise ValueError("Cron field '{}' must be within {}-{}. Got:{}".format(name, low, high, token))
+
+        _allowed.update(range(_start, _end + 1, _step))
+
+    return _allowed
+
+
+class CronSchedule(object):
+    """
+    A parsed cron expression
+    """
+
+    def __init__(self, expression: str):
+        """
+        :param expression: the cron expression, e.g. '*/5 * * * *'
+        """
+        self.log = logging.getLogger(__name__)
+
+        self.expression = expression
+        _expr = _aliases.get(expression.strip(), expression)
+
+        _tokens = _expr.split()
+        if len(_tokens) != len(_fields):
+            _e = "Cron expression must have {} fields. Got:`{}`".format(len(_fields), expression)
+            raise ValueError(_e)
+
+        _parsed = {}
+        for _token, (_name, _low, _high) in zip(_tokens, _fields):
+            _parsed[_name] = _parse_field(_token, _name, _low, _high)
+
+        self.minutes = _parsed['minute']
+        self.hours = _parsed['hour']
+        self.days = _parsed['day']
+        self.months = _parsed['month']
+
+        # Python says monday == 0, cron says sunday == 0 (and 7). Convert now so the checks are cheap later
+        self.weekdays = {(_d - 1) % 7 for _d in _parsed['dow']}
+
+        # Cron has a quirk: if both day-of-month and day-of-week are restricted, a day matches if EITHER does
+        self._dom_restricted = _tokens[2] != '*'
+        self._dow_restricted = _tokens[4] != '*'
+
+    def _day_matches(self, when: datetime):
+        _dom = when.day in self.days
+        _dow = when.weekday() in self.weekdays
+        if self._dom_restricted and self._dow_restricted:
+            return _dom or _dow
+        return _dom and _dow
+
+    def matches(self, when: datetime):
+        """
+        Checks if the schedule fires on the (minute of) when
+        :param when:
+        :return:
+        """
+        return when.month in self.months and self._day_matches(when) and \
+            when.hour in self.hours and when.minute in self.minutes
+
+    def next_after(self, when: datetime):
+        """
+        Finds the first minute strictly after `when` that the schedule fires on.
+        Rather than walking minute by minute, we skip whole months/days/hours when they can't possibly match.
+
+        :param when:
+        :return: a datetime (with the same tzinfo as when)
+        """
+        _t = when.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+        # A bit more than 4 years worth of months is enough for anything except a Feb 29th that never comes
+        _limit = _t + timedelta(days=366 * 5)
+        while _t < _limit:
+            if _t.month not in self.months:
+                # Jump to midnight on the first of the next month
+                _year = _t.year + (1 if _t.month == 12 else 0)
+                _month = 1 if _t.month == 12 else _t.month + 1
+                _t = _t.replace(year=_year, month=_month, day=1, hour=0, minute=0)
+                continue
+
+            if not self._day_matches(_t):
+                _t = _t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+
+            if _t.hour not in self.hours:
+                _t = _t.replace(minute=0) + timedelta(hours=1)
+                continue
+
+            if _t.minute not in self.minutes:
+                _t = _t + timedelta(minutes=1)
+                continue
+
+            return _t
+
+        _e = "Cron expression `{}` never fires!".format(self.expression)
+        self.log.error(_e)
+        raise ValueError(_e)
+
+    def __repr__(self):
+        return "CronSchedule('{}')".format(self.expression)
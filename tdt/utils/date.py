@@ -4,6 +4,7 @@
 
 # Fabulous date/time parser tool
 from datetime import timedelta, datetime, date
+from functools import lru_cache
 
 import dateutil.parser
 
@@ -14,9 +15,6 @@ from pytz import timezone
 # Logging
 import logging
 
-# Debugging
-from prettyprinter import pprint as pp
-
 # Maps string day of week to number
 _dow_map = {
     'monday': 0,
@@ -54,6 +52,53 @@ def get_todoist_formatted_string_from_datetime(dt: datetime.date):
         return dt.strftime(todoist_date_format)
 
 
+def parse_due_date(value: str):
+    """
+    Parses a Todoist due date (or backup version) into a datetime w/o a time zone, just like
+        dateutil.parser.parse(value, ignoretz=True) does. Todoist only ever sends a few shapes:
+        - '2020-01-02'              all day
+        - '2020-01-02T15:50:00'     floating
+        - '2020-01-02T15:50:00Z'    fixed, always ZULU
+        - '2020-01-02 15:50'        backup versions
+    Those are picked apart w/ datetime.fromisoformat(), which is a lot faster than dateutil. Anything else still goes
+        to dateutil.
+
+    :param value:
+    :return: naive datetime
+    """
+    _len = len(value)
+    if _len >= 10 and value[4] == '-' and value[7] == '-':
+        _end = None
+        if _len == 10:
+            _end = 10
+        elif _len >= 16 and value[10] in 'T ' and value[13] == ':':
+            if _len == 16:
+                _end = 16
+            elif value[16] == ':' and (_len == 19 or (_len == 20 and value[19] == 'Z')):
+                _end = 19
+
+        if _end is not None:
+            try:
+                return datetime.fromisoformat(value[:_end])
+            except ValueError:
+                # Looked right, but wasn't; let dateutil have a go (and explain what's wrong)
+                pass
+
+    return dateutil.parser.parse(value, ignoretz=True)
+
+
+@lru_cache(maxsize=65536)
+def _localize_due_date(value: str, tz: timezone):
+    """
+    Parse the task due date, ignoring any timezone that may be present, and attach our own. Localizing is the slow
+        part and every date filter does it for every task, so the result is kept; it only depends on the arguments
+    :param value: the due date string
+    :param tz: the (pytz) timezone the due date is in
+    :return:
+    """
+    return tz.localize(parse_due_date(value))
+
+
 def get_tz_aware_task_due_date(task: todoist.api.models.Item, assumed_tz: timezone('UTC')):
     """
     Todoist supports tasks with and without timezones. If the task has no time zone, the client gets to pick which
@@ -70,7 +115,7 @@ def get_tz_aware_task_due_date(task: todoist.api.models.Item, assumed_tz: timezo
             'timezone': 'America/Los_Angeles'
             },
 
-    So we parse the date, telling dateutil to IGNORE the timezone as we'll add that later.
+    So we parse the date, IGNORING the timezone as we'll add that later.
     This gets us a datetime object that has the correct y/m/d h/m/s but no time zone.
     We'll apply either our assumed zone or the one explicitly declared in the task
 
@@ -85,28 +130,23 @@ def get_tz_aware_task_due_date(task: todoist.api.models.Item, assumed_tz: timezo
     if task['due'] is None:
         return None
 
-    ##
-    # Parse the task due date, ignoring any timezone that may be present as we'll have to attach our own, later
-    _dd = dateutil.parser.parse(task['due']['date'], ignoretz=True)
-
     # To make this function a bit more generic, we support passing in a full task object OR just a due object from
     #   something else in the todoist ecosystem... like a reminder.
     ##
     _name = task['content'] if 'content' in task else "NONE"
 
     # And if the task has a time zone associated with it, apply that to the ZULU we just parsed
-    if 'timezone' in task['due']:
-        if task['due']['timezone'] is not None:
-            logging.debug("task:`{}` has a timezone:`{}` for due.date:{}"
-                          .format(_name, task['due']['timezone'], task['due']['date']))
+    if task['due'].get('timezone') is not None:
+        logging.debug("task:`{}` has a timezone:`{}` for due.date:{}"
+                      .format(_name, task['due']['timezone'], task['due']['date']))
 
-            _task_tz = timezone(task['due']['timezone'])
-            _dd = _task_tz.localize(_dd)
+        _task_tz = timezone(task['due']['timezone'])
+        _dd = _localize_due_date(task['due']['date'], _task_tz)
 
-    # Task has no time zone, so localize it to the user's local zone
+    # Task has no time zone (Todoist sends `timezone: null` for those), so localize it to the user's local zone
     else:
         logging.debug("task://{} has no timezone, will assume '{}'...".format(_name, assumed_tz))
-        _dd = assumed_tz.localize(_dd)
+        _dd = _localize_due_date(task['due']['date'], assumed_tz)
 
     return _dd
 
@@ -187,26 +227,13 @@ def get_simplified_due_from_obj(action_block: dict):
         _ref = _x['to']
         _dir = _x['direction']
 
-        # The time_delta object we'll use to shift to before/after
-        _td = None
-        if _dir == 'before':
-            if isinstance(_ref, datetime):
-                _td = timedelta(minutes=-1)
-            else:
-                # In the even of a date object, _ref will already be the 'at midnight' version, so all we need to do
-                # is add or subtract one full day to get the 'before' or 'after' from _ref
-                ##
-                _td = timedelta(days=-1)
-        else:
-            # Same logic, just positive integers this time
-            if isinstance(_ref, datetime):
-                _td = timedelta(minutes=1)
-            else:
-                _td = timedelta(days=1)
+        # A due date that came from a word (E.G.: after monday) needs to be worked out again (w/ the direction) when
+        #   the cached job file is loaded
+        ##
+        if isinstance(_ref, _Relative) and _ref.resolver is resolve_relative_date:
+            return resolve_relative_due(_ref.relative_to, _dir)
 
-        # Move forward/backwards by one unit of time (day or min)
-        _ref = _ref + _td
-        return _ref
+        return _shift_relative(_ref, _dir)
 
     if 'delta' in action_block['due']:
         ##
@@ -219,6 +246,33 @@ def get_simplified_due_from_obj(action_block: dict):
         return timedelta(**_x)
 
 
+def _shift_relative(ref: date, direction: str):
+    """
+    :param ref: the date (or date-time) the user gave
+    :param direction: before or after
+    :return: ref, moved forward/backwards by one unit of time (day or min)
+    """
+    # The time_delta object we'll use to shift to before/after
+    _td = None
+    if direction == 'before':
+        if isinstance(ref, datetime):
+            _td = timedelta(minutes=-1)
+        else:
+            # In the even of a date object, ref will already be the 'at midnight' version, so all we need to do
+            # is add or subtract one full day to get the 'before' or 'after' from ref
+            ##
+            _td = timedelta(days=-1)
+    else:
+        # Same logic, just positive integers this time
+        if isinstance(ref, datetime):
+            _td = timedelta(minutes=1)
+        else:
+            _td = timedelta(days=1)
+
+    # Move forward/backwards by one unit of time (day or min)
+    return ref + _td
+
+
 # TODO: need to add timezone support. when should default to the TIMEZONE
 #   that's in the user config file!
 def get_next_date_by_relative(dow: str, when: date = datetime.now().date()):
@@ -278,3 +332,76 @@ def get_next_date_by_dow(dow: str, when: date = datetime.now().date(), direction
         _delta = ((when.weekday() - get_dow_by_string(dow)) % 7)
         # Now that we know how many days to add, make a time delta obj and add that to when
         return when - timedelta(days=_delta)
+
+
+class _Relative(object):
+    """
+    A date that the user gave as a word ('today', 'monday'...) rather than as a date. When pickled (E.G.: the job file
+        cache) the word is stored instead of the date, so that it is worked out again when it is loaded.
+    """
+    # The word the user gave, and the (module level) function + args that turn it into this date
+    relative_to = None
+    resolver = None
+    resolver_args = ()
+
+    def __reduce_ex__(self, protocol):
+        if self.resolver is None:
+            # Date math on a relative date gives a new (sub-class) object that is no longer tied to the word
+            return super().__reduce_ex__(protocol)
+        return self.resolver, self.resolver_args
+
+    # Dates are immutable; copies don't need to (and shouldn't) re-evaluate the word
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class RelativeDate(_Relative, date):
+    pass
+
+
+class RelativeDatetime(_Relative, datetime):
+    pass
+
+
+def mark_relative(value: date, resolver, *args):
+    """
+    :param value: the date (or date-time) that the user's word works out to right now
+    :param resolver: module level function that, given args, returns the marked date again
+    :param args: the first is always the word the user gave. E.G.: monday
+    :return: value, as a RelativeDate or RelativeDatetime
+    """
+    if isinstance(value, datetime):
+        _r = RelativeDatetime(value.year, value.month, value.day, value.hour, value.minute, value.second,
+                              value.microsecond, value.tzinfo)
+    else:
+        _r = RelativeDate(value.year, value.month, value.day)
+
+    _r.relative_to = args[0]
+    _r.resolver = resolver
+    _r.resolver_args = args
+    return _r
+
+
+def resolve_relative_date(value: str):
+    """
+    :param value: one of relative_date_strings
+    :return: what value means right now
+    """
+    if value == 'now':
+        _dt = datetime.now()
+    else:
+        _dt = get_next_date_by_dow(value, datetime.now().date())
+    return mark_relative(_dt, resolve_relative_date, value)
+
+
+def resolve_relative_due(value: str, direction: str):
+    """
+    :param value: one of relative_date_strings
+    :param direction: before or after
+    :return: the due date that a relative due block works out to right now
+    """
+    return mark_relative(_shift_relative(resolve_relative_date(value), direction), resolve_relative_due, value,
+                         direction)
@@ -0,0 +1,161 @@
+"""
+    Helpers for delta filter evaluation.
+
+    An incremental sync tells us exactly which tasks, labels and projects changed since the last sync. A task that
+        did not change (and did not match last time) can not suddenly match a filter... unless the filter depends on
+        the current time, or a label/project it selects by name was renamed. So, rather than running every filter
+        against every task, we keep the set of task IDs that each filter matched last time and only evaluate the
+        tasks that changed plus the ones that matched before.
+"""
+import hashlib
+import json
+import os
+
+import logging
+
+import todoist
+
+
+# The properties of a label/project that filters select on. If one of these changes, so can the tasks that match
+_snapshot_keys = ('name', 'parent_id')
+
+
+def snapshot_names(api_client: todoist.TodoistAPI):
+    """
+    Records the name (and parent) of every label and project so that renames and moves can be spotted after the next
+        sync
+    :param api_client:
+    :return: dict of component -> {id: (name, parent_id)}
+    """
+    return {
+        _c: {_o['id']: tuple(_o.data.get(_k) for _k in _snapshot_keys) for _o in api_client[_c]}
+        for _c in ('labels', 'projects')
+    }
+
+
+class SyncDelta(object):
+    """
+    What changed in the last (incremental) sync
+    """
+
+    def __init__(self, items: set = None, invalidated: bool = False, match_sets=None):
+        """
+        :param items: IDs of every task that was added, changed or deleted
+        :param invalidated: if set, every stored match set is useless and every filter must see every task
+        :param match_sets: the MatchSets to read/update
+        """
+        self.items = items if items is not None else set()
+        self.invalidated = invalidated
+        self.match_sets = match_sets
+
+    @classmethod
+    def from_sync(cls, result: dict, names_before: dict, match_sets=None):
+        """
+        Works out the delta from what sync() returned
+        :param result: the raw sync() response
+        :param names_before: snapshot_names() from just before the sync
+        :param match_sets: the MatchSets to read/update
+        :return:
+        """
+        log = logging.getLogger(__name__)
+
+        # A full sync means we have no idea what changed
+        if result.get('full_sync', False):
+            log.debug("full_sync; delta is invalid")
+            return cls(invalidated=True, match_sets=match_sets)
+
+        _items = {_i['id'] for _i in result.get('items', [])}
+
+        # Filters select by label/project *name*; a rename or delete can change which tasks match without touching
+        #   the tasks themselves. So can moving a project, for filters that include sub-projects. A brand new
+        #   label/project can't have any tasks that weren't in the sync, too.
+        ##
+        for _c in ('labels', 'projects'):
+            for _o in result.get(_c, []):
+                if _o['id'] not in names_before[_c]:
+                    continue
+                if _o.get('is_deleted', 0) or \
+                        tuple(_o.get(_k) for _k in _snapshot_keys) != names_before[_c][_o['id']]:
+                    log.info("🌐 {}://{} was renamed/moved/deleted; every filter must be re-evaluated".format(
+                        _c, _o['id']))
+                    return cls(_items, invalidated=True, match_sets=match_sets)
+
+        log.debug("Sync touched {} task(s)".format(len(_items)))
+        return cls(_items, match_sets=match_sets)
+
+
+class MatchSets(object):
+    """
+    The set of task IDs that each filter matched the last time it was evaluated. Persisted to disk along with the
+        sync_token that they are valid for.
+    """
+
+    def __init__(self, path: str):
+        self.log = logging.getLogger(__name__)
+
+        self.path = path
+        self._sets = {}
+        # The keys that were read or written since the last save(). The rest belong to filters that are no longer in
+        #   any job file
+        self._touched = set()
+
+    @staticmethod
+    def key_for(filters: list):
+        """
+        Filters are keyed by their content, so editing a filter in the job file automatically starts a fresh set
+        :param filters: the validated filter objects
+        :return:
+        """
+        return hashlib.sha1(repr(filters).encode('utf-8')).hexdigest()
+
+    def get(self, key: str):
+        self._touched.add(key)
+        return self._sets.get(key)
+
+    def put(self, key: str, task_ids: set):
+        self._touched.add(key)
+        self._sets[key] = set(task_ids)
+
+    def invalidate(self):
+        self.log.debug("Dropping {} match set(s)".format(len(self._sets)))
+        self._sets = {}
+
+    def load(self, sync_token: str):
+        """
+        Loads the match sets from disk... but only if they were saved against the same state the client has now
+        :param sync_token: the sync_token of the (cached) client state
+        :return:
+        """
+        if not os.path.isfile(self.path):
+            return
+
+        with open(self.path, 'r') as fh:
+            _data = json.load(fh)
+
+        if _data.get('sync_token') != sync_token:
+            self.log.info("Stored match sets are for a different sync_token; starting fresh")
+            return
+
+        self._sets = {_k: set(_v) for _k, _v in _data['sets'].items()}
+        self.log.info("📂 Loaded {} match set(s)".format(len(self._sets)))
+
+    def prune(self):
+        """
+        Drops every match set that was not used since the last save()
+        :return:
+        """
+        _stale = set(self._sets) - self._touched
+        if len(_stale) > 0:
+            self.log.debug("Dropping {} unused match set(s)".format(len(_stale)))
+        for _k in _stale:
+            del self._sets[_k]
+        self._touched = set()
+
+    def save(self, sync_token: str):
+        self.prune()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as fh:
+            json.dump({
+                'sync_token': sync_token,
+                'sets': {_k: list(_v) for _k, _v in self._sets.items()}
+            }, fh)
@@ -0,0 +1,151 @@
+"""
+    Cache of validated job files.
+
+    Parsing and validating a job file takes a while and job files rarely change. Once a job file is validated, the
+        result is pickled into the cache dir under a key made from:
+        - the content of the job file
+        - the tdt version and the source of the validators (a new version may validate differently; git checkouts are
+            all version 'dev')
+        - the values of the env vars that the job file refers to (`${VAR:default}`)
+    If any of those change, the key changes and the job file is validated again.
+
+    Relative dates ('today', 'monday', 'now'...) are pickled as the word (see tdt.utils.date.RelativeDate) so they are
+        worked out again every time the cache is loaded.
+"""
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+
+import logging
+
+from tdt.version import __version__
+
+log = logging.getLogger(__name__)
+
+# Same pattern that get_job_file() uses to find env vars in the YAML
+_env_var_matcher = re.compile(r"\${([^}^{]+)\}")
+
+# Bump when the format of the cache files changes
+_cache_format = 1
+
+# The code that decides what a validated job file looks like
+_validator_sources = [
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'validators'),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'date.py'),
+]
+
+# Worked out once per process; see _get_validators_digest()
+_validators_digest = None
+
+
+def _get_validators_digest():
+    """
+    :return: hex digest of every .py file that validation runs through
+    """
+    global _validators_digest
+    if _validators_digest is not None:
+        return _validators_digest
+
+    _files = []
+    for _src in _validator_sources:
+        if os.path.isfile(_src):
+            _files.append(_src)
+            continue
+        for _dir, _, _names in os.walk(_src):
+            _files.extend(os.path.join(_dir, _n) for _n in _names if _n.endswith('.py'))
+
+    _h = hashlib.sha256()
+    for _f in sorted(_files):
+        _h.update(os.path.relpath(_f, _validator_sources[0]).encode('utf-8'))
+        with open(_f, 'rb') as _fh:
+            _h.update(_fh.read())
+
+    _validators_digest = _h.hexdigest()
+    return _validators_digest
+
+
+def get_cache_key(content: str):
+    """
+    :param content: the (raw) content of the job file
+    :return: hex digest that changes whenever the validated job file could
+    """
+    _h = hashlib.sha256()
+    _h.update("{}:{}:{}\n".format(_cache_format, __version__, _get_validators_digest()).encode('utf-8'))
+    _h.update(content.encode('utf-8'))
+
+    # The env vars are resolved while parsing, so their values are part of what got validated
+    for _proto in sorted(set(_env_var_matcher.findall(content))):
+        _var = _proto.split(':')[0]
+        _h.update("\n{}={!r}".format(_var, os.environ.get(_var)).encode('utf-8'))
+
+    return _h.hexdigest()
+
+
+def _get_prefix(job_file_path: str):
+    # Each job file gets its own prefix so an edit only replaces that job file's entry
+    return hashlib.sha256(os.path.abspath(job_file_path).encode('utf-8')).hexdigest()[:16]
+
+
+def _get_cache_file(cache_dir: str, job_file_path: str, key: str):
+    return os.path.join(cache_dir, "{}-{}.pickle".format(_get_prefix(job_file_path), key))
+
+
+def load_cached_actions(cache_dir: str, job_file_path: str, key: str):
+    """
+    :param cache_dir:
+    :param job_file_path:
+    :param key: see get_cache_key()
+    :return: the validated actions or None if there's nothing (usable) in the cache
+    """
+    _file = _get_cache_file(cache_dir, job_file_path, key)
+    if not os.path.isfile(_file):
+        log.debug("No cached copy of job://{} at {}".format(job_file_path, _file))
+        return None
+
+    try:
+        with open(_file, 'rb') as _fh:
+            return pickle.load(_fh)
+    except Exception as e:
+        # A cache is never worth failing over; validate the job file like it's the first time
+        log.warning("⚠️ Ignoring the cached copy of job://{} ({}). e:{}".format(job_file_path, _file, e))
+        return None
+
+
+def store_cached_actions(cache_dir: str, job_file_path: str, key: str, actions: list):
+    """
+    Stores the validated actions and removes the entries for older versions of the job file
+    :param cache_dir:
+    :param job_file_path:
+    :param key: see get_cache_key()
+    :param actions: the validated actions
+    :return:
+    """
+    _file = _get_cache_file(cache_dir, job_file_path, key)
+    _prefix = _get_prefix(job_file_path)
+    _tmp = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Write then rename so that a concurrent run (E.G.: --accounts) never reads half a file
+        _fd, _tmp = tempfile.mkstemp(dir=cache_dir, prefix='.{}-'.format(_prefix))
+        with os.fdopen(_fd, 'wb') as _fh:
+            pickle.dump(actions, _fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(_tmp, _file)
+        _tmp = None
+
+        for _f in os.listdir(cache_dir):
+            if _f.startswith(_prefix) and _f != os.path.basename(_file):
+                os.remove(os.path.join(cache_dir, _f))
+
+    except Exception as e:
+        # Same as loading; not being able to cache is not a reason to stop
+        log.warning("⚠️ Unable to cache job://{} in {}. e:{}".format(job_file_path, cache_dir, e))
+        return
+
+    finally:
+        if _tmp is not None and os.path.exists(_tmp):
+            os.remove(_tmp)
+
+    log.debug("Cached job://{} as {}".format(job_file_path, _file))
@@ -0,0 +1,84 @@
+"""
+    YAML loaders for the job/config/schedule files.
+
+    Uses libyaml (CSafeLoader) when PyYAML was built w/ it and falls back to the pure python SafeLoader otherwise. All
+        of them resolve `${env_var_here:default_value_here}` from the environment; E.G.: the API token in the config
+        file. That resolver is registered once, on our own loader classes, rather than on PyYAML's global loaders every
+        time a file is read.
+"""
+import os
+import re
+
+import logging
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+log = logging.getLogger(__name__)
+
+##
+# This is a very clever use of add_implicit_resolver from the elastic/curator project.
+# Any string that is not native YAML, but looks like the regex ${*} will be treated as
+#   an env-var lookup.
+# See: https://pyyaml.org/wiki/PyYAMLDocumentation the Constructors, represents, resolvers section
+##
+env_var_matcher = re.compile(r"\${([^}^{]+)\}")
+
+
+def _env_var_constructor(loader, node):
+    """
+    The function that yaml runs when it encounters an !env tag or ${} syntax
+    :param loader:
+    :param node:
+    :return:
+    """
+    # get the string that triggered the custom constructor
+    value = loader.construct_scalar(node)
+    # Get the string *inside* of the ${} that we'll now need to pull from env_vars
+    proto = env_var_matcher.match(value).group(1)
+    log.debug("Resolving '{}' via env vars...".format(proto))
+    default = None
+    # If there's a : in the ${thing:default} then we split on : and whatever is to the left is the env var to use
+    #   and whatever is on the right is the default to use
+    if len(proto.split(':')) > 1:
+        envvar, default = proto.split(':')
+        log.debug("user supplied default:{}".format(default))
+    else:
+        envvar = proto
+    log.debug("envvar:{} default:{}".format(envvar, default))
+
+    log.info("Attempting to resolve {envvar} from environment variables, falling back to: {default}"
+             .format(envvar=envvar, default=default))
+    return os.environ[envvar] if envvar in os.environ else default
+
+
+class ConfigLoader(_SafeLoader):
+    """
+    Safe YAML w/ `${env_var_here:default_value_here}` support. For the config and schedule files
+    """
+    pass
+
+
+class JobFileLoader(_SafeLoader):
+    """
+    Safe YAML w/ `${env_var_here:default_value_here}` support. For the job files
+    """
+    pass
+
+
+for _loader in (ConfigLoader, JobFileLoader):
+    _loader.add_implicit_resolver('!env', env_var_matcher, None)
+    _loader.add_constructor('!env', _env_var_constructor)
+
+
+def load_yaml(content: str, loader=ConfigLoader):
+    """
+    :param content: the YAML
+    :param loader: ConfigLoader or JobFileLoader
+    :return: the parsed content
+    """
+    return yaml.load(content, Loader=loader)
@@ -0,0 +1,204 @@
+"""
+    Name -> object lookup tables.
+
+    Job files refer to projects, sections, labels and tasks by name, where the name is really a regex that is searched
+        for (so `Inbox` also finds `Inbox for Some Project` and `^Inbox$` finds only `Inbox`). Resolving one name means
+        walking every object of that kind; resolving a name for every item in a big job file means walking them over
+        and over again.
+
+    A NameIndex groups the objects of one kind by name once. Anchored, literal queries (`^Inbox$`) are then a single
+        dict lookup and every other query is run (once) against the distinct names rather than against every object.
+
+    Label names given to label_create/label_apply are not regex at all; a LabelIndex maps them straight to their IDs.
+"""
+import re
+import weakref
+
+import logging
+
+import todoist
+
+from tdt.exceptions import TDTException
+
+log = logging.getLogger(__name__)
+
+# Most things in todoist have a 'name'. Except tasks (called items) which have a 'content'
+_name_properties = {
+    'labels': 'name',
+    'projects': 'name',
+    'sections': 'name',
+    'items': 'content'
+}
+
+# The characters that make a query a regex rather than a plain string
+_regex_special = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+def get_literal(query: str):
+    """
+    If the query is `^something$` w/o any other regex in it, then it can only ever match an object named `something`
+    :param query:
+    :return: the name, or None if the query is a 'real' regex
+    """
+    if len(query) < 2 or not query.startswith('^') or not query.endswith('$'):
+        return None
+
+    _inner = query[1:-1]
+    if _regex_special.search(_inner):
+        return None
+    return _inner
+
+
+class NameIndex(object):
+    """
+    Every object of a given kind, grouped by name (and by project, for the things that live in a project)
+    """
+
+    def __init__(self, client: todoist.TodoistAPI, component: str):
+        """
+        :param client:
+        :param component: one of labels, projects, sections, items
+        """
+        # Make sure the caller is asking for something we know how to fetch
+        if component not in _name_properties:
+            _e = "Don't know how to index todoist component:{}".format(component)
+            log.error(_e)
+            raise TDTException(_e)
+
+        self.component = component
+        self._property = _name_properties[component]
+
+        # name -> [objects], in the order that todoist gave them to us
+        self._by_name = {}
+
+        # query -> [names it matches]
+        self._queries = {}
+
+        for _obj in getattr(client, component).all():
+            self._by_name.setdefault(_obj[self._property], []).append(_obj)
+
+        log.debug("Indexed {} {} under {} distinct names".format(
+            sum([len(_v) for _v in self._by_name.values()]), component, len(self._by_name)))
+
+    def add(self, obj: todoist.api.models.Model):
+        """
+        Keeps the index in step w/ the objects that we create while it is in use
+        :param obj:
+        :return:
+        """
+        _name = obj[self._property]
+        if _name not in self._by_name:
+            for _query, _names in self._queries.items():
+                if re.search(_query, _name):
+                    _names.append(_name)
+
+        self._by_name.setdefault(_name, []).append(obj)
+
+    def _get_names(self, query: str):
+        """
+        :param query: a regex, searched for in the name of each object
+        :return: every distinct name that the query matches
+        """
+        if query not in self._queries:
+            _literal = get_literal(query)
+            if _literal is not None:
+                self._queries[query] = [_literal] if _literal in self._by_name else []
+            else:
+                _qre = re.compile(query)
+                self._queries[query] = [_n for _n in self._by_name if _qre.search(_n)]
+
+        return self._queries[query]
+
+    def find(self, query: str, project_id=None):
+        """
+        Same as tdt.actions.utils.get_components_by_name_with_strings() for a single query
+        :param query: a regex, searched for in the name of each object
+        :param project_id: if set, only the objects in that project
+        :return: list of the matching objects
+        """
+        _matches = []
+        for _name in self._get_names(query):
+            for _obj in self._by_name[_name]:
+                if project_id is None or _obj['project_id'] == project_id:
+                    _matches.append(_obj)
+        return _matches
+
+    def find_all(self, queries: list, project_id=None):
+        """
+        :param queries: list of queries, see find()
+        :param project_id:
+        :return: the objects that match any of the queries
+        """
+        _results = []
+        for _q in queries:
+            _results.extend(self.find(_q, project_id))
+        return _results
+
+
+# api client -> LabelIndex
+_label_indexes = weakref.WeakKeyDictionary()
+
+
+class LabelIndex(object):
+    """
+    Exact label name -> label ID. Todoist does not allow two labels that only differ by case so a name that doesn't
+        match exactly still resolves to the one label that it matches w/o regard to case.
+    """
+
+    def __init__(self, client: todoist.TodoistAPI):
+        self._client = client
+        self._key = None
+
+        # name -> id and casefold(name) -> id
+        self._by_name = {}
+        self._by_folded = {}
+
+        for _lbl in client.state['labels']:
+            self.add(_lbl)
+
+        log.debug("Indexed {} labels by name".format(len(self._by_name)))
+
+    def _state_key(self):
+        # Sync replaces the token (and maybe the list); labels that are added w/o going through us change the length
+        _labels = self._client.state['labels']
+        return self._client.sync_token, id(_labels), len(_labels)
+
+    def is_current(self):
+        return self._key == self._state_key()
+
+    def add(self, obj: todoist.api.models.Model):
+        """
+        Keeps the index in step w/ the labels that we create (queue) while it is in use
+        :param obj:
+        :return:
+        """
+        if 'is_deleted' in obj and obj['is_deleted']:
+            return
+
+        self._by_name[obj['name']] = obj['id']
+        self._by_folded[obj['name'].casefold()] = obj['id']
+        self._key = self._state_key()
+
+    def get(self, name: str):
+        """
+        :param name: the name of the label, NOT a regex
+        :return: the ID of the label or None if there is no such label
+        """
+        if name in self._by_name:
+            return self._by_name[name]
+        return self._by_folded.get(name.casefold())
+
+    def __contains__(self, name: str):
+        return self.get(name) is not None
+
+
+def get_label_index(client: todoist.TodoistAPI):
+    """
+    :param client:
+    :return: the LabelIndex for the current state of the client; only rebuilt when that state changes
+    """
+    _index = _label_indexes.get(client)
+    if _index is None or not _index.is_current():
+        _index = LabelIndex(client)
+        _label_indexes[client] = _index
+    return _index
@@ -0,0 +1,133 @@
+"""
+    Project hierarchy helpers.
+
+    Projects only know their parent_id; finding every project under some project means walking the whole list over
+        and over again. A ProjectTree does that walk once (a depth first 'Euler tour') and records, for each project,
+        where its subtree starts and ends in the visit order. Every descendant of a project is then a single slice and
+        'is X under Y' is two comparisons.
+    The tree is cached per api client and rebuilt when the client state changes (sync, or a project added locally).
+"""
+import weakref
+
+import logging
+
+import todoist
+
+log = logging.getLogger(__name__)
+
+# api client -> (state key, ProjectTree)
+_trees = weakref.WeakKeyDictionary()
+
+
+class ProjectTree(object):
+    """
+    parent -> children index of every project w/ precomputed descendant ranges
+    """
+
+    def __init__(self, projects: list):
+        """
+        :param projects: the todoist project objects
+        """
+        # project id -> parent project id (None for top level projects)
+        self.parent = {}
+
+        # project id -> [child project ids] in the order that todoist shows them
+        self.children = {}
+
+        # The depth first visit order, and where each project's subtree starts (tin) and ends (tout) in it
+        self.order = []
+        self._tin = {}
+        self._tout = {}
+
+        for _p in projects:
+            self.parent[_p['id']] = _p.data.get('parent_id')
+            self.children.setdefault(_p['id'], [])
+
+        _child_order = {_p['id']: _p.data.get('child_order') or 0 for _p in projects}
+        _roots = []
+        for _pid, _parent in self.parent.items():
+            # A parent that we don't know about (shared project, archived parent...) makes the project a root
+            if _parent is None or _parent not in self.children:
+                _roots.append(_pid)
+            else:
+                self.children[_parent].append(_pid)
+
+        for _kids in self.children.values():
+            _kids.sort(key=lambda _k: _child_order[_k])
+        _roots.sort(key=lambda _k: _child_order[_k])
+
+        # Iterative; project nesting is shallow in todoist but there's no reason to find out how deep python can go
+        for _root in _roots:
+            _stack = [(_root, False)]
+            while len(_stack) > 0:
+                _pid, _done = _stack.pop()
+                if _done:
+                    self._tout[_pid] = len(self.order)
+                    continue
+
+                self._tin[_pid] = len(self.order)
+                self.order.append(_pid)
+                _stack.append((_pid, True))
+                _stack.extend((_k, False) for _k in reversed(self.children[_pid]))
+
+        log.debug("Indexed {} projects ({} top level)".format(len(self.order), len(_roots)))
+
+    def __contains__(self, project_id):
+        return project_id in self._tin
+
+    def get_parent(self, project_id):
+        """
+        :param project_id:
+        :return: the ID of the parent project or None if project_id is a top level (or unknown) project
+        """
+        return self.parent.get(project_id)
+
+    def descendants(self, project_id):
+        """
+        :param project_id:
+        :return: list of the IDs of every project below project_id (not including project_id)
+        """
+        if project_id not in self._tin:
+            return []
+        return self.order[self._tin[project_id] + 1:self._tout[project_id]]
+
+    def expand(self, project_ids: list):
+        """
+        :param project_ids:
+        :return: set of the project_ids and every project below them
+        """
+        _ids = set()
+        for _pid in project_ids:
+            if _pid in self._tin:
+                _ids.update(self.order[self._tin[_pid]:self._tout[_pid]])
+            else:
+                _ids.add(_pid)
+        return _ids
+
+    def is_descendant(self, project_id, ancestor_id):
+        """
+        :param project_id:
+        :param ancestor_id:
+        :return: True if project_id is somewhere below ancestor_id
+        """
+        if project_id not in self._tin or ancestor_id not in self._tin:
+            return False
+        return self._tin[ancestor_id] < self._tin[project_id] < self._tout[ancestor_id]
+
+
+def get_project_tree(api_client: todoist.TodoistAPI):
+    """
+    :param api_client:
+    :return: the ProjectTree for the current state of api_client, built once per sync
+    """
+    _projects = api_client.state['projects']
+    # Sync replaces the token; adding, deleting or moving a project locally queues a command
+    _key = (api_client.sync_token, id(_projects), len(_projects), len(api_client.queue))
+
+    _cached = _trees.get(api_client)
+    if _cached is not None and _cached[0] == _key:
+        return _cached[1]
+
+    _tree = ProjectTree(_projects)
+    _trees[api_client] = (_key, _tree)
+    return _tree
@@ -1,10 +1,13 @@
 """
     Functions for working w/ the reminders
 """
+import math
+
+import dateutil.parser
 import todoist
+from pytz import timezone
 
-# Debugging
-from prettyprinter import pprint as pp
+from tdt.utils.date import get_tz_aware_task_due_date
 
 
 def get_reminders_by_task_id(api_client: todoist.api.TodoistAPI, task_id: int):
@@ -22,3 +25,140 @@ def get_reminders_by_task_id(api_client: todoist.api.TodoistAPI, task_id: int):
             _reminders.append(_r)
 
     return _reminders
+
+
+# Location reminders are bucketed w/ geohashes. Precision 8 cells are ~38m x 19m
+geohash_precision = 8
+
+# Two location reminders w/ centers closer than this (meters) are considered the same place
+location_tolerance = 20
+
+_geohash_alphabet = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash(latitude: float, longitude: float, precision: int = geohash_precision):
+    """
+    Plain geohash encoding; interleave the bits of the longitude and latitude bisections, 5 bits per character
+    See: https://en.wikipedia.org/wiki/Geohash
+    :param latitude:
+    :param longitude:
+    :param precision: number of characters
+    :return:
+    """
+    _lat = [-90.0, 90.0]
+    _lon = [-180.0, 180.0]
+    _hash = []
+    _bits = 0
+    _bit_count = 0
+    _even = True
+    while len(_hash) < precision:
+        _range, _value = (_lon, longitude) if _even else (_lat, latitude)
+        _mid = (_range[0] + _range[1]) / 2
+        _bits <<= 1
+        if _value >= _mid:
+            _bits |= 1
+            _range[0] = _mid
+        else:
+            _range[1] = _mid
+        _even = not _even
+        _bit_count += 1
+        if _bit_count == 5:
+            _hash.append(_geohash_alphabet[_bits])
+            _bits = 0
+            _bit_count = 0
+    return ''.join(_hash)
+
+
+def get_geohash_buckets(latitude: float, longitude: float, tolerance: float = location_tolerance):
+    """
+    A point that is right on the edge of a geohash cell has neighbours that are a few meters away but in another cell.
+        So, rather than just the point's own cell, return every cell that a point within `tolerance` meters could
+        be in; sampling a grid over the tolerance box w/ a spacing smaller than a cell is enough to catch them all
+    :param latitude:
+    :param longitude:
+    :param tolerance: meters
+    :return: set of geohashes
+    """
+    # ~111km per degree of latitude, a bit less per degree of longitude as you move away from the equator
+    _dlat = tolerance / 111320.0
+    _dlon = tolerance / (111320.0 * max(math.cos(math.radians(latitude)), 0.01))
+
+    _steps = (-1, -0.5, 0, 0.5, 1)
+    return {
+        geohash(max(min(latitude + _y * _dlat, 90.0), -90.0), ((longitude + _x * _dlon + 180.0) % 360.0) - 180.0)
+        for _y in _steps for _x in _steps
+    }
+
+
+def get_reminder_signature(reminder: todoist.api.models.Reminder, user_tz: timezone):
+    """
+    Reduces an existing reminder down to the things that make it a duplicate of another:
+        - relative: type, service, minute offset
+        - absolute: type, service, the instant (UTC epoch) it fires
+        - location: type, service, trigger, radius, geohash of the center
+
+    :param reminder: the todoist reminder
+    :param user_tz: floating due dates are in the user's timezone
+    :return: tuple, or None if the reminder doesn't (yet) have enough detail
+    """
+    # Reminders that were just added locally don't have a type until the next sync
+    if 'type' not in reminder:
+        return None
+
+    _type = reminder['type']
+    if _type == 'relative':
+        return _type, reminder['service'], reminder['minute_offset']
+
+    if _type == 'absolute':
+        _when = get_tz_aware_task_due_date(reminder, user_tz)
+        if _when is None:
+            return None
+        return _type, reminder['service'], int(_when.timestamp())
+
+    if _type == 'location':
+        return _type, reminder['service'], reminder['loc_trigger'], reminder['radius'], \
+            geohash(float(reminder['loc_lat']), float(reminder['loc_long']))
+
+    return None
+
+
+def get_spec_signatures(spec: dict, user_tz: timezone):
+    """
+    The signature(s) that a reminder built from a (validated) reminder spec in a job file would have. A location spec
+        has one signature per nearby geohash cell; an existing reminder matching *any* of them is a duplicate.
+        The first signature is always the one for the spec itself.
+
+    :param spec: the reminder from the job file
+    :param user_tz: the user's timezone
+    :return: list of tuples
+    """
+    _type = spec['type']
+    if _type == 'relative':
+        return [(_type, spec['service'], spec['minutes'])]
+
+    if _type == 'absolute':
+        _when = dateutil.parser.isoparse(spec['when'])
+        if _when.tzinfo is None:
+            _when = user_tz.localize(_when)
+        return [(_type, spec['service'], int(_when.timestamp()))]
+
+    _where = spec['where']
+    _own = geohash(_where['latitude'], _where['longitude'])
+    _near = get_geohash_buckets(_where['latitude'], _where['longitude']) - {_own}
+    return [(_type, spec['service'], _where['trigger'], _where['radius'], _b) for _b in [_own] + sorted(_near)]
+
+
+def get_reminder_signature_index(api_client: todoist.api.TodoistAPI, user_tz: timezone):
+    """
+    Signature of every reminder, grouped by the task it belongs to. Each signature is computed exactly once
+    :param api_client:
+    :param user_tz:
+    :return: dict of task_id -> {signature: reminder_id}
+    """
+    _index = {}
+    for _r in api_client.reminders.all():
+        _sig = get_reminder_signature(_r, user_tz)
+        if _sig is not None:
+            _index.setdefault(_r['item_id'], {})[_sig] = _r['id']
+
+    return _index
@@ -0,0 +1,70 @@
+"""
+    Helpers for keeping an eye on how long the CLI takes to get going.
+
+    For cron and container jobs the tool is started from scratch every time, so the time spent importing modules is
+        paid on every run. The heavy modules (todoist + requests, voluptuous, yaml) are only imported on the code paths
+        that use them; profile_imports() shows what each part of the tool costs to import.
+"""
+import importlib
+import sys
+import time
+
+# The modules that the CLI pulls in to run a job, in the order that it pulls them in
+cli_modules = [
+    'tdt.utils.config',
+    'tdt.validators',
+    'tdt.events',
+    'tdt.utils.cache',
+    'tdt.runner',
+]
+
+
+def profile_imports(modules: list = None):
+    """
+    Imports each module in turn and times it. A module that was already imported (or was pulled in by an earlier one)
+        costs nothing, so the order matters.
+    :param modules: defaults to cli_modules
+    :return: list of {module, seconds, new_modules} in import order
+    """
+    if modules is None:
+        modules = cli_modules
+
+    _profile = []
+    for _m in modules:
+        _before = set(sys.modules.keys())
+        _start = time.perf_counter()
+        importlib.import_module(_m)
+        _took = time.perf_counter() - _start
+        _profile.append({
+            'module': _m,
+            'seconds': _took,
+            'new_modules': sorted(set(sys.modules.keys()) - _before)
+        })
+
+    return _profile
+
+
+def format_profile(profile: list):
+    """
+    :param profile: see profile_imports()
+    :return: the profile as a human readable table
+    """
+    _lines = ["{:<20} {:>9} {:>8}  {}".format('module', 'ms', 'modules', 'heaviest third party packages')]
+    _total = 0
+    for _p in profile:
+        _total += _p['seconds']
+
+        # Count the new modules by their top level package so the user can see what came along for the ride
+        _packages = {}
+        for _n in _p['new_modules']:
+            _top = _n.split('.')[0]
+            if _top != 'tdt':
+                _packages[_top] = _packages.get(_top, 0) + 1
+        _heaviest = sorted(_packages.items(), key=lambda _kv: _kv[1], reverse=True)[:4]
+
+        _lines.append("{:<20} {:>9.1f} {:>8}  {}".format(
+            _p['module'], _p['seconds'] * 1000, len(_p['new_modules']),
+            ', '.join(["{} ({})".format(_k, _v) for _k, _v in _heaviest])))
+
+    _lines.append("{:<20} {:>9.1f}".format('total', _total * 1000))
+    return '\n'.join(_lines)
@@ -1,12 +1,11 @@
 # We take advantage of the voluptuous schema validator library for python.
 # The SchemaCheck class wraps voluptuous.
 ##
-import importlib
-
 from voluptuous import Schema, Required
 
 from tdt import TDTException
 from tdt.validators.schemacheck import SchemaCheck
+from tdt.registry import get_class, get_entry
 
 # So we can log
 import logging
@@ -60,46 +59,12 @@ def validate_actions(data: dict):
         action = action_block['action']
         log.debug("...validate action: '{}'".format(action))
 
-        # Based on the action, which module/class do we load?
-        # Cut the action into the module and class
-        _action_tokens = action.split("_")
-        _super_validator_mod_name = 'tdt.validators.job_file.{}'.format(_action_tokens[0])
-
-        # After splitting the action name/class of action, we're left w/ a specific type oof action
-        _action_type = _action_tokens[1]
-
-        # Load the module and pull out the mod-specific validator map
-        log.debug("...loading '{}' to find the class to validate action '{}'".format(_super_validator_mod_name, action))
-
+        # Based on the action, which module/class do we load? The registry knows; it's built once per process
         try:
-            # Load the 'super' module which will contain the map of all label_* actions and the class that validates
-            #   them
-            ##
-            _super_validator_mod = importlib.import_module(_super_validator_mod_name)
-            log.debug("_super_validator_mod:{}".format(_super_validator_mod))
-
-            _action_validator_map = getattr(_super_validator_mod, 'action_validator_map')
-            log.debug("_action_validator_map:\n{}".format(_action_validator_map))
-
-            # Look up which class to use for validation
-            if _action_type not in _action_validator_map:
-                _e = "Unable to find a class for validating _action_type '{}'. _action_validator_map:{}".format(
-                    _action_type, _action_validator_map)
-                log.error(_e)
-                raise TDTException(_e)
-
-            # Otherwise, we now know which class to load from the module
-            _validator_class_name = _action_validator_map[_action_type]
-
-            # Add the validator class name to the super mod name to get the full path to the module we'll want to
-            #   load the class from
-            ##
-            _validator_mod_name = '{}.{}'.format(_super_validator_mod_name, _validator_class_name.lower())
-            _validator_mod = importlib.import_module(_validator_mod_name)
-
-            # We now know which package, module, class too load :)
-            log.debug("...validating '{}' with '{}.{}'".format(action, _validator_mod, _validator_class_name))
-            _validator_class = getattr(_validator_mod, _validator_class_name)
+            _entry = get_entry(action)
+            log.debug("...validating '{}' with '{}.{}'".format(
+                action, _entry['validator_module'], _entry['validator_class']))
+            _validator_class = get_class(action, 'validator')
 
             # Make instance of class
             validator = _validator_class()
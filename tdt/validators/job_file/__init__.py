@@ -6,7 +6,7 @@ from tdt.validators.job_file.utils import _is_valid_file, _is_valid_dir, _is_val
 
 
 from datetime import datetime, date
-from tdt.utils.date import get_next_date_by_dow, relative_date_strings
+from tdt.utils.date import get_next_date_by_dow, relative_date_strings, resolve_relative_date, mark_relative
 
 from tdt.validators import iso_8601_fmt
 
@@ -22,13 +22,9 @@ def validate_date_match(value):
     :return:
     """
     # Check if the user supplied a relative string
+    # Note: the date is marked w/ the word the user gave so it can be worked out again later (see job file cache)
     if value in relative_date_strings:
-        _idx = relative_date_strings.index('now')
-        if value == relative_date_strings[_idx]:
-            _dt = datetime.now()
-        else:
-            _dt = get_next_date_by_dow(value)
-        return _dt
+        return resolve_relative_date(value)
     else:
         # If the string is not one of the few special ones, we must try to coerce it into a python datetime object using
         #   one of the supported formats
@@ -54,6 +50,18 @@ def _valid_past_time(value):
     :param value:
     :return:
     """
+    _d = _get_past_time(value)
+    if _d is not None and value in relative_date_strings:
+        return mark_relative(_d, _valid_past_time, value)
+    return _d
+
+
+def _get_past_time(value):
+    """
+    See _valid_past_time()
+    :param value:
+    :return:
+    """
 
     # When is now() ?
     # TODO: pull the localization of user in here!?
@@ -79,7 +87,7 @@ def _valid_past_time(value):
         raise ValueError(_e)
 
     # User provided something that's a date or a datetime. We now check if it's in the past or not
-    if type(_d) is date:
+    if not isinstance(_d, datetime):
         # We can't compare _now (datetime) to  _d (date), so we need to create a datetime object from the date and use
         #   that for a apples to apples comparison.
         ##
@@ -51,7 +51,7 @@ class Basic(Validator):
 
         # Add the schema elements that are unique to label_* class of actions to the schema
         # Add filtered schema to the base schema we inherited from super()
-        self._schema = self._schema.extend(backup_schema)
+        self._schema = self._get_action_schema(backup_schema)
 
         # Voluptuous can indicate 'where' the error was, but it relies on the caller (us) passing that info in
         # So we generate a simple location 'slug' based on the action and the user given name
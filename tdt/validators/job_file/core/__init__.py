@@ -105,10 +105,18 @@ project_filter_obj_schema = {
     Optional('name'): {
         # If project.name is specified, MUST be a string w/ at least 1 char
         Required('match'): All(str, Length(min=1))
-    }
+    },
+    # Also select everything in the projects below the ones that match
+    Optional('include_subprojects', default=False): Boolean()
 }
 
 
+# Every regex flag that a user gives is checked against this
+_regex_flag_schema = Schema(
+    In(regex_flags, msg="Must be one of {}".format(regex_flags))
+)
+
+
 def _validate_regex(value):
     """
     Voluptuous does not (easily) support checking that _each_ value of an array is valid... so we define our own :)
@@ -117,12 +125,9 @@ def _validate_regex(value):
     """
     # When Voluptuous calls us, all we know is that value is a list
     # We then go through each item in the list and make sure that it matches the schema:
-    _sch = Schema(
-        In(regex_flags, msg="Must be one of {}".format(regex_flags))
-    )
     for itm in value:
         # Make sure that the item is in _regex_flags.
-        _sch(itm)
+        _regex_flag_schema(itm)
 
     # If nothing blew up, then the value that Voluptuous passed in to us is valid :)
     return value
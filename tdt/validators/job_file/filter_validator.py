@@ -1,48 +1,14 @@
 """
 root validator class for all actions that support filters
 """
-import importlib
-
 # Debugging
 import logging
-from prettyprinter import pprint as pp
 
 # Access to the action_check_map which lists all known/possible action
 from tdt.validators import SchemaCheck
 from tdt.validators.job_file.validator import Validator
 
 
-def _determine_supported_actions(_mods):
-    """
-    Discovers all modules inside of a package, allows you to _literally_ drop in a new validation
-        file and just have it _work_
-    """
-    # For each module under it, if there's another package, open it up and look for the 'action_validator_map'
-    _supported_actions = []
-    for _m in _mods:
-
-        # Check if it's a sub-package, that'll be a very good indicator that there's a module inside w/ a
-        #   'action_validator_map' that we'll want to pull the keys() from
-        ##
-        if not _m.ispkg:
-            continue
-
-        # Import the module
-        _mod = importlib.import_module('.{}'.format(_m.name), package='tdt.validators.job_file')
-
-        try:
-            # See if the module has a 'action_validator_map'
-            _map = getattr(_mod, 'action_validator_map')
-            for _act in _map.keys():
-                _supported_actions.append("{}_{}".format(_m.name, _act))
-
-        except AttributeError:
-            # No worries, just pass
-            pass
-
-    return _supported_actions
-
-
 class FilterValidator(Validator):
 
     def __init__(self):
@@ -2,9 +2,6 @@
 # Validates a label_* action where the action supports filter/selectors
 ##
 
-# Debugging
-from prettyprinter import pprint as pp
-
 from tdt.utils.date import relative_date_strings
 from tdt.validators import SchemaCheck, iso_8601_fmt
 from tdt.validators.job_file import validate_date_match
@@ -99,27 +96,31 @@ _base_schema = {
 _base_schema.update(base_schema)
 
 
+# The selectors that label_apply supports. Compiled once, shared by every label_apply action block
+_selector_schema = {
+    # Label Application supports task, labels, projects
+    ##
+    # We don't support deletion deletion for tasks, just mutation
+    'task': Schema(Required(_label_apply_task_filter_obj_schema), extra=PREVENT_EXTRA),
+
+    # Same with labels: mutation only
+    'labels': Required(_label_apply_label_filter_obj_schema),
+
+    # Projects are not mutable
+    'projects': Required(project_filter_obj_schema),
+
+    # User can adjust how the regex engine works
+    'regex_options': Optional(filter_regex_options_schema, default=[])
+}
+
+
 class Apply(FilterValidator):
 
     def __init__(self):
         # After super init, we'll have working logging and a base schema
         super().__init__()
 
-        self.selector_schema = {
-            # Label Application supports task, labels, projects
-            ##
-            # We don't support deletion deletion for tasks, just mutation
-            'task': Schema(Required(_label_apply_task_filter_obj_schema), extra=PREVENT_EXTRA),
-
-            # Same with labels: mutation only
-            'labels': Required(_label_apply_label_filter_obj_schema),
-
-            # Projects are not mutable
-            'projects': Required(project_filter_obj_schema),
-
-            # User can adjust how the regex engine works
-            'regex_options': Optional(filter_regex_options_schema, default=[])
-        }
+        self.selector_schema = _selector_schema
 
     def validate(self, action_block: dict):
         """
@@ -146,7 +147,7 @@ class Apply(FilterValidator):
         # Add the high level schema to existing schema and test....
         self.log.debug("Checking high level keys...")
         # If there are any extra high-level keys, make noise
-        self._schema = self._schema.extend(_base_schema, extra=PREVENT_EXTRA)
+        self._schema = self._get_action_schema(_base_schema)
 
         # Do high level validation and store the validated (so far...) action block
         action_block = SchemaCheck(action_block, self._schema, self.location).result()
@@ -6,9 +6,6 @@ from tdt.validators.job_file.validator import Validator
 
 from tdt.defaults.colors import colors
 
-# Debugging
-from prettyprinter import pprint as pp
-
 
 def _validate_color(value):
     """
@@ -42,6 +39,10 @@ _create_obj = {
 }
 
 
+# Compiled once, every label in every label_create action block is checked against it
+_create_obj_schema = Schema(_create_obj)
+
+
 class Create(Validator):
 
     def __init__(self):
@@ -68,7 +69,7 @@ class Create(Validator):
         # We start with making sure that we have the high level keys required for project_* actions
         # If there are any extra high-level keys, make noise
         self.log.debug("Checking high level keys...")
-        self._schema = self._schema.extend(base_schema, extra=PREVENT_EXTRA)
+        self._schema = self._get_action_schema(base_schema)
 
         # Do high level validation and store the validated (so far...) action block
         action_block = SchemaCheck(action_block, self._schema, self.location).result()
@@ -81,7 +82,7 @@ class Create(Validator):
         _idx = 0
         for _l in action_block['labels']:
             _loc = "{}.label#{}".format(self.location, _idx)
-            _valid_components.append(SchemaCheck(_l, Schema(_create_obj), _loc).result())
+            _valid_components.append(SchemaCheck(_l, _create_obj_schema, _loc).result())
             _idx += 1
 
         # Return all the valid label objects
@@ -7,15 +7,22 @@ from tdt.validators import SchemaCheck
 from tdt.validators.job_file.filter_validator import FilterValidator
 from tdt.validators.job_file.label import base_schema
 
-# Debugging
-from prettyprinter import pprint as pp
-
 
 _label_filter_obj_schema = {
     Required('name'): {Required('match'): Any(str, Length(min=1))}
 }
 
 
+# The selectors that label_delete supports. Compiled once, shared by every label_delete action block
+_selector_schema = {
+    'labels': Schema(Required(_label_filter_obj_schema), extra=PREVENT_EXTRA),
+
+
+    # User can adjust how the regex engine works
+    'regex_options': Optional(filter_regex_options_schema, default=[])
+}
+
+
 class Delete(FilterValidator):
 
     def __init__(self):
@@ -23,13 +30,7 @@ class Delete(FilterValidator):
         super().__init__()
 
         # Label deletion can be specified by... label filters :)
-        self.selector_schema = {
-            'labels': Schema(Required(_label_filter_obj_schema), extra=PREVENT_EXTRA),
-
-
-            # User can adjust how the regex engine works
-            'regex_options': Optional(filter_regex_options_schema, default=[])
-        }
+        self.selector_schema = _selector_schema
 
     def validate(self, action_block: dict):
         """
@@ -50,7 +51,7 @@ class Delete(FilterValidator):
         # We start with making sure that we have the high level keys required for project_* actions
         # If there are any extra high-level keys, make noise
         self.log.debug("Checking high level keys...")
-        self._schema = self._schema.extend(base_schema, extra=PREVENT_EXTRA)
+        self._schema = self._get_action_schema(base_schema)
 
         # Do high level validation and store the validated (so far...) action block
         action_block = SchemaCheck(action_block, self._schema, self.location).result()
@@ -79,5 +80,5 @@ class Delete(FilterValidator):
         action_block['labels'] = _valid_sources
 
         # We've validated/coerced everything, return :)
-        pp(action_block)
+        self.log.debug("Validated: {}".format(action_block))
         return action_block
@@ -11,9 +11,6 @@ from tdt.validators.job_file.filter_validator import FilterValidator
 
 from tdt.defaults.colors import colors
 
-# Debugging
-from prettyprinter import pprint as pp
-
 # Creating a label supports a few options... more complex than Basic, but nowhere near as elaborate as Filtered!
 _create_obj = {
 
@@ -132,6 +129,22 @@ _project_create_label_filter_obj_schema = {
 }
 
 
+# The selectors that project_create supports. Compiled once, shared by every project_create action block
+# TODO: the objects below are a TON of code-duplication... i need to make use of .update() so that i can
+#   programmatically  build up a schema
+_selector_schema = {
+    # Project Creation supports *additional* options not in the 'standard' schemas
+    'task': Schema(Required(_project_create_task_filter_obj_schema), extra=PREVENT_EXTRA),
+    'labels': Required(_project_create_label_filter_obj_schema),
+
+    # For projects we use the 'standard' schema
+    'projects': Required(project_filter_obj_schema),
+
+    # User can adjust how the regex engine works
+    'regex_options': Optional(filter_regex_options_schema, default=[])
+}
+
+
 class Create(FilterValidator):
 
     def __init__(self):
@@ -157,7 +170,7 @@ class Create(FilterValidator):
         # We start with making sure that we have the high level keys required for project_* actions
         # If there are any extra high-level keys, make noise
         self.log.debug("Checking high level keys...")
-        self._schema = self._schema.extend(_high_level_schema, extra=PREVENT_EXTRA)
+        self._schema = self._get_action_schema(_high_level_schema)
 
         # Do high level validation and store the validated (so far...) action block
         action_block = SchemaCheck(action_block, self._schema, self.location).result()
@@ -165,20 +178,8 @@ class Create(FilterValidator):
         # If nothing blew up, then the high-level schema is valid. We now need to check if any of the project(s)
         #   specify filters as their name source
         ##
-        self.log.debug("...valid! Building schema for filters...")
-        # TODO: the objects below are a TON of code-duplication... i need to make use of .update() so that i can
-        #   programmatically  build up a schema
-        self.selector_schema = {
-            # Project Creation supports *additional* options not in the 'standard' schemas
-            'task': Schema(Required(_project_create_task_filter_obj_schema), extra=PREVENT_EXTRA),
-            'labels': Required(_project_create_label_filter_obj_schema),
-
-            # For projects we use the 'standard' schema
-            'projects': Required(project_filter_obj_schema),
-
-            # User can adjust how the regex engine works
-            'regex_options': Optional(filter_regex_options_schema, default=[])
-        }
+        self.log.debug("...valid! Using the project_create schema for filters...")
+        self.selector_schema = _selector_schema
 
         self.log.debug("...checking {} projects for from.filters...".format(len(action_block['projects'])))
         for p in action_block['projects']:
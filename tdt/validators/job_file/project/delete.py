@@ -6,9 +6,6 @@ from tdt.validators.job_file.filter_validator import FilterValidator
 # Deleting a project can be done by filter or id
 from tdt.validators.job_file.project import base_schema
 
-# Debugging
-from prettyprinter import pprint as pp
-
 
 _delete_obj = {
 
@@ -35,6 +32,19 @@ _projects_filter_obj_schema = {
 }
 
 
+# The selectors that project_delete supports. Compiled once, shared by every project_delete action block
+_selector_schema = {
+    'projects': Schema(Required(_projects_filter_obj_schema), extra=PREVENT_EXTRA),
+
+    # User can adjust how the regex engine works
+    'regex_options': Optional(filter_regex_options_schema, default=[])
+}
+
+
+# Compiled once, every from block in every project_delete action block is checked against it
+_delete_obj_schema = Schema(_delete_obj)
+
+
 class Delete(FilterValidator):
 
     def __init__(self):
@@ -42,12 +52,7 @@ class Delete(FilterValidator):
         super().__init__()
 
         # project deletion can be specified by... project filters :)
-        self.selector_schema = {
-            'projects': Schema(Required(_projects_filter_obj_schema), extra=PREVENT_EXTRA),
-
-            # User can adjust how the regex engine works
-            'regex_options': Optional(filter_regex_options_schema, default=[])
-        }
+        self.selector_schema = _selector_schema
 
     def validate(self, action_block: dict):
         """
@@ -68,7 +73,7 @@ class Delete(FilterValidator):
         # We start with making sure that we have the high level keys required for project_* actions
         # If there are any extra high-level keys, make noise
         self.log.debug("Checking high level keys...")
-        self._schema = self._schema.extend(base_schema, extra=PREVENT_EXTRA)
+        self._schema = self._get_action_schema(base_schema)
 
         # Do high level validation and store the validated (so far...) action block
         action_block = SchemaCheck(action_block, self._schema, self.location).result()
@@ -81,7 +86,7 @@ class Delete(FilterValidator):
         for o in action_block['projects']:
             _loc = "{}.from#{}".format(self.location, _idx)
             # Validate high level keys of o
-            from_block = SchemaCheck(o, Schema(_delete_obj), _loc).result()
+            from_block = SchemaCheck(o, _delete_obj_schema, _loc).result()
 
             # For now, we silently drop the from:ID
             if 'id' in from_block['from']:
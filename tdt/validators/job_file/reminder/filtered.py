@@ -12,9 +12,6 @@ from tdt.validators.job_file.core import filter_regex_options_schema, mutate_onl
 from voluptuous import Schema, Required, Optional, Any, Length, In, ALLOW_EXTRA, PREVENT_EXTRA, Range, Datetime, \
     Exclusive, All
 
-# Debugging
-from prettyprinter import pprint as pp
-
 
 # See: https://developer.todoist.com/sync/v8/?python#add-a-reminder
 # 'email', 'mobile' for mobile text message or 'push' for mobile push notification.
@@ -94,6 +91,11 @@ _reminder_base_schema = Schema({
 
 }, extra=ALLOW_EXTRA)
 
+# The complete schema for each type of reminder: the base + the type specific keys. No extra keys allowed, this time
+_reminder_type_schemas = {
+    _t: _reminder_base_schema.extend(_s, extra=PREVENT_EXTRA) for _t, _s in _reminder_types.items()
+}
+
 
 ##
 # It makes NO SENSE to support the option:delete on source selectors. Why would you delete the thing you want
@@ -155,20 +157,24 @@ _reminder_apply_label_filter_obj_schema = {
 }
 
 
+# The selectors that reminder_filtered supports. Compiled once, shared by every reminder_filtered action block
+_selector_schema = {
+    # Task Deletion does not support the standard options for each selector in selector_schema
+    'task': Schema(Required(_reminder_apply_task_filter_obj_schema), extra=PREVENT_EXTRA),
+    'labels': Required(_reminder_apply_label_filter_obj_schema),
+
+    # User can adjust how the regex engine works
+    'regex_options': Optional(filter_regex_options_schema, default=[])
+}
+
+
 class Filtered(FilterValidator):
 
     def __init__(self):
         # After super init, we'll have working logging and a base schema
         super().__init__()
 
-        self.selector_schema = {
-            # Task Deletion does not support the standard options for each selector in selector_schema
-            'task': Schema(Required(_reminder_apply_task_filter_obj_schema), extra=PREVENT_EXTRA),
-            'labels': Required(_reminder_apply_label_filter_obj_schema),
-
-            # User can adjust how the regex engine works
-            'regex_options': Optional(filter_regex_options_schema, default=[])
-        }
+        self.selector_schema = _selector_schema
 
     def validate(self, action_block: dict):
         """
@@ -195,7 +201,7 @@ class Filtered(FilterValidator):
         # Add the high level schema to existing schema and test....
         self.log.debug("Checking high level keys...")
         # If there are any extra high-level keys, make noise
-        self._schema = self._schema.extend(base_schema, extra=PREVENT_EXTRA)
+        self._schema = self._get_action_schema(base_schema)
 
         # Do high level validation and store the validated (so far...) action block
         action_block = SchemaCheck(action_block, self._schema, self.location).result()
@@ -238,12 +244,9 @@ class Filtered(FilterValidator):
             #   look up the TYPE of reminder and finish validation
             ##
             # Use the type of reminder to get the schema object that we should use
-            _schema = _reminder_types[_rem['type']]
+            _schema = _reminder_type_schemas[_rem['type']]
             # Add the validated/coerced reminder or blow up trying :)
-            _validated_reminders.append(SchemaCheck(_rem,
-                                                    _reminder_base_schema.extend(_schema,
-                                                                                 extra=PREVENT_EXTRA),
-                                                    _loc).result())
+            _validated_reminders.append(SchemaCheck(_rem, _schema, _loc).result())
             # Increase idx for location string
             _idx += 1
 
@@ -9,9 +9,6 @@ from tdt.validators.job_file.task import base_schema
 
 from tdt.validators.job_file.validator import Validator
 
-# Debugging
-from prettyprinter import pprint as pp
-
 _task_create_project_schema = {
     # The name of the project to create the task under
     Exclusive('name', 'task.project'): All(str, Length(min=1)),
@@ -158,6 +155,21 @@ _task_obj = {
 }
 
 
+# The task properties that task_create can use to decide if a task already exists
+unique_by_properties = ['content', 'project', 'parent', 'section', 'labels']
+
+# task_create supports a few options that apply to all the items in the block
+_task_create_options_schema = {
+    # If set, a task is only created if there is no (open) task w/ the same value for *all* of these properties
+    Optional('unique_by'): All([In(unique_by_properties, msg="Must be one of {}".format(unique_by_properties))],
+                               Length(min=1))
+}
+
+
+# Compiled once, every item in every task_create action block is checked against it
+_task_obj_schema = Schema(_task_obj)
+
+
 class Create(Validator):
 
     def __init__(self):
@@ -183,7 +195,7 @@ class Create(Validator):
         # We start with making sure that we have the high level keys required for project_* actions
         # If there are any extra high-level keys, make noise
         self.log.debug("Checking high level keys...")
-        self._schema = self._schema.extend(base_schema, extra=PREVENT_EXTRA)
+        self._schema = self._get_action_schema(base_schema, {Optional('options'): _task_create_options_schema})
 
         # Do high level validation and store the validated (so far...) action block
         action_block = SchemaCheck(action_block, self._schema, self.location).result()
@@ -201,7 +213,7 @@ class Create(Validator):
             # We need to do some additional validation that Voluptuous does not handle:
             #   - section can only be included if there's a non-default parent project
             ##
-            _valid = SchemaCheck(t, Schema(_task_obj), _loc).result()
+            _valid = SchemaCheck(t, _task_obj_schema, _loc).result()
             # user can supply a due date in one of several different formats. Later code won't care and will
             #   only want an explicit date/datetime
             ##
@@ -8,9 +8,6 @@ from tdt.validators import SchemaCheck
 from tdt.validators.job_file.filter_validator import FilterValidator
 from tdt.validators.job_file.task import base_schema
 
-# Debugging
-from prettyprinter import pprint as pp
-
 
 _task_delete_task_filter_obj_schema = {
     # Search for regex matches against task-title
@@ -63,22 +60,26 @@ _task_delete_label_filter_obj_schema = {
 }
 
 
+# The selectors that task_delete supports. Compiled once, shared by every task_delete action block
+_selector_schema = {
+    # Task Deletion does not support the standard options for each selector in selector_schema
+    'task': Schema(Required(_task_delete_task_filter_obj_schema), extra=PREVENT_EXTRA),
+    'labels': Required(_task_delete_label_filter_obj_schema),
+
+    # For projects we use the 'standard' schema
+    'project': Required(project_filter_obj_schema),
+
+    # User can adjust how the regex engine works
+    'regex_options': Optional(filter_regex_options_schema, default=[])
+}
+
+
 class Delete(FilterValidator):
 
     def __init__(self):
         # After super init, we'll have working logging and a base schema
         super().__init__()
-        self.selector_schema = {
-            # Task Deletion does not support the standard options for each selector in selector_schema
-            'task': Schema(Required(_task_delete_task_filter_obj_schema), extra=PREVENT_EXTRA),
-            'labels': Required(_task_delete_label_filter_obj_schema),
-
-            # For projects we use the 'standard' schema
-            'project': Required(project_filter_obj_schema),
-
-            # User can adjust how the regex engine works
-            'regex_options': Optional(filter_regex_options_schema, default=[])
-        }
+        self.selector_schema = _selector_schema
 
     def validate(self, action_block: dict):
         """
@@ -99,7 +100,7 @@ class Delete(FilterValidator):
         # We start with making sure that we have the high level keys required for project_* actions
         # If there are any extra high-level keys, make noise
         self.log.debug("Checking high level keys...")
-        self._schema = self._schema.extend(base_schema, extra=PREVENT_EXTRA)
+        self._schema = self._get_action_schema(base_schema)
 
         # Do high level validation and store the validated (so far...) action block
         action_block = SchemaCheck(action_block, self._schema, self.location).result()
@@ -1,52 +1,70 @@
 """
 root job_file validator that all others inherit from
 """
-# Used to discover sub-classes of validators
-import pkgutil
-import importlib
-# Helper to iterate through all the modules in a package w/o having to hack about w/ __all__
-import os.path
-
 # The core library that makes this all work!
-from voluptuous import Required, Any, In, Length, Optional, Boolean, Schema
+from voluptuous import Required, Any, In, Length, Optional, Boolean, Schema, PREVENT_EXTRA
 
 # Debugging
 import logging
-from prettyprinter import pprint as pp
 
-# Access to the action_check_map which lists all known/possible actions
-import tdt.validators.job_file
+# Every known/possible action, discovered once per process
+from tdt.registry import get_supported_actions
+
+# The default schema is the same for every validator, so it's only built once. voluptuous' extend() returns a new
+#   schema so sharing it is safe
+##
+_base_schema = None
 
 
-def _determine_supported_actions(_mods):
+def _get_base_schema():
     """
-    Discovers all modules inside of a package, allows you to _literally_ drop in a new validation
-        file and just have it _work_
+    :return: the schema that EVERY ACTION MUST HAVE no matter what the action to be taken is!
     """
-    # For each module under it, if there's another package, open it up and look for the 'action_validator_map'
-    _supported_actions = []
-    for _m in _mods:
+    global _base_schema
+    if _base_schema is None:
+        # A list of ALL the supported actions
+        _supported_actions = get_supported_actions()
 
-        # Check if it's a sub-package, that'll be a very good indicator that there's a module inside w/ a
-        #   'action_validator_map' that we'll want to pull the keys() from
-        ##
-        if not _m.ispkg:
-            continue
+        _base_schema = Schema({
+            # The ACTION is required for every object! It can be any value in the list returned by all_actions()
+            Required('action'): Any(
+                In(_supported_actions),
+                msg='action must be one of {0}'.format(_supported_actions)
+            ),
+
+            # The action must also have a name; any string with at least 1 character
+            Required('name'): Any(str, Length(min=1)),
 
-        # Import the module
-        _mod = importlib.import_module('.{}'.format(_m.name), package='tdt.validators.job_file')
+            # Description is OPTIONAL, but if present must be a string
+            Optional('description', default='No description given'): Any(str),
 
-        try:
-            # See if the module has a 'action_validator_map'
-            _map = getattr(_mod, 'action_validator_map')
-            for _act in _map.keys():
-                _supported_actions.append("{}_{}".format(_m.name, _act))
+            # Each action can have an 'enabled' field. If not present, assume enabled=True
+            Optional('enabled', default=True): Boolean()
+        })
 
-        except AttributeError:
-            # No worries, just pass
-            pass
+    return _base_schema
+
+
+# Each type of action extends the base schema w/ its own keys. The extended schema is built the first time that type
+#   of action is validated and then reused for every other action block of that type
+##
+_action_schemas = {}
+
+
+def get_action_schema(key, extend_with: list, extra=PREVENT_EXTRA):
+    """
+    :param key: what to cache the schema under; the validator class
+    :param extend_with: the schema(s), in order, to add to the base schema
+    :param extra: how the extended schema treats keys it does not know about
+    :return: the compiled schema
+    """
+    if key not in _action_schemas:
+        _s = _get_base_schema()
+        for _e in extend_with:
+            _s = _s.extend(_e, extra=extra)
+        _action_schemas[key] = _s
 
-    return _supported_actions
+    return _action_schemas[key]
 
 
 class Validator:
@@ -68,36 +86,8 @@ class Validator:
         ##
         self._location = ''
 
-        # To keep things modular and dynamic, we need to load up every module inside of the job_file package
-        # See:
-        # https://stackoverflow.com/questions/487971/is-there-a-standard-way-to-list-names-of-python-modules-in-a-package
-        ##
-        # Get the location on disk of the job_file package
-        _pkgpath = os.path.dirname(tdt.validators.job_file.__file__)
-
-        # So that we can learn which modules are under it
-        _mods = pkgutil.iter_modules([_pkgpath])
-
-        # A list of ALL the supported actions
-        _supported_actions = _determine_supported_actions(_mods)
-
         # This is the default schema that EVERY ACTION MUST HAVE no matter what the action to be taken is!
-        self._schema = Schema({
-            # The ACTION is required for every object! It can be any value in the list returned by all_actions()
-            Required('action'): Any(
-                In(_supported_actions),
-                msg='action must be one of {0}'.format(_supported_actions)
-            ),
-
-            # The action must also have a name; any string with at least 1 character
-            Required('name'): Any(str, Length(min=1)),
-
-            # Description is OPTIONAL, but if present must be a string
-            Optional('description', default='No description given'): Any(str),
-
-            # Each action can have an 'enabled' field. If not present, assume enabled=True
-            Optional('enabled', default=True): Boolean()
-        })
+        self._schema = _get_base_schema()
 
         # The schema to use SPECIFICALLY for validating selectors in a filter, if supported on the action
         self._filter_selector_schema = None
@@ -134,3 +124,12 @@ class Validator:
             self.log.error("{} must be a string".format('Location'))
             return
         self._location = value
+
+    def _get_action_schema(self, *extend_with, extra=PREVENT_EXTRA):
+        """
+        The base schema + the keys for this type of action. See get_action_schema()
+        :param extend_with: the schema(s) to add to the base schema
+        :param extra:
+        :return:
+        """
+        return get_action_schema(type(self), list(extend_with), extra=extra)
@@ -0,0 +1,69 @@
+###
+# Simple bit of validation for the schedule file that the daemon reads
+###
+
+from voluptuous import Length, Schema, Required, Optional, All, Boolean, Invalid
+
+from tdt.utils.cron import CronSchedule
+from tdt.validators import SchemaCheck
+
+
+def _valid_cron(value):
+    """
+    Makes sure that the user gave us something that we can parse as a cron expression. We hand back the parsed
+        schedule so the daemon doesn't have to parse it again.
+    :param value:
+    :return:
+    """
+    if not isinstance(value, str):
+        raise Invalid("cron must be a string like '*/5 * * * *'. Got:{}".format(value))
+    try:
+        return CronSchedule(value)
+    except ValueError as ve:
+        raise Invalid("Invalid cron expression `{}`: {}".format(value, ve))
+
+
+def get_valid_schedule_schema():
+    """
+    Helper function to return the schema for a schedule file.
+
+    The schedule file lives next to the job files and looks like this:
+
+        version: 1
+        schedules:
+          - job: v1/label/01.apply.yaml
+            cron: "*/5 * * * *"
+
+    :return:
+    """
+    return Schema(
+        {
+            # As of right now, only version 1 of the schedule file is supported
+            Required('version'): 1,
+            Required('schedules'): All([
+                {
+                    # Path to the job file. Relative paths are relative to the schedule file
+                    Required('job'): All(str, Length(min=1)),
+
+                    # When to run it
+                    Required('cron'): _valid_cron,
+
+                    # Like action blocks, each schedule can be toggled on/off
+                    Optional('enabled', default=True): Boolean(),
+
+                    # With --webhook, re-run the filter driven actions of the job as soon as a task changes
+                    Optional('on_events', default=False): Boolean()
+                }
+            ], Length(min=1))
+        }
+    )
+
+
+def validate_schedule_file(data):
+    """
+    Is fed the raw parsed YAML and will either blow up or return the validated yaml
+
+    :arg data: The schedule dictionary
+    :rtype: dict
+    """
+    return SchemaCheck(data, get_valid_schedule_schema(), 'TMTDT Schedule File').result()
@@ -7,9 +7,6 @@ from tdt.exceptions import ConfigurationError
 import re
 import logging
 
-# Debugging
-from prettyprinter import pprint as pp
-
 
 class SchemaCheck(object):
     def __init__(self, config, schema, test_what):
@@ -69,8 +66,14 @@ class SchemaCheck(object):
 
             self.log.error('Schema error: {0}'.format(self.error))
 
-            raise ConfigurationError(
+            _ce = ConfigurationError(
                 'Configuration: {0}: Bad Value: "{1}", {2}. '
                 'Check configuration file.'.format(self.test_what, self.badvalue, self.error)
             )
+            # The same details, for callers that want to report them w/o picking apart the message (--validate-only)
+            _ce.location = self.test_what
+            _ce.bad_value = '{0}'.format(self.badvalue)
+            _ce.error = '{0}'.format(self.error)
+            _ce.path = [str(_p) for _p in getattr(self.error, 'path', [])]
+            raise _ce
 
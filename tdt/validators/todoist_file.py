@@ -2,14 +2,41 @@
 # Simple bit of validation for the todoist config file
 ###
 
-from voluptuous import Length, Schema, Required, Any, In
+from voluptuous import Length, Schema, Required, Optional, Any, In, All, Range, Coerce
 
 import pytz
 
 from tdt.validators import SchemaCheck
 
-# Debugging
-from prettyprinter import pprint as pp
+
+def get_valid_sink_schema():
+    """
+    Each event sink is a type and whatever that type of sink needs to know
+    :return:
+    """
+    return Any(
+        {
+            Required('type'): 'ndjson',
+            Required('path'): All(str, Length(min=1))
+        },
+        {
+            Required('type'): 'unix',
+            Required('path'): All(str, Length(min=1))
+        },
+        {
+            Required('type'): 'mqtt',
+            Required('host'): All(str, Length(min=1)),
+            Optional('port'): All(Coerce(int), Range(min=1, max=65535)),
+            Optional('topic'): All(str, Length(min=1)),
+            Optional('client_id'): str,
+            Optional('username'): str,
+            Optional('password'): str
+        }
+    )
+
+
+# The todoist client talks to the real Todoist unless told otherwise
+default_api_endpoint = 'https://api.todoist.com'
 
 
 def get_valid_todoist_schema():
@@ -26,11 +53,26 @@ def get_valid_todoist_schema():
             Required('todoist'): {
                 Required('api'): {
                     Required('token'): Length(min=40, max=40, msg='Invalid Todoist API Token. Must be string with {}'
-                                                                  ' characters!'.format(40))
+                                                                  ' characters!'.format(40)),
+                    # Where the sync API lives. Only worth changing to talk to a proxy or a fake (see benchmarks/)
+                    Optional('endpoint', default=default_api_endpoint): All(str, Length(min=1))
+                },
+                # Only needed for the --webhook mode of the daemon. If set, every webhook must be signed with it
+                Optional('webhook'): {
+                    Required('client_secret'): Length(min=1)
                 }
             },
             Required('client'): {
                 Required('timezone'): Any(In(pytz.all_timezones))
+            },
+            # Optional; where to publish the events that each action emits. See tdt.events
+            Optional('events'): {
+                Required('sinks'): All([get_valid_sink_schema()], Length(min=1)),
+                Optional('queue_size'): All(Coerce(int), Range(min=1)),
+                Optional('batch_size'): All(Coerce(int), Range(min=1)),
+                Optional('flush_interval'): All(Coerce(float), Range(min=0.01)),
+                Optional('on_full'): In(['drop', 'block']),
+                Optional('block_timeout'): All(Coerce(float), Range(min=0))
             }
         }
     )
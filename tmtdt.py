@@ -1,53 +1,77 @@
-# tdt.actions has a map of action_name -> Class
-
-import tdt.actions
-# Importlib dynamically loads the class :)
-import importlib
-
-# Config parse/validators
-from tdt.utils.cache import reset_local_state
-from tdt.utils.config import process_config, validate_job_file, get_todoist_file, validate_args
-
 # Version String for args
 from tdt.version import __version__
 
-# Various ways that todoist can break..
-from tdt.exceptions import TodoistClientError
-from tdt.exceptions import TDTException
-
 import argparse
 
-# The todoist library
-import todoist
-
 # Debugging
 import logging
 
+# The rest of tdt (and the todoist client, voluptuous, yaml...) is imported once we know that there's work to do; the
+#   tool is started from scratch for every cron/container run and --help/--version shouldn't have to pay for it all
+##
+
 
 def launch(args: argparse.Namespace):
     """
     :param args: the argparse args
     :return:
     """
+    # Config parse/validators
+    from tdt.utils.cache import reset_local_state
+    from tdt.utils.config import process_config, validate_job_file, get_todoist_file, get_job_cache_dir
+
+    # Does the actual work of running the actions
+    from tdt.runner import get_api_client, sync_api_client, run_actions
+
+    # Where the actions publish what they did
+    from tdt.events import configure_event_bus
+
     # Go through the parsed CLI args and configure each portion of the tool as needed
     process_config(args)
 
     # After processing the args, we have logging!
     log = logging.getLogger(__name__)
 
+    # In daemon mode, the job files come from the schedule file and we don't return until told to stop
+    if args.daemon:
+        # Only pull in the daemon if it's going to be used
+        from tdt.daemon import Daemon
+        Daemon(args, get_todoist_file(args.config_file)).run_forever()
+        return
+
+    # Just check the job files; no config, no client, no network
+    if args.validate_only is not None:
+        from tdt.lint import validate_job_files
+        _results = validate_job_files(args)
+        if len([_r for _r in _results if _r['status'] != 'ok']) > 0:
+            exit(1)
+        return
+
+    # The same job, against several accounts at once
+    if args.accounts is not None:
+        # Only pull in the multi-account bits if they're going to be used
+        from tdt.accounts import run_accounts
+        _results = run_accounts(args)
+        if len([_r for _r in _results if _r['status'] == 'failed']) > 0:
+            exit(1)
+        return
+
     # We can be confident that the job-file exists, but we've not yet confirmed that it contains valid tdt commands
     job_file = args.job_file
 
     # If nothing blows up, then we get back a list of job objects
-    valid_actions = validate_job_file(job_file)
+    valid_actions = validate_job_file(job_file, get_job_cache_dir(args))
     log.info("🟩 Have '{}' valid actions.".format(len(valid_actions)))
 
     # Before we can begin processing actions, we'll need to load additional basic API client and additional
     #   user-configured settings for working w/ todoist objects
     client_config = get_todoist_file(args.config_file)
 
+    # If the user wants to know what the actions did, set up the event bus
+    configure_event_bus(client_config)
+
     # Use that API token to get a client
-    todo_client = todoist.TodoistAPI(client_config['todoist']['api']['token'])
+    todo_client = get_api_client(client_config)
 
     # Check if we have been told ot clear local cache
     if args.reset_state:
@@ -58,110 +82,10 @@ def launch(args: argparse.Namespace):
     log.info("⚙️ Spinning up Todoist API Client...")
 
     # And, before we do anything, make sure that we have a totally valid API token and an UTD cache
-    result = todo_client.sync()
-    # We need to check if there's a `sync_token` field in the dict that comes back. If there is, we managed to sync
-    #   correctly. If there is not, then we need to assume that something went wrong and the resp will explain what...
-    ##
-    if 'sync_token' not in result:
-        _e = "ToDoist Didn't like request to Sync. Is your API_TOKEN correct?. Got back:{}".format(result)
-        # See: https://developer.todoist.com/sync/v8/?python#response-status-codes
-        log.fatal(_e)
-        raise TodoistClientError(_e)
+    sync_api_client(todo_client)
 
     # Yay, nothing blew up! Begin actually iterating over the actions...
-    _idx = 0
-
-    # Keep track of which action(s) encountered some sort of problem
-    _problems = []
-    for action_block in valid_actions:
-        # Iterate over each action block and pull some details from the action_block to make the following code
-        #   much easier to read.
-        ##
-        # User defined name for the action block
-        action_block_name = action_block['name']
-        # The actual resource_action to take
-        resource_action = action_block['action']
-        # ignore switch
-        action_enable = action_block['enabled']
-
-        # Each action in a job file can be independently toggled on/off
-        if action_enable is False:
-            log.warning("⏭️ Skip #{} {}://{} as it's disabled ...".format(_idx, resource_action, action_block_name))
-            _idx += 1
-            continue
-        else:
-            log.info("🏁 Executing #{} {}://{}...".format(_idx, resource_action, action_block_name))
-
-        ##
-        # Use the action_name from the jobs file to programmatically load the correct class.
-        # See: https://stackoverflow.com/questions/4821104/dynamic-instantiation-from-string-name-of-a-class-in-dynamically-imported-module
-        ##
-        # action_name is a string composed of a 'resource class' followed by the actual verb w/i that class.
-        #   E.G.: label_create is a create action of resource class label
-        ##
-        # device the resource into tokens. E.g. label_apply -> label, apply
-        _rt = resource_action.split("_")
-        # Take the tokens to build the path to the package
-        _action_mod_name = "tdt.actions.{}.{}".format(_rt[0], _rt[1])
-
-        # Now, we know which package too load, but within that package, what class do we load to do the needful?
-        if resource_action not in tdt.actions.action_map:
-            _e = "No class mapped to 'resource_action':{}".format(resource_action)
-            log.error(_e)
-            log.debug("have {}".format(tdt.actions.action_map.keys()))
-            raise TDTException(_e)
-
-        _action_class = tdt.actions.action_map[resource_action]
-
-        # We now know which package, module, class too load :)
-        log.debug("resource_action '{}' handled from '{}.{}'".format(resource_action, _action_class, _action_mod_name))
-
-        # Use importlib to load the module, complete w/ the class_name (or die trying)
-        try:
-            # Load the module
-            _action_mod = importlib.import_module(_action_mod_name)
-
-            # Get a class _from_ the module
-            action_handler_class = getattr(_action_mod, _action_class)
-
-            # Make instance of class
-            action_handler = action_handler_class()
-
-            # Configure the API client for the handler...
-            action_handler.api_client = todo_client
-            # Downloading backups requires the API token. Rather than hack the todo_client and try to get it out
-            #   that way, much easier to just pass it in :)
-            action_handler.api_token = client_config['todoist']['api']['token']
-
-            # ... and pass in the client params
-            action_handler.client_config = client_config
-
-            # ... and pass in the command line args (dry run?)
-            action_handler.cli_args = args
-
-            # And finally, do_work on the action from thee job file
-            result = action_handler.do_work(action_block)
-
-            # Log if the action completed successfully or not
-            log.info("☑️ DONE with action({})://{} ({})...".format(_idx, resource_action, action_block_name))
-            if result is False:
-                # If *anything* didn't go according to plan, record the problem action
-                _problems.append(action_block)
-                # And tell the user
-                log.info("... However, a non-fatal error did occur. ⭕")
-            else:
-                # And tell the user
-                log.info("... And nothing went wrong! ✅")
-
-            # In any event, increase idx and move on
-            _idx += 1
-
-        # Blow up if the module couldn't be found
-        except ModuleNotFoundError as mnfe:
-            _e = "Unable to validate the resource_action '{}' because the _action_mod_name '{}' could not be found. " \
-                 "mnfe:{} ".format(resource_action, _action_mod_name, mnfe)
-            log.error(_e)
-            raise TDTException(_e)
+    run_actions(valid_actions, todo_client, client_config, args)
 
     log.info("Execution of job://{} complete. Goodbye! 👋".format(job_file))
 
@@ -217,6 +141,34 @@ def parse_args():
                         help='Path to TMDT config file. Defaults to {}'.format(_config_default)
                         )
 
+    parser.add_argument('--accounts',
+                        default=None,
+                        nargs='+',
+                        type=str,
+                        help='Config files (or directories of config files) to run --job-file against, one per account'
+                        )
+
+    parser.add_argument('--parallelism',
+                        default=None,
+                        type=int,
+                        help='How many --accounts (or --validate-only job files) to run at once. Defaults to '
+                             'every account (at most 32) for --accounts and the number of CPUs for --validate-only'
+                        )
+
+    parser.add_argument('--validate-only',
+                        default=None,
+                        nargs='+',
+                        type=str,
+                        help='Job files (or directories of job files) to validate. Nothing is run and ToDoist is not '
+                             'contacted. Exits non-zero if any of them are invalid'
+                        )
+
+    parser.add_argument('--validate-format',
+                        default='text',
+                        choices=['text', 'json'],
+                        help='How --validate-only reports on each job file. json is one object per line'
+                        )
+
     ###
     # DEV/TEST
     ###
@@ -230,6 +182,54 @@ def parse_args():
                         help='Use to clear local todoist state and exit'
                         )
 
+    ###
+    # DAEMON
+    ###
+    parser.add_argument('--daemon',
+                        action='store_true',
+                        help='Stay running and execute the jobs from --schedule-file on their schedules'
+                        )
+
+    _schedule_default = './jobs/schedule.yaml'
+    parser.add_argument('--schedule-file',
+                        default=_schedule_default,
+                        type=str,
+                        help='Path to the schedule file used in --daemon mode. Defaults to {}'.format(_schedule_default)
+                        )
+
+    parser.add_argument('--health-port',
+                        default=None,
+                        type=int,
+                        help='If set, --daemon mode serves /health and /stats on this (localhost) port'
+                        )
+
+    parser.add_argument('--webhook',
+                        action='store_true',
+                        help='In --daemon mode, accept Todoist webhook events on --health-port at /webhook'
+                        )
+
+    parser.add_argument('--list-actions',
+                        action='store_true',
+                        help='Print every action that a job file can use (and what validates/runs it) then exit'
+                        )
+
+    parser.add_argument('--startup-profile',
+                        action='store_true',
+                        help='Print how long each part of the tool takes to import before running'
+                        )
+
+    _state_default = '~/.tmtdt/'
+    parser.add_argument('--state-dir',
+                        default=_state_default,
+                        type=str,
+                        help='Where TMTDT persists its own state. Defaults to {}'.format(_state_default)
+                        )
+
+    parser.add_argument('--no-job-cache',
+                        action='store_true',
+                        help='Always parse and validate the job file rather than use the copy cached in --state-dir'
+                        )
+
     return parser.parse_args()
 
 
@@ -237,7 +237,19 @@ if __name__ == '__main__':
     # Begin by parsing any arguments from the client
     args = parse_args()
 
+    # If the user wants to know where start up time goes, import everything up front (and time it)
+    if args.startup_profile:
+        from tdt.utils.startup import profile_imports, format_profile
+        print(format_profile(profile_imports()))
+
+    # Nothing to run, just say what could be run
+    if args.list_actions:
+        from tdt.registry import format_registry
+        print(format_registry())
+        exit(0)
+
     # Perform BASIC validation of the arguments
+    from tdt.utils.config import validate_args
     validate_args(args)
 
     # Assuming that nothing has blown up, we launch the tool